@@ -0,0 +1,49 @@
+"""
+Benchmarks for the service. Run from project root, e.g.:
+    python -m benchmarks.bench_async_reads
+Each benchmark creates its own test database (same way as pytest-django) and removes it afterwards.
+"""
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'project_management_service.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database(alias='default'):
+    from django.db import connections
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    connection = connections[alias]
+    old_name = connection.settings_dict['NAME']
+    if connection.vendor == 'sqlite':
+        # Shared in-memory SQLite locks whole tables under concurrent threads - use a file instead
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'benchmark.sqlite3')
+    connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(results: dict, key: str):
+    start = time.perf_counter()
+    yield
+    results[key] = time.perf_counter() - start
+
+
+def report(title: str, rows: list, columns: list):
+    print(title)
+    print(" | ".join(f"{c:>14}" for c in columns))
+    for row in rows:
+        print(" | ".join(f"{v:>14.3f}" if isinstance(v, float) else f"{v!s:>14}" for v in row))
+    print()
@@ -0,0 +1,107 @@
+"""
+Concurrent read throughput: sync DRF views (WSGI handler, thread pool) vs native async views (ASGI handler,
+event loop). Both sides get the same worker budget (--workers): sync runs that many threads, async runs
+on one event loop with that many concurrent requests in flight.
+--db-latency-ms adds artificial wait to each query to model a network database (in-process SQLite has none).
+
+    python -m benchmarks.bench_async_reads --requests 400 --workers 8 --db-latency-ms 5
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import setup_django, test_database, report
+
+
+def seed(tasks: int):
+    from django.contrib.auth.models import User
+    from projects_app.models import Project, ProjectMember
+    from sprints_app.models import Sprint
+    from tasks_app.models import Task
+
+    project = Project.objects.create(id="BEN", project_name="Benchmark")
+    ProjectMember.objects.create(project=project, user_id="bench", role=ProjectMember.Role.ADMIN)
+    sprint = Sprint.objects.create(name="Sprint", project=project)
+    for i in range(tasks):
+        Task.create_for_project(project=project, summary=f"Task {i}", creator="bench").sprint.add(sprint)
+    return User.objects.create_user(username="bench", password="bench"), sprint
+
+
+def add_latency(latency):
+    from django.db.backends.signals import connection_created
+
+    def wrapper(execute, sql, params, many, context):
+        time.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(wrapper)
+
+    connection_created.connect(install, weak=False)
+
+
+def run_sync(user, paths, workers):
+    from django.test import Client
+
+    def fetch(path):
+        client = Client(headers={"user_id": "bench"})
+        client.force_login(user)
+        return client.get(path).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        codes = list(pool.map(fetch, paths))
+    return time.perf_counter() - start, codes
+
+
+def run_async(user, paths, workers):
+    from django.test import AsyncClient
+
+    async def main():
+        client = AsyncClient()
+        await client.aforce_login(user)
+        semaphore = asyncio.Semaphore(workers)
+
+        async def fetch(path):
+            async with semaphore:
+                # ASGI drops header names with underscores, clients send User-Id
+                return (await client.get(f"/async{path}", headers={"user-id": "bench"})).status_code
+
+        return await asyncio.gather(*(fetch(p) for p in paths))
+
+    start = time.perf_counter()
+    codes = asyncio.run(main())
+    return time.perf_counter() - start, codes
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--db-latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    settings.ADMISSION_CONTROL_ENABLED = False  # one benchmark user would be rate limited
+
+    with test_database():
+        user, sprint = seed(args.tasks)
+        paths = [p for _ in range(args.requests // 4)
+                 for p in ("/tasks/", "/tasks/BEN-1/", "/sprints/", f"/sprints/{sprint.id}/")]
+        if args.db_latency_ms:
+            add_latency(args.db_latency_ms / 1000)
+
+        rows = []
+        for name, runner in (("sync (WSGI)", run_sync), ("async (ASGI)", run_async)):
+            elapsed, codes = runner(user, paths, args.workers)
+            failed = sum(1 for c in codes if c != 200)
+            rows.append((name, len(paths), args.workers, elapsed, len(paths) / elapsed, failed))
+
+        report("Concurrent read throughput", rows, ["mode", "requests", "workers", "seconds", "req/s", "failed"])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Choice fields of task (status, priority, type) stored as varchar values vs small integer codes (ChoiceCodeField).
+Same rows are loaded into both layouts of task table with the indexes of Task model over status (open tasks by due
+date, workload), then table and index sizes and a few status queries are compared.
+Sizes are read from dbstat (SQLite) or pg_relation_size / pg_table_size (PostgreSQL).
+
+    python -m benchmarks.bench_choice_codes --tasks 10000000 --repeat 5
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import setup_django, test_database, report
+
+STATUSES = ["To Do", "In Progress", "In Review", "Closed"]
+PRIORITIES = ["Urgent", "High", "Medium", "Low"]
+TYPES = ["Subtask", "Task", "Epic", "Initiative", "Bug", "Support"]
+
+LAYOUTS = {
+    "varchar": {"type": {"sqlite": "varchar(20)", "postgresql": "varchar(20)"}, "closed": "'Closed'"},
+    "smallint": {"type": {"sqlite": "smallint unsigned", "postgresql": "smallint"}, "closed": "4"},
+}
+
+
+def create_table(connection, cursor, name, layout):
+    choice = layout["type"][connection.vendor]
+    id_type = "integer" if connection.vendor == "sqlite" else "bigint"
+    cursor.execute(f"CREATE TABLE bench_{name}_task (id {id_type} PRIMARY KEY, project_id varchar(3) NOT NULL, "
+                   f"assignee varchar(64) NULL, estimate integer NULL, due_date timestamp NULL, "
+                   f"type {choice} NOT NULL, priority {choice} NOT NULL, status {choice} NOT NULL)")
+
+
+def create_indexes(cursor, name, layout):
+    # As Task.Meta.indexes
+    cursor.execute(f"CREATE INDEX bench_{name}_open_due ON bench_{name}_task (due_date) "
+                   f"WHERE due_date IS NOT NULL AND NOT (status = {layout['closed']})")
+    cursor.execute(f"CREATE INDEX bench_{name}_workload ON bench_{name}_task (project_id, assignee, status, estimate)")
+
+
+def rows(tasks, projects, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for task_id in range(1, tasks + 1):
+        status = rng.choices(range(4), weights=(3, 2, 1, 6))[0]
+        yield (
+            task_id,
+            f"P{task_id % projects:02d}",
+            f"user-{rng.randrange(200)}" if rng.random() < 0.8 else None,
+            rng.choice((1, 2, 3, 5, 8, None)),
+            start + timedelta(hours=rng.randrange(24 * 365)) if rng.random() < 0.5 else None,
+            rng.randrange(6),
+            rng.randrange(4),
+            status,
+        )
+
+
+def seed(cursor, name, tasks, projects, batch_size=20000):
+    coded = name == "smallint"
+    batch = []
+
+    def flush():
+        cursor.executemany(f"INSERT INTO bench_{name}_task (id, project_id, assignee, estimate, due_date, type, "
+                           f"priority, status) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)", batch)
+        batch.clear()
+
+    for task_id, project, assignee, estimate, due_date, type_, priority, status in rows(tasks, projects):
+        if coded:
+            # Codes as in TASK_TYPE_CODES / Task.PRIORITY_CODES / STATUS_CODES
+            batch.append((task_id, project, assignee, estimate, due_date, type_ + 1, priority + 1, status + 1))
+        else:
+            batch.append((task_id, project, assignee, estimate, due_date, TYPES[type_], PRIORITIES[priority],
+                          STATUSES[status]))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+
+
+def sizes(connection, cursor, name) -> dict:
+    objects = {
+        "table": f"bench_{name}_task",
+        "open due date index": f"bench_{name}_open_due",
+        "workload index": f"bench_{name}_workload",
+    }
+    result = {}
+    for label, relation in objects.items():
+        if connection.vendor == "postgresql":
+            function = "pg_table_size" if label == "table" else "pg_relation_size"
+            cursor.execute(f"SELECT {function}(%s::regclass)", [relation])
+        else:
+            cursor.execute("SELECT sum(pgsize) FROM dbstat WHERE name = %s", [relation])
+        result[label] = (cursor.fetchone()[0] or 0) / 1024 / 1024
+    result["total"] = sum(result.values())
+    return result
+
+
+def measure(cursor, sql, params, repeat) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def queries(cursor, name, layout, repeat) -> dict:
+    closed = layout["closed"]
+    table = f"bench_{name}_task"
+    return {
+        "status counts of project": measure(
+            cursor, f"SELECT status, count(*) FROM {table} WHERE project_id = %s GROUP BY status", ["P07"], repeat),
+        "workload of project": measure(
+            cursor, f"SELECT assignee, status, count(*), sum(estimate) FROM {table} WHERE project_id = %s "
+                    f"GROUP BY assignee, status", ["P07"], repeat),
+        "open tasks due in day": measure(
+            cursor, f"SELECT id FROM {table} WHERE due_date IS NOT NULL AND NOT (status = {closed}) "
+                    f"AND due_date >= %s AND due_date < %s",
+            [datetime(2025, 6, 1), datetime(2025, 6, 2)], repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=10_000_000)
+    parser.add_argument('--projects', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database() as connection:
+        table_sizes, times = {}, {}
+        with connection.cursor() as cursor:
+            for label, layout in LAYOUTS.items():
+                create_table(connection, cursor, label, layout)
+                seed(cursor, label, args.tasks, args.projects)
+                create_indexes(cursor, label, layout)
+                cursor.execute("ANALYZE")
+                table_sizes[label] = sizes(connection, cursor, label)
+                times[label] = queries(cursor, label, layout, args.repeat)
+
+        labels = list(LAYOUTS)
+        report(f"Size, MB ({args.tasks} tasks, {connection.vendor})",
+               [(item, *(table_sizes[label][item] for label in labels),
+                 1 - table_sizes[labels[1]][item] / table_sizes[labels[0]][item]) for item in table_sizes[labels[0]]],
+               ["object", *labels, "reduction"])
+        report("Query, ms",
+               [(query, *(times[label][query] for label in labels)) for query in times[labels[0]]],
+               ["query", *labels])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Task create / list workload against database profiles (see project_management_service/database.py).
+Every profile runs in its own process, because DATABASES is read once at startup.
+
+    python -m benchmarks.bench_db_profiles --writers 8 --operations 200
+    python -m benchmarks.bench_db_profiles --postgres     # also PMS_DB_* variables for PostgreSQL server
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import setup_django, test_database, report
+
+PROFILES = {
+    "sqlite (default)": {"PMS_DB_PROFILE": "sqlite", "PMS_SQLITE_WAL": "0"},
+    "sqlite (WAL)": {"PMS_DB_PROFILE": "sqlite", "PMS_SQLITE_WAL": "1"},
+    "postgres (pool)": {"PMS_DB_PROFILE": "postgres", "PMS_DB_POOL": "1"},
+    "postgres (persistent)": {"PMS_DB_PROFILE": "postgres", "PMS_DB_POOL": "0"},
+}
+
+
+def workload(args):
+    setup_django()
+    from django.db import connection, OperationalError
+    from projects_app.models import Project
+    from tasks_app.models import Task
+
+    with test_database():
+        project = Project.objects.create(id="BEN", project_name="Benchmark")
+
+        def worker(worker_id):
+            created = listed = errors = 0
+            try:
+                for i in range(args.operations):
+                    try:
+                        Task.create_for_project(project=project, summary=f"Task {worker_id}-{i}", creator="bench")
+                        created += 1
+                        if i % args.list_every == 0:
+                            tasks = Task.objects.filter(project=project).prefetch_related('sprint')
+                            tasks.count()
+                            list(tasks[:100])
+                            listed += 1
+                    except OperationalError:
+                        errors += 1
+            finally:
+                connection.close()
+            return created, listed, errors
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.writers) as pool:
+            results = list(pool.map(worker, range(args.writers)))
+        elapsed = time.perf_counter() - start
+
+    created, listed, errors = (sum(r[i] for r in results) for i in range(3))
+    print(json.dumps({"seconds": elapsed, "created": created, "listed": listed, "errors": errors}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=100, help="task creations per writer")
+    parser.add_argument('--list-every', type=int, default=5, help="list first page after every N creations")
+    parser.add_argument('--postgres', action='store_true')
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return workload(args)
+
+    rows = []
+    for name, variables in PROFILES.items():
+        if variables["PMS_DB_PROFILE"] == "postgres" and not args.postgres:
+            continue
+        command = [sys.executable, "-m", "benchmarks.bench_db_profiles", "--run",
+                   "--writers", str(args.writers), "--operations", str(args.operations),
+                   "--list-every", str(args.list_every)]
+        output = subprocess.run(command, env={**os.environ, **variables}, capture_output=True, text=True, check=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        rows.append((name, result["created"], result["listed"], result["errors"], result["seconds"],
+                     result["created"] / result["seconds"]))
+
+    report("Task create/list workload", rows, ["profile", "created", "listed", "lock errors", "seconds", "creates/s"])
+
+
+if __name__ == '__main__':
+    main()
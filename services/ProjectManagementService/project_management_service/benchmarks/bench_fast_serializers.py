@@ -0,0 +1,75 @@
+"""
+Task list serialization: TaskSerializer(many=True) vs FastReadSerializer (values_list rows + compiled converters).
+Measures rows per second for list pages of 100 and 10 000 tasks, including the queries of each read path.
+
+    python -m benchmarks.bench_fast_serializers --tasks 10000 --repeat 5
+"""
+import argparse
+import time
+
+from benchmarks import setup_django, test_database, report
+
+
+def seed(tasks, sprints):
+    from projects_app.models import Project
+    from sprints_app.models import Sprint
+    from tasks_app.models import Task
+
+    project = Project.objects.create(id="BEN", project_name="Benchmark")
+    sprint_objects = Sprint.objects.bulk_create([Sprint(name=f"Sprint {n}", project=project) for n in range(sprints)])
+    Task.objects.bulk_create(
+        [Task(id=n, key=f"BEN-{n}", number=n, project=project, summary=f"Task {n}", creator="bench",
+              assignee="bench" if n % 2 else None, estimate=n % 13 or None) for n in range(1, tasks + 1)],
+        batch_size=1000
+    )
+    Through = Task.sprint.through
+    Through.objects.bulk_create(
+        [Through(task_id=n, sprint_id=sprint_objects[n % sprints].pk) for n in range(1, tasks + 1)],
+        batch_size=1000
+    )
+
+
+def drf_page(size):
+    from tasks_app.models import Task
+    from tasks_app.serializers import TaskSerializer
+
+    return TaskSerializer(Task.objects.order_by('pk')[:size], many=True).data
+
+
+def fast_page(size):
+    from tasks_app.models import Task
+    from tasks_app.serializers import task_fast_serializer
+
+    return task_fast_serializer.serialize(Task.objects.order_by('pk')[:size])
+
+
+def rows_per_second(build, size, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build(size)
+    return size * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--sprints', type=int, default=20)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[100, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        seed(args.tasks, args.sprints)
+        rows = []
+        for size in args.page_sizes:
+            size = min(size, args.tasks)
+            assert drf_page(size) == fast_page(size)
+            drf = rows_per_second(drf_page, size, args.repeat)
+            fast = rows_per_second(fast_page, size, args.repeat)
+            rows.append((size, drf, fast, fast / drf))
+        report("Task list serialization, rows/s", rows, ["page size", "DRF", "fast", "speedup"])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Task list response formats: JSON (default JSONRenderer) vs MessagePack vs columnar JSON.
+Reports payload size (raw and gzip) and encode / decode CPU time for pages of 100 and 10 000 tasks.
+Decoding uses the parsers a client (or this service, for request bodies) would use.
+
+    python -m benchmarks.bench_formats --tasks 10000 --repeat 10
+"""
+import argparse
+import gzip
+import io
+import time
+
+from benchmarks import setup_django, test_database, report
+from benchmarks.bench_fast_serializers import seed
+
+
+def page(size):
+    from tasks_app.models import Task
+    from tasks_app.serializers import task_fast_serializer
+
+    results = task_fast_serializer.serialize(Task.objects.order_by('pk')[:size])
+    return {"count": size, "next": None, "previous": None, "results": results}
+
+
+def formats():
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from utils.parsers import ColumnarJSONParser, MessagePackParser
+    from utils.renderers import ColumnarJSONRenderer, MessagePackRenderer
+
+    class PageColumnarParser(ColumnarJSONParser):
+        # Response pages hold columns under "results"
+        def parse(self, stream, media_type=None, parser_context=None):
+            from utils.parsers import from_columns
+
+            data = JSONParser.parse(self, stream, media_type, parser_context)
+            return {**data, 'results': from_columns(data['results'])}
+
+    return [
+        ("json", JSONRenderer(), JSONParser()),
+        ("msgpack", MessagePackRenderer(), MessagePackParser()),
+        ("columnar", ColumnarJSONRenderer(), PageColumnarParser()),
+    ]
+
+
+def measure(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=10000)
+    parser.add_argument('--sprints', type=int, default=20)
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[100, 10000])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        seed(args.tasks, args.sprints)
+        for size in args.page_sizes:
+            data = page(min(size, args.tasks))
+            rows = []
+            for name, renderer, data_parser in formats():
+                content, encode_ms = measure(lambda: renderer.render(data), args.repeat)
+                decoded, decode_ms = measure(lambda: data_parser.parse(io.BytesIO(content)), args.repeat)
+                assert decoded == data
+                rows.append((name, len(content), len(gzip.compress(content)), encode_ms, decode_ms))
+            report(f"Task list page of {size}", rows, ["format", "bytes", "gzip bytes", "encode ms", "decode ms"])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Task primary key: string "<PROJECT>-<number>" (repeated in every referencing column) vs integer id with the string
+kept as unique key column. Same rows are loaded into both layouts of task, sprint link and comment tables, then
+index sizes and join times (comments of project, tasks of sprint) are compared.
+Index sizes are read from dbstat (SQLite) or pg_relation_size (PostgreSQL).
+
+    python -m benchmarks.bench_task_keys --projects 50 --tasks-per-project 2000 --repeat 20
+"""
+import argparse
+import time
+
+from benchmarks import setup_django, test_database, report
+
+LAYOUTS = {
+    "string key": {
+        "key_type": "varchar(64)",
+        "task": "CREATE TABLE bench_{name}_task (id varchar(64) PRIMARY KEY, project_id varchar(3) NOT NULL, "
+                "number integer NOT NULL)",
+        "task_key": "id",
+    },
+    "integer key": {
+        "key_type": "bigint",
+        "task": "CREATE TABLE bench_{name}_task (id {id_type} PRIMARY KEY, key varchar(64) NOT NULL UNIQUE, "
+                "project_id varchar(3) NOT NULL, number integer NOT NULL)",
+        "task_key": "key",
+    },
+}
+
+
+def project_id(index):
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return "".join(alphabet[index // 36 ** power % 36] for power in (2, 1, 0))
+
+
+def create_tables(connection, cursor, name, layout):
+    key_type = layout["key_type"]
+    # As created for BigAutoField - on SQLite only "integer" primary key is the rowid (no separate index)
+    id_type = "integer" if connection.vendor == "sqlite" else "bigint"
+    cursor.execute(layout["task"].format(name=name, id_type=id_type))
+    cursor.execute(f"CREATE INDEX bench_{name}_task_project ON bench_{name}_task (project_id)")
+    cursor.execute(f"CREATE TABLE bench_{name}_link (id integer PRIMARY KEY, task_id {key_type} NOT NULL, "
+                   f"sprint_id integer NOT NULL)")
+    cursor.execute(f"CREATE UNIQUE INDEX bench_{name}_link_task_sprint ON bench_{name}_link (task_id, sprint_id)")
+    cursor.execute(f"CREATE INDEX bench_{name}_link_sprint ON bench_{name}_link (sprint_id)")
+    cursor.execute(f"CREATE TABLE bench_{name}_comment (id integer PRIMARY KEY, task_id {key_type} NOT NULL, "
+                   f"content varchar(255) NOT NULL)")
+    cursor.execute(f"CREATE INDEX bench_{name}_comment_task ON bench_{name}_comment (task_id)")
+
+
+def seed(cursor, name, layout, projects, tasks_per_project, comments_per_task, batch_size=5000):
+    integer = layout["task_key"] == "key"
+    tasks, links, comments = [], [], []
+    task_id = link_id = comment_id = 0
+    for p in range(projects):
+        for number in range(1, tasks_per_project + 1):
+            task_id += 1
+            key = f"{project_id(p)}-{number}"
+            ref = task_id if integer else key
+            tasks.append((task_id, key, project_id(p), number) if integer else (key, project_id(p), number))
+            link_id += 1
+            links.append((link_id, ref, p * 10 + number % 10))
+            for _ in range(comments_per_task):
+                comment_id += 1
+                comments.append((comment_id, ref, "Comment"))
+
+    task_columns = "(id, key, project_id, number)" if integer else "(id, project_id, number)"
+    for table, columns, rows in ((f"bench_{name}_task", task_columns, tasks),
+                                 (f"bench_{name}_link", "(id, task_id, sprint_id)", links),
+                                 (f"bench_{name}_comment", "(id, task_id, content)", comments)):
+        placeholders = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        for i in range(0, len(rows), batch_size):
+            cursor.executemany(f"INSERT INTO {table} {columns} VALUES {placeholders}", rows[i:i + batch_size])
+
+
+def index_sizes(connection, cursor, name) -> dict:
+    indexes = {
+        "task (pk + key)": None,
+        "link": [f"bench_{name}_link_task_sprint"],
+        "comment": [f"bench_{name}_comment_task"],
+    }
+    sizes = {}
+    for label, names in indexes.items():
+        if connection.vendor == "postgresql":
+            if names is None:
+                cursor.execute("SELECT indexrelid::regclass::text FROM pg_index WHERE indrelid = %s::regclass",
+                               [f"bench_{name}_task"])
+                names = [row[0] for row in cursor.fetchall() if not row[0].endswith("_project")]
+            cursor.execute("SELECT sum(pg_relation_size(relname::regclass)) FROM unnest(%s::text[]) AS relname",
+                           [names])
+        else:
+            # SQLite: string primary key is autoindex, integer primary key is the table itself (rowid)
+            if names is None:
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = %s",
+                               [f"bench_{name}_task"])
+                names = [row[0] for row in cursor.fetchall() if not row[0].endswith("_project")]
+            if not names:
+                sizes[label] = 0.0
+                continue
+            cursor.execute(f"SELECT sum(pgsize) FROM dbstat WHERE name IN ({', '.join(['%s'] * len(names))})",
+                           names)
+        sizes[label] = (cursor.fetchone()[0] or 0) / 1024 / 1024
+    return sizes
+
+
+def measure(cursor, sql, params, repeat) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        cursor.execute(sql, params)
+        cursor.fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def joins(cursor, name, layout, repeat) -> dict:
+    key = layout["task_key"]
+    return {
+        "comments of project": measure(
+            cursor, f"SELECT task.{key}, comment.id FROM bench_{name}_comment AS comment "
+                    f"JOIN bench_{name}_task AS task ON task.id = comment.task_id WHERE task.project_id = %s",
+            [project_id(1)], repeat),
+        "tasks of sprint": measure(
+            cursor, f"SELECT task.{key}, task.number FROM bench_{name}_link AS link "
+                    f"JOIN bench_{name}_task AS task ON task.id = link.task_id WHERE link.sprint_id = %s",
+            [13], repeat),
+        "comment count per task": measure(
+            cursor, f"SELECT task.{key}, count(comment.id) FROM bench_{name}_task AS task "
+                    f"JOIN bench_{name}_comment AS comment ON comment.task_id = task.id "
+                    f"WHERE task.project_id = %s GROUP BY task.{key}",
+            [project_id(2)], repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--projects', type=int, default=50)
+    parser.add_argument('--tasks-per-project', type=int, default=2000)
+    parser.add_argument('--comments-per-task', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database() as connection:
+        sizes, times = {}, {}
+        with connection.cursor() as cursor:
+            for label, layout in LAYOUTS.items():
+                name = label.split()[0]
+                create_tables(connection, cursor, name, layout)
+                seed(cursor, name, layout, args.projects, args.tasks_per_project, args.comments_per_task)
+                cursor.execute("ANALYZE")
+                sizes[label] = index_sizes(connection, cursor, name)
+                times[label] = joins(cursor, name, layout, args.repeat)
+
+        labels = list(LAYOUTS)
+        report(f"Index size, MB ({args.projects * args.tasks_per_project} tasks, {connection.vendor})",
+               [(index, *(sizes[label][index] for label in labels)) for index in sizes[labels[0]]],
+               ["index", *labels])
+        report("Join, ms per query",
+               [(query, *(times[label][query] for label in labels)) for query in times[labels[0]]],
+               ["query", *labels])
+
+
+if __name__ == '__main__':
+    main()
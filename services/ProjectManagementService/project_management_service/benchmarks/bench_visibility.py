@@ -0,0 +1,97 @@
+"""
+Task list visibility filter: correlated Exists(ProjectMember...) subquery vs ProjectVisibility (cached project ids
+used in project_id IN (...), or membership semi-join above VISIBILITY_MAX_INLINE_IDS).
+Users are members of 1, 50 and 5000 projects, database also holds projects they cannot see.
+
+    python -m benchmarks.bench_visibility --tasks-per-project 4 --repeat 20
+"""
+import argparse
+import time
+
+from benchmarks import setup_django, test_database, report
+
+
+def project_id(index):
+    # Project ids have exactly 3 characters - base 36
+    alphabet = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return "".join(alphabet[index // 36 ** power % 36] for power in (2, 1, 0))
+
+
+def seed(member_of, hidden_projects, tasks_per_project):
+    from projects_app.models import Project, ProjectMember
+    from tasks_app.models import Task
+
+    total = max(member_of) + hidden_projects
+    projects = [Project(id=project_id(i), project_name=f"Project {i}") for i in range(total)]
+    Project.objects.bulk_create(projects, batch_size=500)
+    Task.objects.bulk_create(
+        [Task(key=f"{p.id}-{n}", number=n, project=p, summary="Task", creator="bench")
+         for p in projects for n in range(1, tasks_per_project + 1)], batch_size=500
+    )
+    for count in member_of:
+        ProjectMember.objects.bulk_create(
+            [ProjectMember(user_id=f"user-{count}", project=p, role=ProjectMember.Role.VIEWER)
+             for p in projects[:count]], batch_size=500
+        )
+
+
+def exists_queryset(user_id):
+    from django.db.models import Exists, OuterRef
+    from projects_app.models import ProjectMember
+    from tasks_app.models import Task
+
+    return Task.objects.annotate(
+        is_member=Exists(ProjectMember.objects.filter(project=OuterRef('project_id'), user_id=user_id))
+    ).filter(is_member=True)
+
+
+def visibility_queryset(user_id):
+    from permissions.visibility import ProjectVisibility
+    from tasks_app.models import Task
+
+    return ProjectVisibility.filter_queryset(Task.objects.all(), user_id)
+
+
+def list_page(queryset):
+    queryset = queryset.order_by('pk')
+    return queryset.count(), list(queryset[:100])
+
+
+def measure(build, user_id, repeat, clear_cache=False):
+    from django.core.cache import cache
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        if clear_cache:
+            cache.clear()
+        list_page(build(user_id))
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--member-of', type=int, nargs='+', default=[1, 50, 5000])
+    parser.add_argument('--hidden-projects', type=int, default=2000)
+    parser.add_argument('--tasks-per-project', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    with test_database():
+        seed(args.member_of, args.hidden_projects, args.tasks_per_project)
+        rows = []
+        for count in args.member_of:
+            user_id = f"user-{count}"
+            assert list_page(exists_queryset(user_id))[0] == list_page(visibility_queryset(user_id))[0]
+            rows.append((
+                count,
+                measure(exists_queryset, user_id, args.repeat),
+                measure(visibility_queryset, user_id, args.repeat, clear_cache=True),
+                measure(visibility_queryset, user_id, args.repeat),
+            ))
+        report("Task list page + count, ms per request", rows,
+               ["member of", "Exists", "visible (cold)", "visible (warm)"])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+class ProjectGenerations:
+    """
+    Per project generation counter. Any write to project's tasks, sprints, comments, observers or members bumps it,
+    and cached responses are keyed with generations of projects they depend on - old entries are simply never
+    read again (no key scanning on invalidation).
+    Missing counter (never set or evicted) starts from current time, so it can not come back to old value.
+    """
+
+    key_prefix = 'project-generation'
+
+    @classmethod
+    def cache(cls):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    @classmethod
+    def key(cls, project_id) -> str:
+        return f'{cls.key_prefix}:{project_id}'
+
+    @classmethod
+    def get_many(cls, project_ids) -> dict:
+        cache = cls.cache()
+        keys = {cls.key(project_id): project_id for project_id in project_ids}
+        found = cache.get_many(keys)
+        for key in keys.keys() - found.keys():
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        return {keys[key]: generation for key, generation in found.items()}
+
+    @classmethod
+    def bump_now(cls, *project_ids):
+        cache = cls.cache()
+        for project_id in set(project_ids):
+            key = cls.key(project_id)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns(), timeout=None)
+
+    @classmethod
+    def bump(cls, *project_ids):
+        """
+        Bump after commit - reader that sees new generation must also see committed data
+        """
+        project_ids = [project_id for project_id in project_ids if project_id is not None]
+        if project_ids:
+            transaction.on_commit(lambda: cls.bump_now(*project_ids))
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from .generations import ProjectGenerations
+from .single_flight import SingleFlight
+from permissions.visibility import ProjectVisibility
+from utils.request_user import request_user_id
+
+
+class ResponseCacheStats:
+    """
+    Hit / miss counters of this process, per cache scope (view).
+    'coalesced' - misses served with rendered response of identical concurrent request (single flight)
+    """
+
+    events = ('hits', 'misses', 'stores', 'bypasses', 'coalesced')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def record(self, scope: str, event: str):
+        with self._lock:
+            counters = self._counters.setdefault(scope, dict.fromkeys(self.events, 0))
+            counters[event] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            scopes = {scope: dict(counters) for scope, counters in self._counters.items()}
+        for counters in scopes.values():
+            lookups = counters['hits'] + counters['misses']
+            counters['hit_ratio'] = round(counters['hits'] / lookups, 4) if lookups else None
+        return scopes
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class ResponseCache:
+    """
+    Cache of GET response data keyed by (view, user visibility scope, normalized query params,
+    generations of projects the response depends on). Users with the same visible projects share entries.
+    """
+
+    key_prefix = 'response'
+    stats = ResponseCacheStats()
+
+    @classmethod
+    def cache(cls):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    @classmethod
+    def build_key(cls, scope, request, visible_project_ids, project_ids):
+        generations = ProjectGenerations.get_many(project_ids)
+        query_params = request.query_params
+        raw = json.dumps([
+            request.get_host(),  # pagination links are absolute
+            request.path,
+            sorted((key, sorted(values)) for key, values in query_params.lists()),
+            list(visible_project_ids),
+            sorted(generations.items()),
+        ], default=str)
+        return f'{cls.key_prefix}:{scope}:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+    @classmethod
+    def get(cls, key):
+        return cls.cache().get(key)
+
+    @classmethod
+    def set(cls, key, data):
+        cls.cache().set(key, data, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+class CachedResponseMixin:
+    """
+    Mixin for DRF views serving cached GET responses.
+    Views define get_cache_project_ids(visible_project_ids) - projects the response depends on,
+    or None when response should not be cached (e.g. object not visible for user - normal flow returns 403/404).
+    Authentication and permission classes still run before the cache lookup (DRF initial()).
+    Concurrent identical misses (same cache key and response format) are computed once - others wait
+    up to COALESCE_WAIT_TIMEOUT seconds for leader's rendered bytes (X-Cache: COALESCED) and then fall back
+    to computing on their own.
+    """
+
+    cache_header = 'X-Cache'
+    single_flight = SingleFlight()
+
+    def get_cache_scope(self):
+        return self.__class__.__name__
+
+    def get_cache_project_ids(self, visible_project_ids):
+        return visible_project_ids
+
+    def get_cache_key(self, request):
+        user_id = request_user_id(request)
+        visible_project_ids = ProjectVisibility.project_ids(user_id)
+        if len(visible_project_ids) > settings.RESPONSE_CACHE_MAX_PROJECTS:
+            return None
+        project_ids = self.get_cache_project_ids(visible_project_ids)
+        if project_ids is None:
+            return None
+        return ResponseCache.build_key(self.get_cache_scope(), request, visible_project_ids, project_ids)
+
+    def get(self, request, *args, **kwargs):
+        scope = self.get_cache_scope()
+        key = self.get_cache_key(request)
+        if key is None:
+            ResponseCache.stats.record(scope, 'bypasses')
+            return super().get(request, *args, **kwargs)
+
+        data = ResponseCache.get(key)
+        if data is not None:
+            ResponseCache.stats.record(scope, 'hits')
+            return Response(data, headers={self.cache_header: 'HIT'})
+
+        ResponseCache.stats.record(scope, 'misses')
+        # Browsable API pages are per user (CSRF token, user name) - not shared
+        if settings.COALESCE_REQUESTS and request.accepted_renderer.media_type != 'text/html':
+            compute = self.compute_shared(super().get, request, *args, **kwargs)
+            response, shared = self.single_flight.run(f'{key}:{request.accepted_media_type}', compute,
+                                                      settings.COALESCE_WAIT_TIMEOUT)
+            if shared is not None:
+                ResponseCache.stats.record(scope, 'coalesced')
+                content, content_type = shared
+                return HttpResponse(content, content_type=content_type, headers={self.cache_header: 'COALESCED'})
+        else:
+            response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            ResponseCache.set(key, response.data)
+            ResponseCache.stats.record(scope, 'stores')
+        response[self.cache_header] = 'MISS'
+        return response
+
+    def compute_shared(self, get, request, *args, **kwargs):
+        """
+        Computation for single flight - response rendered by leader, so followers only copy the bytes
+        """
+        def compute():
+            response = get(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response, None
+            response.accepted_renderer = request.accepted_renderer
+            response.accepted_media_type = request.accepted_media_type
+            response.renderer_context = self.get_renderer_context()
+            response.render()
+            return response, (response.content, response['Content-Type'])
+        return compute
+
+
+def project_from_query_params(request, visible_project_ids):
+    """
+    List endpoints filtered by visible project depend only on that project
+    """
+    project = request.query_params.get('project')
+    if project in visible_project_ids:
+        return [project]
+    return visible_project_ids
+
+
+def project_from_task_id(task_id: str, visible_project_ids):
+    """
+    Task id has format <PROJECT>-<n>, so project is known without database query
+    """
+    project_id = task_id.rsplit('-', 1)[0]
+    return [project_id] if project_id in visible_project_ids else None
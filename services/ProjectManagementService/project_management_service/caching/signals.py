@@ -0,0 +1,41 @@
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .generations import ProjectGenerations
+from projects_app.models import Project, ProjectMember
+from sprints_app.models import Sprint
+from tasks_app.models import Task, Comment, TaskObserver, TaskDependency
+
+
+@receiver([post_save, post_delete], sender=Project)
+def project_changed(sender, instance, **kwargs):
+    ProjectGenerations.bump(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ProjectMember)
+@receiver([post_save, post_delete], sender=Sprint)
+@receiver([post_save, post_delete], sender=Task)
+@receiver([post_save, post_delete], sender=TaskDependency)
+def project_related_changed(sender, instance, **kwargs):
+    ProjectGenerations.bump(instance.project_id)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=TaskObserver)
+def task_related_changed(sender, instance, **kwargs):
+    if sender.task.is_cached(instance):
+        project_id = instance.task.project_id
+    else:
+        project_id = Task.objects.filter(pk=instance.task_id).values_list('project_id', flat=True).first()
+    ProjectGenerations.bump(project_id)
+
+
+@receiver(m2m_changed, sender=Task.sprint.through)
+def task_sprints_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, Task):
+        ProjectGenerations.bump(instance.project_id)
+    else:
+        ProjectGenerations.bump(instance.project_id, *Task.objects.filter(pk__in=pk_set or [])
+                                .values_list('project_id', flat=True).distinct())
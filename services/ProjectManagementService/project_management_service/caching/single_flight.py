@@ -0,0 +1,90 @@
+import asyncio
+import threading
+
+
+class Flight:
+    """
+    One in-flight computation. `shared` is set by leader for followers (None - followers compute themselves)
+    """
+
+    def __init__(self, done):
+        self.done = done
+        self.shared = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Identical concurrent computations (same key) run once, other callers wait for leader's result.
+    For threads: WSGI workers and sync views served by ASGI (each request runs in its own thread).
+    Followers wait at most `timeout` seconds, then compute on their own.
+    """
+
+    event_class = threading.Event
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def join(self, key):
+        """
+        (flight, is_leader)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = Flight(self.event_class())
+                return flight, True
+            flight.followers += 1
+            return flight, False
+
+    def finish(self, key, flight, shared):
+        flight.shared = shared
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.done.set()
+
+    def run(self, key, compute, timeout):
+        """
+        compute() -> (result, shared). Returns (result, None) for leader and callers that computed themselves,
+        (None, shared) for followers that received leader's shared value
+        """
+        flight, leader = self.join(key)
+        if not leader:
+            if flight.done.wait(timeout) and flight.shared is not None:
+                return None, flight.shared
+            return compute()[0], None
+
+        shared = None
+        try:
+            result, shared = compute()
+        finally:
+            self.finish(key, flight, shared)
+        return result, None
+
+
+class AsyncSingleFlight(SingleFlight):
+    """
+    SingleFlight for coroutines on event loop (native async views)
+    """
+
+    event_class = asyncio.Event
+
+    async def run(self, key, compute, timeout):
+        flight, leader = self.join(key)
+        if not leader:
+            try:
+                await asyncio.wait_for(flight.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            if flight.shared is not None:
+                return None, flight.shared
+            return (await compute())[0], None
+
+        shared = None
+        try:
+            result, shared = await compute()
+        finally:
+            self.finish(key, flight, shared)
+        return result, None
@@ -0,0 +1,22 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .response_cache import ResponseCache
+
+
+class ResponseCacheStatsView(APIView):
+    """
+    Response cache hit / miss statistics of this process (for staff users)
+    GET - statistics per view
+    DELETE - reset statistics
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(ResponseCache.stats.snapshot())
+
+    def delete(self, request):
+        ResponseCache.stats.reset()
+        return Response(status=204)
@@ -0,0 +1,219 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import JsonResponse
+
+from utils.request_user import request_user_id
+
+
+class TokenBucket:
+    """
+    Bucket of up to `capacity` tokens refilled with `rate` tokens per second
+    """
+
+    def __init__(self, capacity, rate, now):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, cost, now) -> float:
+        """
+        Take cost tokens. Returns 0 when admitted, otherwise seconds until enough tokens are available
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class AdmissionStats:
+    """
+    Accepted / shed counters of this process, per endpoint rule
+    """
+
+    events = ('accepted', 'rate_limited', 'overloaded')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self.max_in_flight = 0
+
+    def record(self, endpoint: str, event: str):
+        with self._lock:
+            counters = self._counters.setdefault(endpoint, dict.fromkeys(self.events, 0))
+            counters[event] += 1
+
+    def observe_in_flight(self, in_flight: int):
+        with self._lock:
+            self.max_in_flight = max(self.max_in_flight, in_flight)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            endpoints = {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+            max_in_flight = self.max_in_flight
+        for counters in endpoints.values():
+            total = sum(counters.values())
+            counters['shed_ratio'] = round((total - counters['accepted']) / total, 4) if total else None
+        return {'endpoints': endpoints, 'max_in_flight': max_in_flight}
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self.max_in_flight = 0
+
+
+class AdmissionController:
+    """
+    Per process admission decisions:
+    - every user has token bucket (ADMISSION_BURST tokens, refilled with ADMISSION_RATE per second),
+      request takes as many tokens as its endpoint costs (ADMISSION_ENDPOINT_COSTS, scaled up for deep offsets
+      and pages larger than PAGE_SIZE) - over the budget it gets 429,
+    - at most ADMISSION_MAX_CONCURRENCY requests are processed at once - above it requests are rejected with 503
+      immediately instead of waiting in the worker queue.
+    Users are identified by `user_id` header (client address without it).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._rules = None
+        self.in_flight = 0
+        self.stats = AdmissionStats()
+
+    def rules(self):
+        if self._rules is None:
+            self._rules = [(name, methods, re.compile(pattern), cost)
+                           for name, methods, pattern, cost in settings.ADMISSION_ENDPOINT_COSTS]
+        return self._rules
+
+    def endpoint(self, request):
+        """
+        (endpoint name, cost) of request
+        """
+        for name, methods, pattern, cost in self.rules():
+            if request.method in methods and pattern.match(request.path):
+                break
+        else:
+            name, cost = 'other', settings.ADMISSION_DEFAULT_COST
+        if request.method == 'GET':
+            cost *= max(1.0, self.int_param(request, 'limit') / settings.REST_FRAMEWORK['PAGE_SIZE'])
+            cost += self.int_param(request, 'offset') / settings.ADMISSION_OFFSET_COST_STEP
+        return name, min(cost, settings.ADMISSION_BURST)
+
+    @staticmethod
+    def int_param(request, name) -> int:
+        try:
+            return max(0, int(request.GET.get(name, 0)))
+        except ValueError:
+            return 0
+
+    @staticmethod
+    def user_key(request) -> str:
+        user_id = request_user_id(request)
+        return f'user:{user_id}' if user_id else f'address:{request.META.get("REMOTE_ADDR")}'
+
+    def take_tokens(self, key, cost) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.pop(key, None) or TokenBucket(settings.ADMISSION_BURST, settings.ADMISSION_RATE,
+                                                                 now)
+            self._buckets[key] = bucket  # most recently used last
+            while len(self._buckets) > settings.ADMISSION_MAX_TRACKED_USERS:
+                self._buckets.popitem(last=False)
+            return bucket.take(cost, now)
+
+    def admit(self, request):
+        """
+        Returns rejection response, or None for admitted request - it must be finished with release()
+        """
+        name, cost = self.endpoint(request)
+        with self._lock:
+            overloaded = self.in_flight >= settings.ADMISSION_MAX_CONCURRENCY
+            if not overloaded:
+                self.in_flight += 1
+                in_flight = self.in_flight
+        if overloaded:
+            self.stats.record(name, 'overloaded')
+            return self.reject(503, 'Server is busy, try again later.', settings.ADMISSION_OVERLOAD_RETRY_AFTER)
+
+        wait = self.take_tokens(self.user_key(request), cost)
+        if wait:
+            self.release()
+            self.stats.record(name, 'rate_limited')
+            return self.reject(429, 'Request was throttled.', wait)
+
+        self.stats.observe_in_flight(in_flight)
+        self.stats.record(name, 'accepted')
+        return None
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    @staticmethod
+    def reject(status, detail, retry_after):
+        retry_after = max(1, math.ceil(retry_after))
+        response = JsonResponse({'detail': f'{detail} Expected available in {retry_after} seconds.'}, status=status)
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self._rules = None
+        self.stats.reset()
+
+
+admission_controller = AdmissionController()
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds requests before any work is done for them (see AdmissionController).
+    Disabled with ADMISSION_CONTROL_ENABLED = False, paths in ADMISSION_EXEMPT_PATHS are not limited
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    controller = admission_controller
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def exempt(self, request) -> bool:
+        return not settings.ADMISSION_CONTROL_ENABLED or request.path.startswith(settings.ADMISSION_EXEMPT_PATHS)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.exempt(request):
+            return self.get_response(request)
+        rejection = self.controller.admit(request)
+        if rejection is not None:
+            return rejection
+        try:
+            return self.get_response(request)
+        finally:
+            self.controller.release()
+
+    async def __acall__(self, request):
+        if self.exempt(request):
+            return await self.get_response(request)
+        rejection = self.controller.admit(request)
+        if rejection is not None:
+            return rejection
+        try:
+            return await self.get_response(request)
+        finally:
+            self.controller.release()
@@ -0,0 +1,48 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from project_management_service.db_router import use_primary
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decides per request if reads may go to replicas (see PrimaryReplicaRouter).
+    - Unsafe methods (POST/PATCH/DELETE...) run on primary and set a short living cookie, so next reads of the same
+      client also hit primary until replicas catch up (read-your-writes).
+    - Safe methods with that cookie, or with X-Read-Primary header (for clients without cookie jar), run on primary.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+    cookie_name = 'pms_read_primary'
+    header_name = 'X-Read-Primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with use_primary(self.needs_primary(request)):
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        with use_primary(self.needs_primary(request)):
+            response = await self.get_response(request)
+        return self.process_response(request, response)
+
+    def needs_primary(self, request) -> bool:
+        if request.method not in self.safe_methods:
+            return True
+        return self.cookie_name in request.COOKIES or self.header_name in request.headers
+
+    def process_response(self, request, response):
+        if request.method not in self.safe_methods and settings.REPLICA_STICKY_SECONDS:
+            response.set_cookie(self.cookie_name, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,22 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .admission import admission_controller
+
+
+class AdmissionStatsView(APIView):
+    """
+    Admission control statistics of this process (for staff users)
+    GET - accepted / rate limited / overloaded requests per endpoint, current and max concurrent requests
+    DELETE - reset statistics
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({**admission_controller.stats.snapshot(), 'in_flight': admission_controller.in_flight})
+
+    def delete(self, request):
+        admission_controller.stats.reset()
+        return Response(status=204)
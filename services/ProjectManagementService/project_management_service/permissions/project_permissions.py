@@ -2,6 +2,7 @@ from rest_framework import permissions
 
 from projects_app.models import ProjectMember
 from utils.models_helpers import ProjectRelated
+from utils.request_user import request_user_id
 
 
 def get_project_from_object(obj: ProjectRelated):
@@ -11,38 +12,61 @@ def get_project_from_object(obj: ProjectRelated):
     return obj.get_project()
 
 
-class IsViewerOrDeny(permissions.BasePermission):
+def active_members(user_id, **filters):
+    """
+    Memberships of user in projects not marked for deletion
+    """
+    return ProjectMember.objects.filter(user_id=user_id, project__deleted_at__isnull=True, **filters)
+
+
+class AsyncProjectPermission:
+    """
+    Mixin adding awaitable membership check used by async views.
+    Works on project id, so async views do not have to load related project object
+    """
+    allowed_roles = ()
+
+    async def ahas_project_permission(self, user_id, project_id) -> bool:
+        members = active_members(user_id, project_id=project_id)
+        if self.allowed_roles:
+            members = members.filter(role__in=self.allowed_roles)
+        return await members.aexists()
+
+
+class IsViewerOrDeny(AsyncProjectPermission, permissions.BasePermission):
     """
     Class for checking if user is viewer member of Project
     """
 
     def has_object_permission(self, request, view, obj):
         project = get_project_from_object(obj)
-        user_id = request.headers.get('user_id') # TO DO: When authentication implemented
-        return ProjectMember.objects.filter(user_id=user_id, project=project).exists()
+        user_id = request_user_id(request)
+        return active_members(user_id, project=project).exists()
 
 
-class IsDeveloperOrDeny(permissions.BasePermission):
+class IsDeveloperOrDeny(AsyncProjectPermission, permissions.BasePermission):
     """
     Class for checking if user has at least developers permissions for specific project
     """
+    allowed_roles = (ProjectMember.Role.ADMIN, ProjectMember.Role.DEVELOPER)
 
     def has_object_permission(self, request, view, obj):
         project = get_project_from_object(obj)
-        user_id = request.headers.get('user_id')  # TO DO: When authentication implemented
-        member = ProjectMember.objects.filter(user_id=user_id, project=project).first()
+        user_id = request_user_id(request)
+        member = active_members(user_id, project=project).first()
         if not member: return False
         return member.role in [ProjectMember.Role.ADMIN, ProjectMember.Role.DEVELOPER]
 
 
-class IsAdminOrDeny(permissions.BasePermission):
+class IsAdminOrDeny(AsyncProjectPermission, permissions.BasePermission):
     """
     Class for checking if user has at least developers permissions for specific project
     """
+    allowed_roles = (ProjectMember.Role.ADMIN,)
 
     def has_object_permission(self, request, view, obj):
         project = get_project_from_object(obj)
-        user_id = request.headers.get('user_id')  # TO DO: When authentication implemented
-        member = ProjectMember.objects.filter(user_id=user_id, project=project).first()
+        user_id = request_user_id(request)
+        member = active_members(user_id, project=project).first()
         if not member: return False
         return member.role in [ProjectMember.Role.ADMIN]
\ No newline at end of file
@@ -0,0 +1,77 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+class ProjectVisibility:
+    """
+    Projects visible to user (any membership role), resolved once and cached.
+    List views filter with indexed `project_id IN (...)` instead of correlated Exists subquery per row.
+    For users in very many projects the id list is replaced by uncorrelated membership subquery (semi-join).
+    Cache entries are invalidated after commit of every membership change (see ProjectMember save/delete)
+    and of project soft delete.
+    """
+
+    cache_key_prefix = 'visible-projects'
+
+    @classmethod
+    def cache_key(cls, user_id) -> str:
+        return f'{cls.cache_key_prefix}:{user_id}'
+
+    @classmethod
+    def members(cls, user_id):
+        ProjectMember = apps.get_model('projects_app', 'ProjectMember')
+        return ProjectMember.objects.filter(user_id=user_id, project__deleted_at__isnull=True)
+
+    @classmethod
+    def project_ids(cls, user_id) -> list:
+        if not user_id:
+            return []
+        key = cls.cache_key(user_id)
+        project_ids = cache.get(key)
+        if project_ids is None:
+            project_ids = sorted(cls.members(user_id).values_list('project_id', flat=True))
+            cache.set(key, project_ids, settings.VISIBILITY_CACHE_TIMEOUT)
+        return project_ids
+
+    @classmethod
+    async def aproject_ids(cls, user_id) -> list:
+        if not user_id:
+            return []
+        key = cls.cache_key(user_id)
+        project_ids = await cache.aget(key)
+        if project_ids is None:
+            project_ids = sorted([pid async for pid in cls.members(user_id).values_list('project_id', flat=True)])
+            await cache.aset(key, project_ids, settings.VISIBILITY_CACHE_TIMEOUT)
+        return project_ids
+
+    @classmethod
+    def lookup(cls, user_id, project_ids):
+        if len(project_ids) > settings.VISIBILITY_MAX_INLINE_IDS:
+            return cls.members(user_id).values('project_id')
+        return project_ids
+
+    @classmethod
+    def filter_queryset(cls, queryset, user_id, project_field='project_id'):
+        project_ids = cls.project_ids(user_id)
+        return queryset.filter(**{f'{project_field}__in': cls.lookup(user_id, project_ids)})
+
+    @classmethod
+    async def afilter_queryset(cls, queryset, user_id, project_field='project_id'):
+        project_ids = await cls.aproject_ids(user_id)
+        return queryset.filter(**{f'{project_field}__in': cls.lookup(user_id, project_ids)})
+
+    @classmethod
+    def not_deleted(cls, queryset, project_field='project'):
+        """
+        Rows of projects not marked for deletion - detail views answer 404 for the rest, as lists do not show them
+        """
+        return queryset.filter(**{f'{project_field}__deleted_at__isnull': True})
+
+    @classmethod
+    def invalidate(cls, *user_ids):
+        keys = [cls.cache_key(user_id) for user_id in user_ids if user_id]
+        if keys:
+            # After commit - otherwise concurrent reader could cache membership state from before the change
+            transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,120 @@
+"""
+Database profiles selectable with PMS_DB_PROFILE environment variable.
+
+sqlite   - (default) single file database. WAL journaling, synchronous=NORMAL, mmap and busy timeout are applied
+           on each new connection, write transactions start with BEGIN IMMEDIATE so concurrent writers wait
+           for the lock instead of failing on lock upgrade. PMS_SQLITE_WAL=0 restores default journaling.
+postgres - PostgreSQL through psycopg 3. Pooled connections (psycopg_pool) by default, PMS_DB_POOL=0 switches
+           to persistent connections (CONN_MAX_AGE). Health checks are enabled for both modes.
+
+Read replicas (see db_router.py) are listed in PMS_DB_REPLICAS (comma separated). For sqlite each entry is a path
+to replica file, for postgres each entry is host[:port] of a standby server. Replica aliases are named
+replica_1, replica_2, ... and copy all other settings from the primary.
+"""
+import os
+
+
+def env(name, default=None):
+    return os.environ.get(name, default)
+
+
+def env_int(name, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def env_bool(name, default: bool) -> bool:
+    return os.environ.get(name, str(int(default))).lower() in ('1', 'true', 'yes', 'on')
+
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size={mmap_size}',
+    'PRAGMA busy_timeout={busy_timeout_ms}',
+    'PRAGMA cache_size=-{cache_size_kb}',
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+def sqlite_profile(base_dir):
+    database = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': env('PMS_SQLITE_PATH', base_dir / 'db.sqlite3'),
+        'CONN_MAX_AGE': env_int('PMS_DB_CONN_MAX_AGE', 600),
+        'CONN_HEALTH_CHECKS': True,
+    }
+    if not env_bool('PMS_SQLITE_WAL', True):
+        return database
+
+    busy_timeout = env_int('PMS_SQLITE_BUSY_TIMEOUT', 20)
+    pragmas = '; '.join(SQLITE_PRAGMAS).format(
+        mmap_size=env_int('PMS_SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        busy_timeout_ms=busy_timeout * 1000,
+        cache_size_kb=env_int('PMS_SQLITE_CACHE_SIZE_KB', 64 * 1024),
+    )
+    database['OPTIONS'] = {
+        'timeout': busy_timeout,
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': pragmas,
+    }
+    return database
+
+
+def postgres_profile(base_dir):
+    database = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': env('PMS_DB_NAME', 'project_management'),
+        'USER': env('PMS_DB_USER', 'postgres'),
+        'PASSWORD': env('PMS_DB_PASSWORD', ''),
+        'HOST': env('PMS_DB_HOST', 'localhost'),
+        'PORT': env('PMS_DB_PORT', '5432'),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': env_int('PMS_DB_CONNECT_TIMEOUT', 5),
+        },
+    }
+    if env_bool('PMS_DB_POOL', True):
+        from psycopg_pool import ConnectionPool
+
+        # Django requires CONN_MAX_AGE = 0 when pool is used - pool itself keeps connections alive
+        database['CONN_MAX_AGE'] = 0
+        database['OPTIONS']['pool'] = {
+            'min_size': env_int('PMS_DB_POOL_MIN_SIZE', 2),
+            'max_size': env_int('PMS_DB_POOL_MAX_SIZE', 20),
+            'timeout': env_int('PMS_DB_POOL_TIMEOUT', 10),
+            'max_idle': env_int('PMS_DB_POOL_MAX_IDLE', 300),
+            'max_lifetime': env_int('PMS_DB_POOL_MAX_LIFETIME', 3600),
+            'check': ConnectionPool.check_connection,
+        }
+    else:
+        database['CONN_MAX_AGE'] = env_int('PMS_DB_CONN_MAX_AGE', 600)
+    return database
+
+
+PROFILES = {
+    'sqlite': sqlite_profile,
+    'postgres': postgres_profile,
+}
+
+
+def default_database(base_dir, profile=None):
+    profile = profile or env('PMS_DB_PROFILE', 'sqlite')
+    try:
+        return PROFILES[profile](base_dir)
+    except KeyError:
+        raise ValueError(f'Unknown database profile "{profile}". Use one of: {", ".join(PROFILES)}')
+
+
+def replica_databases(primary: dict) -> dict:
+    replicas = {}
+    entries = [entry.strip() for entry in env('PMS_DB_REPLICAS', '').split(',') if entry.strip()]
+    for index, entry in enumerate(entries, start=1):
+        replica = {**primary, 'OPTIONS': {**primary.get('OPTIONS', {})}, 'TEST': {'MIRROR': 'default'}}
+        if primary['ENGINE'].endswith('sqlite3'):
+            replica['NAME'] = entry
+        else:
+            host, _, port = entry.partition(':')
+            replica['HOST'] = host
+            replica['PORT'] = port or primary['PORT']
+        replicas[f'replica_{index}'] = replica
+    return replicas
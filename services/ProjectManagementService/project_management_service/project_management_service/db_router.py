@@ -0,0 +1,127 @@
+"""
+Primary / replica database routing.
+
+Writes always go to primary ('default'). Reads go to one of settings.DATABASE_REPLICAS unless:
+- current request is pinned to primary (unsafe method, or user wrote recently - see ReplicaRoutingMiddleware),
+  as are background management commands (use_primary),
+- primary connection is inside transaction - rows read there are written back (archive, counters, deletion),
+- replica lags behind primary more than REPLICA_MAX_LAG_SECONDS (or lag cannot be measured).
+Without configured replicas everything is routed to primary.
+"""
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections, DatabaseError
+
+PRIMARY = 'default'
+
+_pinned_to_primary = ContextVar('pinned_to_primary', default=False)
+
+
+def is_pinned_to_primary() -> bool:
+    return _pinned_to_primary.get()
+
+
+@contextmanager
+def use_primary(pinned: bool = True):
+    """
+    Routes reads inside the block to primary (or lets them go to replicas with pinned=False).
+    Used by requests pinned by ReplicaRoutingMiddleware and by background management commands - their reads feed
+    their writes (rows to archive, counters to fix, jobs to claim), so they must never come from lagging replica
+    """
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def measure_replica_lag(alias: str) -> float:
+    """
+    Replication lag of replica in seconds.
+    PostgreSQL standby reports time since last replayed transaction. SQLite replicas are file copies made by
+    sync_sqlite_replicas command - lag is how much newer primary file (with its WAL) is than the replica file.
+    """
+    connection = connections[alias]
+    if connection.vendor == 'sqlite':
+        return sqlite_file_lag(connections[PRIMARY].settings_dict['NAME'], connection.settings_dict['NAME'])
+    if connection.vendor != 'postgresql':
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT CASE WHEN pg_is_in_recovery() "
+            "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+        )
+        return float(cursor.fetchone()[0])
+
+
+def sqlite_file_lag(primary_path, replica_path) -> float:
+    primary_files = [str(primary_path), f'{primary_path}-wal']
+    primary_modified = max(os.path.getmtime(path) for path in primary_files if os.path.exists(path))
+    return max(0.0, primary_modified - os.path.getmtime(replica_path))
+
+
+class ReplicaLagMonitor:
+    """
+    Caches replica lag for REPLICA_LAG_CHECK_INTERVAL seconds, so lag query is not executed on each read
+    """
+
+    def __init__(self, measure=measure_replica_lag):
+        self.measure = measure
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def is_healthy(self, alias: str) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            lag, checked_at = self._checked.get(alias, (None, None))
+        if checked_at is None or now - checked_at > settings.REPLICA_LAG_CHECK_INTERVAL:
+            try:
+                lag = self.measure(alias)
+            except (DatabaseError, OSError):
+                lag = float('inf')
+            with self._lock:
+                self._checked[alias] = (lag, now)
+        return lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    def reset(self):
+        with self._lock:
+            self._checked.clear()
+
+
+class PrimaryReplicaRouter:
+
+    lag_monitor = ReplicaLagMonitor()
+
+    def __init__(self):
+        self._next = itertools.count()
+
+    def replicas(self):
+        return getattr(settings, 'DATABASE_REPLICAS', [])
+
+    def db_for_read(self, model, **hints):
+        replicas = self.replicas()
+        if not replicas or is_pinned_to_primary() or connections[PRIMARY].in_atomic_block:
+            return PRIMARY
+        # Round robin starting point, then first replica that is not lagging
+        start = next(self._next)
+        for offset in range(len(replicas)):
+            alias = replicas[(start + offset) % len(replicas)]
+            if self.lag_monitor.is_healthy(alias):
+                return alias
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # All aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
+from .database import default_database, replica_databases
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,17 +45,34 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'projects_app',
     'sprints_app',
-    'tasks_app'
+    'tasks_app',
+    'caching'
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
-    'PAGE_SIZE': 100
+    'PAGE_SIZE': 100,
+    # Compact formats for service clients, selected with Accept / Content-Type (utils/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'utils.renderers.MessagePackRenderer',
+        'utils.renderers.ColumnarJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+        'utils.parsers.MessagePackParser',
+        # utils.parsers.ColumnarJSONParser is added only by views taking list bodies (e.g. ProjectMembersView)
+    ],
 }
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'middleware.admission.AdmissionControlMiddleware',
+    'middleware.replica_routing.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -82,13 +103,135 @@ WSGI_APPLICATION = 'project_management_service.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Profile selected with PMS_DB_PROFILE (sqlite / postgres), see database.py
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': default_database(BASE_DIR)
 }
+DATABASES.update(replica_databases(DATABASES['default']))
+
+# Safe-method requests read from replicas, see db_router.py
+DATABASE_ROUTERS = ['project_management_service.db_router.PrimaryReplicaRouter']
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+REPLICA_STICKY_SECONDS = int(os.environ.get('PMS_REPLICA_STICKY_SECONDS', 5))
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('PMS_REPLICA_MAX_LAG_SECONDS', 2))
+REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('PMS_REPLICA_LAG_CHECK_INTERVAL', 5))
+
+# Caches. Local memory by default, PMS_CACHE_URL (e.g. redis://host:6379/0) switches to shared Redis backend
+# (requires redis package) - needed when more than one process serves requests (visibility, project generations)
+if os.environ.get('PMS_CACHE_URL'):
+    CACHES = {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['PMS_CACHE_URL'],
+            'KEY_PREFIX': alias,
+        } for alias in ('default', 'responses')
+    }
+else:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'default'},
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'responses',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+
+# Cached per user visible project ids, see permissions/visibility.py
+VISIBILITY_CACHE_TIMEOUT = 300
+VISIBILITY_MAX_INLINE_IDS = 1000
+
+# Max embedded objects of each kind in task details with include= (default / upper bound of include_limit)
+TASK_INCLUDE_LIMIT = 50
+TASK_INCLUDE_MAX_LIMIT = 200
+
+# Max task ids in one /tasks/batch/ request
+TASK_BATCH_MAX_IDS = 5000
+
+# Bulk field edit /tasks/bulk/ (tasks_app/services/task_bulk_edit.py) - max tasks in one request, rows read and
+# written per query
+TASK_BULK_EDIT_MAX_ITEMS = 1000
+TASK_BULK_EDIT_BATCH_SIZE = 500
+
+# Admission control (middleware/admission.py). Per user token bucket: ADMISSION_BURST tokens refilled with
+# ADMISSION_RATE tokens per second, request costs tokens of first matching (name, methods, path regex, cost) rule.
+# GET cost grows with limit above PAGE_SIZE and with offset (1 token per ADMISSION_OFFSET_COST_STEP rows).
+# Over ADMISSION_MAX_CONCURRENCY requests in process new ones get 503 at once. Limits are per process
+ADMISSION_CONTROL_ENABLED = True
+ADMISSION_RATE = 20
+ADMISSION_BURST = 100
+ADMISSION_MAX_CONCURRENCY = 64
+ADMISSION_MAX_TRACKED_USERS = 10000
+ADMISSION_OVERLOAD_RETRY_AFTER = 1
+ADMISSION_OFFSET_COST_STEP = 1000
+ADMISSION_DEFAULT_COST = 1
+ADMISSION_ENDPOINT_COSTS = [
+    ('list', ('GET',), r'^/(async/)?(projects|sprints|tasks)/$', 5),
+    ('comments_list', ('GET',), r'^/(async/)?tasks/[^/]+/comments/$', 3),
+    ('batch', ('POST',), r'^/tasks/batch/$', 10),
+    ('workload', ('GET',), r'^/projects/[^/]+/workload/$', 5),
+    ('write', ('POST', 'PUT', 'PATCH', 'DELETE'), r'^/', 2),
+    ('detail', ('GET', 'HEAD'), r'^/', 1),
+]
+ADMISSION_EXEMPT_PATHS = ('/admin/', '/cache/stats/', '/admission/stats/')
+
+# Task archiving (tasks_app/services/task_archive.py, archive_tasks command): tasks of sprints closed longer than
+# ARCHIVE_SPRINT_RETENTION_DAYS and tasks closed longer than ARCHIVE_TASK_RETENTION_DAYS
+ARCHIVE_SPRINT_RETENTION_DAYS = 90
+ARCHIVE_TASK_RETENTION_DAYS = 180
+ARCHIVE_BATCH_SIZE = 500
+
+# Rows removed in one transaction by background project deletion (process_project_deletions command).
+# Running job without heartbeat (saved after every chunk) for PROJECT_DELETION_HEARTBEAT_TIMEOUT is taken over
+# by another worker - its worker is considered dead
+PROJECT_DELETION_CHUNK_SIZE = 1000
+PROJECT_DELETION_HEARTBEAT_TIMEOUT = timedelta(minutes=5)
+
+# Online move of existing PostgreSQL database to integer task keys (tasks_app/services/task_key_migration.py,
+# migrate_task_keys command): rows updated in one transaction by backfill, max wait for table locks in DDL
+TASK_KEY_MIGRATION_BATCH_SIZE = 5000
+TASK_KEY_MIGRATION_LOCK_TIMEOUT = '5s'
+
+# Online move of existing PostgreSQL database from varchar choice values to small integer codes
+# (utils/choice_code_migration.py, migrate_choice_codes command) - as above
+CHOICE_CODE_MIGRATION_BATCH_SIZE = 5000
+CHOICE_CODE_MIGRATION_LOCK_TIMEOUT = '5s'
+
+# Due date events (tasks_app/services/due_date_scheduler.py, run_due_date_scheduler command): due soon event fires
+# DUE_SOON_WINDOW before due date, scheduler keeps events of next DUE_DATE_SCHEDULER_HORIZON in memory
+DUE_SOON_WINDOW = timedelta(hours=24)
+DUE_DATE_SCHEDULER_HORIZON = timedelta(minutes=5)
+
+# Saved task filters with materialized results (tasks_app/services/saved_filters.py) - every task write evaluates
+# filters of its project, so their number per user is bounded
+SAVED_FILTER_MAX_PER_USER = 50
+SAVED_FILTER_BATCH_SIZE = 1000
+
+# Dependency graphs of this many projects kept in memory of each process (tasks_app/services/task_dependencies.py)
+DEPENDENCY_GRAPH_CACHE_PROJECTS = 1000
+
+# Task query language of GET /tasks/?q= (tasks_app/services/task_query.py) - parsed and compiled plans of this many
+# distinct queries kept in memory of each process
+TASK_QUERY_CACHE_SIZE = 1000
+TASK_QUERY_MAX_LENGTH = 2000
+
+# Workload of projects with at least WORKLOAD_SNAPSHOT_MIN_OPEN_TASKS open tasks is served from snapshot refreshed
+# every WORKLOAD_SNAPSHOT_TIMEOUT seconds (projects_app/services/workload.py)
+WORKLOAD_SNAPSHOT_MIN_OPEN_TASKS = 20000
+WORKLOAD_SNAPSHOT_TIMEOUT = 300
+
+# Compiled read path for list endpoints (utils/fast_serializers.py)
+FAST_READ_SERIALIZERS = True
+FAST_SERIALIZER_BATCH_SIZE = 1000
+
+# Versioned GET response cache, see caching/response_cache.py
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_TIMEOUT = 300
+RESPONSE_CACHE_MAX_PROJECTS = 500  # Users seeing more projects bypass the cache (too many generation lookups)
+
+# Single flight for identical concurrent GETs (caching/single_flight.py) - max seconds follower waits for leader
+COALESCE_REQUESTS = True
+COALESCE_WAIT_TIMEOUT = 5
 
 
 # Password validation
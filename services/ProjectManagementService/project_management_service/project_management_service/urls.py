@@ -17,9 +17,17 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from caching.views import ResponseCacheStatsView
+from middleware.views import AdmissionStatsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('projects/', include('projects_app.urls')),
     path('sprints/', include('sprints_app.urls')),
-    path('tasks/', include('tasks_app.urls'))
+    path('tasks/', include('tasks_app.urls')),
+    path('async/projects/', include('projects_app.async_urls')),
+    path('async/sprints/', include('sprints_app.async_urls')),
+    path('async/tasks/', include('tasks_app.async_urls')),
+    path('cache/stats/', ResponseCacheStatsView.as_view()),
+    path('admission/stats/', AdmissionStatsView.as_view()),
 ]
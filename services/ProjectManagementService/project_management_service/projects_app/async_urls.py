@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .async_views import AsyncProjectMembersView
+
+urlpatterns = [
+    path('<str:project_id>/members/', AsyncProjectMembersView.as_view())
+]
@@ -0,0 +1,23 @@
+from .models import Project, ProjectMember
+from .serializers import ProjectMemberSerializer
+
+from permissions.project_permissions import IsViewerOrDeny
+from utils.async_views import AsyncReadView
+
+
+class AsyncProjectMembersView(AsyncReadView):
+    """
+    Async variant of ProjectMembersView GET. List of members in specific project (for viewers)
+    """
+
+    permission_classes = [IsViewerOrDeny]
+    serializer_class = ProjectMemberSerializer
+
+    async def get(self, request, project_id):
+        project = await self.get_object_or_404(Project.objects.all(), id=project_id)
+        await self.check_project_permissions(project.pk)
+        members = ProjectMember.objects.filter(project_id=project.pk)
+        role_param = request.GET.get('role', None)
+        if role_param:
+            members = members.filter(role=role_param) if role_param in ProjectMember.Role.values else members.none()
+        return self.render(await self.serialize([m async for m in members], many=True))
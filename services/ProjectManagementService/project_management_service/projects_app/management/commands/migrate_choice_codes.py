@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.choice_code_migration import ChoiceCodeMigration, ChoiceCodeMigrationError
+
+
+class Command(BaseCommand):
+    help = ("Move existing PostgreSQL database from varchar choice values (task status / priority / type, sprint "
+            "status, member role) to small integer codes, online. Run phases in order: prepare, backfill (safe to "
+            "interrupt and run again), swap (short table locks, deploy new code right after), validate. "
+            "status shows rows left for backfill")
+
+    def add_arguments(self, parser):
+        parser.add_argument('phase', choices=[*ChoiceCodeMigration.phases, 'status'])
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        try:
+            migration = ChoiceCodeMigration(using=options['database'])
+            getattr(self, options['phase'])(migration, options)
+        except ChoiceCodeMigrationError as e:
+            raise CommandError(str(e))
+
+    def prepare(self, migration, options):
+        migration.prepare()
+        self.stdout.write(self.style.SUCCESS("Prepared. Run backfill"))
+
+    def backfill(self, migration, options):
+        updated = migration.backfill(
+            batch_size=options['batch_size'],
+            progress=lambda column, total: self.stdout.write(f"{column}: updated {total} rows"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Done. Updated {updated} rows, indexes are built. Run swap"))
+
+    def swap(self, migration, options):
+        migration.swap()
+        self.stdout.write(self.style.SUCCESS("Swapped. Deploy code with choice codes, then run validate"))
+
+    def validate(self, migration, options):
+        for constraint in migration.validate():
+            self.stdout.write(f"Validated {constraint}")
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def status(self, migration, options):
+        pending = migration.status()
+        if not pending:
+            self.stdout.write("Swapped")
+        for name, rows in pending.items():
+            self.stdout.write(f"{name}: {rows} rows left")
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from project_management_service.db_router import use_primary
+from projects_app.services.project_deletion import ProjectDeletion
+
+
+class Command(BaseCommand):
+    help = "Remove rows of soft deleted projects in chunks (unfinished and failed jobs are resumed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--max-jobs', type=int, default=None)
+
+    def handle(self, *args, **options):
+        with use_primary():
+            jobs = ProjectDeletion.pending_jobs()
+            if options['max_jobs']:
+                jobs = jobs[:options['max_jobs']]
+
+            done = failed = skipped = 0
+            for job in jobs:
+                self.stdout.write(f"Deleting project {job.project_id} (job {job.pk})")
+                try:
+                    if ProjectDeletion.run(job, chunk_size=options['chunk_size'], progress=self.report) is None:
+                        skipped += 1
+                        self.stdout.write(f"Job {job.pk} is run by other worker")
+                    else:
+                        done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Job {job.pk} failed: {e}")
+            self.stdout.write(self.style.SUCCESS(f"Done. Finished {done} jobs, failed {failed}, "
+                                                 f"skipped {skipped}"))
+
+    def report(self, job):
+        self.stdout.write(f"  {job.step}: {job.deleted_rows}/{job.total_rows} rows ({job.get_progress():.1%})")
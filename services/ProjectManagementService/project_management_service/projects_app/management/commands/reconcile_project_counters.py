@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from project_management_service.db_router import use_primary
+from projects_app.models import Project
+from projects_app.services.project_counters import ProjectCounters
+
+
+class Command(BaseCommand):
+    help = "Recompute denormalized Project counters (tasks per status, open sprints, members) and fix drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--project', action='append', dest='projects', help="Only given project id(s)")
+
+    def handle(self, *args, **options):
+        with use_primary():
+            batch_size = options['batch_size']
+            project_ids = Project.objects.order_by('pk').values_list('pk', flat=True)
+            if options['projects']:
+                project_ids = project_ids.filter(pk__in=options['projects'])
+
+            checked = fixed = 0
+            last_pk = None
+            while True:
+                # Keyset pagination - each batch is short transaction holding locks only on its projects
+                batch = project_ids.filter(pk__gt=last_pk) if last_pk is not None else project_ids
+                batch = list(batch[:batch_size])
+                if not batch:
+                    break
+                fixed += ProjectCounters.reconcile(batch)
+                checked += len(batch)
+                last_pk = batch[-1]
+                self.stdout.write(f"Checked {checked} projects, fixed {fixed}")
+
+            self.stdout.write(self.style.SUCCESS(f"Done. Checked {checked} projects, fixed {fixed}"))
@@ -0,0 +1,26 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Copy primary SQLite database into replica files (PMS_DB_REPLICAS). For local replica routing setup."
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if not primary['ENGINE'].endswith('sqlite3'):
+            raise CommandError("Primary database is not SQLite - use database server replication instead")
+
+        source = sqlite3.connect(primary['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    # Online backup API - consistent snapshot even while primary is being written
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"{alias}: synced from {primary['NAME']}")
+        finally:
+            source.close()
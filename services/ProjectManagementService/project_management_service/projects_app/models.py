@@ -1,12 +1,39 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinLengthValidator
 
-from utils.models_helpers import ProjectRelated
+from .services.project_counters import ProjectCounters
+from permissions.visibility import ProjectVisibility
+from utils.models_helpers import ChoiceCodeField, ChoiceCodes, ProjectRelated
+
+class ActiveProjectManager(models.Manager):
+    """
+    Projects not marked for deletion
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Project(models.Model, ProjectRelated):
     id = models.CharField(max_length=3, primary_key=True, validators=[MinLengthValidator(3)])
     project_name = models.CharField(max_length=25, blank=False, validators=[MinLengthValidator(3)])
     last_task_index = models.PositiveIntegerField(default=0)
+    # Moved forward with every change of task dependency links (see tasks_app/services/task_dependencies.py)
+    dependency_version = models.PositiveBigIntegerField(default=0)
+
+    # Set by soft delete (see services/project_deletion.py) - rows are then removed by background job
+    deleted_at = models.DateTimeField(null=True, blank=True)
+
+    # Denormalized counters, maintained by ProjectCounters (fix drift with reconcile_project_counters command)
+    to_do_task_count = models.PositiveIntegerField(default=0)
+    in_progress_task_count = models.PositiveIntegerField(default=0)
+    in_review_task_count = models.PositiveIntegerField(default=0)
+    closed_task_count = models.PositiveIntegerField(default=0)
+    open_sprint_count = models.PositiveIntegerField(default=0)
+    member_count = models.PositiveIntegerField(default=0)
+
+    objects = ActiveProjectManager()
+    all_objects = models.Manager()
 
     # sprints - Sprint model. 1 Project have many sprints. 1 Sprint have 1 Project
     # tasks - Task model. 1 Project have many tasks. 1 Task have 1 project
@@ -15,6 +42,8 @@ class Project(models.Model, ProjectRelated):
 
     def get_members(self, role=None):
         if role:
+            if role not in ProjectMember.Role.values:
+                return ProjectMember.objects.none()
             return ProjectMember.objects.filter(project=self, role=role)
         else:
             return ProjectMember.objects.filter(project=self)
@@ -26,10 +55,13 @@ class Project(models.Model, ProjectRelated):
             return None
 
     def add_member(self, user_id: str, role):
-        return ProjectMember.objects.get_or_create(project=self, user_id=user_id, role=role)
+        return ProjectMember.objects.get_or_create(project=self, user_id=user_id, defaults={"role": role})
 
     def remove_member(self, user_id: str):
-        ProjectMember.objects.filter(project=self, user_id=user_id).delete()
+        with transaction.atomic():
+            deleted, _ = ProjectMember.objects.filter(project=self, user_id=user_id).delete()
+            ProjectCounters.members_changed(self.pk, -deleted)
+            ProjectVisibility.invalidate(user_id)
 
     def get_project(self):
         return self
@@ -44,12 +76,75 @@ class ProjectMember(models.Model, ProjectRelated):
         DEVELOPER = 'Developer', 'Developer'
         ADMIN = 'Admin', 'Admin'
 
-    role = models.CharField(choices=Role.choices,
-                              default=Role.DEVELOPER,
-                              blank=False)
+    # Stored in database - never renumber
+    ROLE_CODES = ChoiceCodes(Role, {
+        Role.VIEWER: 1,
+        Role.DEVELOPER: 2,
+        Role.ADMIN: 3,
+    })
+
+    role = ChoiceCodeField(codes=ROLE_CODES,
+                           default=Role.DEVELOPER,
+                           blank=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'user_id'], name='unique_project_member')
+        ]
+        indexes = [
+            # Visible projects lookup by user (ProjectVisibility)
+            models.Index(fields=['user_id', 'project'], name='member_user_project_idx')
+        ]
 
     def get_role(self) -> Role:
         return self.Role(self.role)
 
     def get_project(self):
-        return self.project
\ No newline at end of file
+        return self.project
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            adding = self._state.adding
+            super().save(*args, **kwargs)
+            if adding:
+                ProjectCounters.members_changed(self.project_id, 1)
+            ProjectVisibility.invalidate(self.user_id)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            ProjectCounters.members_changed(self.project_id, -1)
+            ProjectVisibility.invalidate(self.user_id)
+        return result
+
+
+class ProjectDeletionJob(models.Model):
+    """
+    Progress of background removal of soft deleted project (see services/project_deletion.py)
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'Pending', 'Pending'
+        RUNNING = 'Running', 'Running'
+        FAILED = 'Failed', 'Failed'
+        DONE = 'Done', 'Done'
+
+    id = models.AutoField(primary_key=True)
+    project_id = models.CharField(max_length=3)  # Not a foreign key - job outlives the project
+    requested_by = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    step = models.CharField(max_length=32, blank=True)
+    total_rows = models.PositiveIntegerField(null=True)
+    deleted_rows = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    heartbeat_at = models.DateTimeField(null=True)  # Last progress of running job
+    finished_at = models.DateTimeField(null=True)
+
+    def get_progress(self):
+        if self.status == self.Status.DONE:
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return round(min(self.deleted_rows / self.total_rows, 1.0), 4)
@@ -1,25 +1,102 @@
+from django.core.validators import MinLengthValidator
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
-from .models import Project, ProjectMember
+from .models import Project, ProjectMember, ProjectDeletionJob
+from .services.project_counters import ProjectCounters
+from caching.generations import ProjectGenerations
+from permissions.visibility import ProjectVisibility
+from tasks_app.models import Task
+
+MEMBERS_BATCH_SIZE = 500
 
 
 class ProjectSerializer(serializers.ModelSerializer):
+    """
+    Counters (task_counts, open_sprint_count, member_count) are optional - included only with
+    'include_counters' in context
+    """
+
+    task_counts = serializers.SerializerMethodField()
+
     class Meta:
         model = Project
-        fields = ['id', 'project_name']
+        fields = ['id', 'project_name', 'task_counts', 'open_sprint_count', 'member_count']
+        read_only_fields = ['open_sprint_count', 'member_count']
+        extra_kwargs = {
+            # Id of soft deleted project is taken until its rows are removed
+            'id': {'validators': [MinLengthValidator(3), UniqueValidator(queryset=Project.all_objects.all())]},
+        }
+
+    counter_fields = ['task_counts', 'open_sprint_count', 'member_count']
 
     def get_fields(self):
         fields = super().get_fields()
 
         if self.instance is not None:
             fields['id'].read_only = True
+        if not self.context.get('include_counters'):
+            for field in self.counter_fields:
+                fields.pop(field)
         return fields
 
+    def get_task_counts(self, obj):
+        return {status: getattr(obj, field) for status, field in ProjectCounters.task_status_fields.items()}
+
+
+class ProjectMemberListSerializer(serializers.ListSerializer):
+    """
+    Bulk membership upsert used by ProjectMemberSerializer(many=True).
+    One query for existing members, bulk insert of new ones and bulk update of changed roles - in one transaction.
+    Insert uses ON CONFLICT update, so member added concurrently by other request does not fail whole batch.
+    """
+
+    def create(self, validated_data):
+        project = self.context.get("project")
+        roles = {item['user_id']: item['role'] for item in validated_data}  # Last entry wins for duplicated user
+
+        with transaction.atomic():
+            existing = {}
+            user_ids = list(roles)
+            for i in range(0, len(user_ids), MEMBERS_BATCH_SIZE):
+                existing.update(
+                    (member.user_id, member) for member in
+                    ProjectMember.objects.filter(project=project, user_id__in=user_ids[i:i + MEMBERS_BATCH_SIZE])
+                )
+
+            new_members = [ProjectMember(project=project, user_id=user_id, role=role)
+                           for user_id, role in roles.items() if user_id not in existing]
+            changed_members = []
+            for user_id, member in existing.items():
+                if member.role != roles[user_id]:
+                    member.role = roles[user_id]
+                    changed_members.append(member)
+
+            ProjectMember.objects.bulk_create(
+                new_members,
+                batch_size=MEMBERS_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=['project', 'user_id'],
+                update_fields=['role']
+            )
+            ProjectMember.objects.bulk_update(changed_members, ['role'], batch_size=MEMBERS_BATCH_SIZE)
+            if new_members or changed_members:
+                ProjectGenerations.bump(project.pk)
+            if new_members:
+                # Conflicting inserts (concurrent request) are not known here - count instead of incrementing
+                ProjectCounters.recount_members(project.pk)
+                ProjectVisibility.invalidate(*(member.user_id for member in new_members))
+
+        members = {member.user_id: member for member in [*existing.values(), *new_members]}
+        return [members[user_id] for user_id in roles]
+
 
 class ProjectMemberSerializer(serializers.ModelSerializer):
     class Meta:
         model = ProjectMember
         fields = ['user_id', 'role', 'project']
+        list_serializer_class = ProjectMemberListSerializer
 
         extra_kwargs = {
             "project": {"read_only": True}
@@ -44,5 +121,33 @@ class ProjectMemberRemoveSerializer(serializers.Serializer):
     def save(self):
         project = self.context.get('project')
         users = self.validated_data.get('users')
-        deleted, _ = ProjectMember.objects.filter(project=project, user_id__in=users).delete()
+        deleted = 0
+        with transaction.atomic():
+            for i in range(0, len(users), MEMBERS_BATCH_SIZE):
+                batch_deleted, _ = ProjectMember.objects.filter(
+                    project=project, user_id__in=users[i:i + MEMBERS_BATCH_SIZE]
+                ).delete()
+                deleted += batch_deleted
+            ProjectCounters.members_changed(project.pk, -deleted)
+            ProjectVisibility.invalidate(*users)
         return deleted
+
+
+class ProjectDeletionJobSerializer(serializers.ModelSerializer):
+    progress = serializers.FloatField(source='get_progress', read_only=True)
+
+    class Meta:
+        model = ProjectDeletionJob
+        fields = ['id', 'project_id', 'status', 'step', 'total_rows', 'deleted_rows', 'progress', 'error',
+                  'requested_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+
+class WorkloadQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of workload endpoint. snapshot - true / false forces the mode, by default it depends
+    on project size (see services/workload.py)
+    """
+    sprint = serializers.IntegerField(required=False)
+    priority = serializers.MultipleChoiceField(choices=Task.Priority.choices, required=False)
+    snapshot = serializers.BooleanField(required=False, allow_null=True, default=None)
@@ -0,0 +1,121 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F, Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+class ProjectCounters:
+    """
+    Maintains denormalized counters on Project. Methods are called inside the transaction of the write
+    that changes counted rows (see save/delete of Task, Sprint and ProjectMember)
+    """
+
+    task_status_fields = {
+        Status.TO_DO: 'to_do_task_count',
+        Status.IN_PROGRESS: 'in_progress_task_count',
+        Status.IN_REVIEW: 'in_review_task_count',
+        Status.CLOSED: 'closed_task_count',
+    }
+    open_sprint_statuses = (SprintStatus.CREATED, SprintStatus.STARTED)
+
+    counter_fields = (*task_status_fields.values(), 'open_sprint_count', 'member_count')
+
+    @classmethod
+    def apply(cls, project_id, deltas: dict):
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if project_id is None or not deltas:
+            return
+        Project = apps.get_model('projects_app', 'Project')
+        # Drifted counter may already be 0 - clamped instead of failing the write (reconcile fixes the drift)
+        Project.objects.filter(pk=project_id).update(**{
+            field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0) for field, delta in deltas.items()
+        })
+
+    @classmethod
+    def move(cls, previous, current, field_for):
+        """
+        previous / current - (project_id, status) of counted row before and after write (None if row not exists)
+        """
+        if previous == current:
+            return
+        if previous and field_for(previous[1]):
+            cls.apply(previous[0], {field_for(previous[1]): -1})
+        if current and field_for(current[1]):
+            cls.apply(current[0], {field_for(current[1]): 1})
+
+    @classmethod
+    def task_field(cls, status):
+        return cls.task_status_fields.get(status)
+
+    @classmethod
+    def sprint_field(cls, status):
+        return 'open_sprint_count' if status in cls.open_sprint_statuses else None
+
+    @classmethod
+    def task_changed(cls, previous, current):
+        cls.move(previous, current, cls.task_field)
+
+    @classmethod
+    def sprint_changed(cls, previous, current):
+        cls.move(previous, current, cls.sprint_field)
+
+    @classmethod
+    def members_changed(cls, project_id, delta: int):
+        cls.apply(project_id, {'member_count': delta})
+
+    @classmethod
+    def count(cls, project_ids) -> dict:
+        """
+        Real counter values for given projects computed from counted tables (grouped queries, not per project)
+        """
+        Task = apps.get_model('tasks_app', 'Task')
+        Sprint = apps.get_model('sprints_app', 'Sprint')
+        ProjectMember = apps.get_model('projects_app', 'ProjectMember')
+
+        counts = {project_id: dict.fromkeys(cls.counter_fields, 0) for project_id in project_ids}
+        tasks = (Task.objects.filter(project_id__in=project_ids)
+                 .values_list('project_id', 'status').annotate(total=Count('pk')).order_by())
+        for project_id, status, total in tasks:
+            if cls.task_field(status):
+                counts[project_id][cls.task_field(status)] = total
+        sprints = (Sprint.objects.filter(project_id__in=project_ids, status__in=cls.open_sprint_statuses)
+                   .values_list('project_id').annotate(total=Count('pk')).order_by())
+        for project_id, total in sprints:
+            counts[project_id]['open_sprint_count'] = total
+        members = (ProjectMember.objects.filter(project_id__in=project_ids)
+                   .values_list('project_id').annotate(total=Count('pk')).order_by())
+        for project_id, total in members:
+            counts[project_id]['member_count'] = total
+        return counts
+
+    @classmethod
+    def recount_members(cls, project_id):
+        ProjectMember = apps.get_model('projects_app', 'ProjectMember')
+        Project = apps.get_model('projects_app', 'Project')
+        members = (ProjectMember.objects.filter(project_id=OuterRef('pk'))
+                   .values('project_id').annotate(total=Count('pk')).values('total'))
+        Project.objects.filter(pk=project_id).update(member_count=Coalesce(Subquery(members), 0))
+
+    @classmethod
+    def reconcile(cls, project_ids) -> int:
+        """
+        Fix drifted counters of given projects. Rows are locked, so concurrent writes wait for the recount.
+        Returns number of fixed projects
+        """
+        Project = apps.get_model('projects_app', 'Project')
+        with transaction.atomic():
+            projects = list(Project.objects.select_for_update().filter(pk__in=project_ids)
+                            .only('pk', *cls.counter_fields))
+            counts = cls.count([project.pk for project in projects])
+            drifted = []
+            for project in projects:
+                real = counts[project.pk]
+                if any(getattr(project, field) != value for field, value in real.items()):
+                    for field, value in real.items():
+                        setattr(project, field, value)
+                    drifted.append(project)
+            Project.objects.bulk_update(drifted, cls.counter_fields)
+        return len(drifted)
@@ -0,0 +1,167 @@
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from permissions.visibility import ProjectVisibility
+from tasks_app.services.saved_filters import SavedFilters
+from utils.models_helpers import delete_in_chunks
+
+
+class ProjectDeletion:
+    """
+    Two phase deletion of projects.
+    1. request() - in the request: project is marked deleted, which makes it invisible at once (Project.objects,
+       ProjectVisibility and permission checks skip it), and ProjectDeletionJob is queued.
+    2. run() - in background (process_project_deletions command): related rows are removed step by step in
+       chunks of raw DELETE by primary key (no collector, no objects loaded), each chunk in its own short
+       transaction. Progress is saved after every chunk. Steps only select rows that still exist,
+       so interrupted or failed job continues where it stopped.
+    Job is claimed by conditional UPDATE of its status, so concurrent workers never run the same job. Running job
+    is left alone until its heartbeat (saved with progress) is older than PROJECT_DELETION_HEARTBEAT_TIMEOUT.
+    """
+
+    @classmethod
+    def request(cls, project, user_id):
+        ProjectDeletionJob = apps.get_model('projects_app', 'ProjectDeletionJob')
+        with transaction.atomic():
+            project.deleted_at = timezone.now()
+            project.save(update_fields=['deleted_at'])
+            ProjectVisibility.invalidate(*project.members.values_list('user_id', flat=True))
+            return ProjectDeletionJob.objects.create(project_id=project.pk, requested_by=user_id or '')
+
+    @classmethod
+    def steps(cls, project_id):
+        """
+        (name, queryset) in deletion order - rows referencing other rows first
+        """
+        Project = apps.get_model('projects_app', 'Project')
+        ProjectMember = apps.get_model('projects_app', 'ProjectMember')
+        Sprint = apps.get_model('sprints_app', 'Sprint')
+        SprintSummary = apps.get_model('sprints_app', 'SprintSummary')
+        Task = apps.get_model('tasks_app', 'Task')
+        Comment = apps.get_model('tasks_app', 'Comment')
+        TaskObserver = apps.get_model('tasks_app', 'TaskObserver')
+        TaskDueNotification = apps.get_model('tasks_app', 'TaskDueNotification')
+        TaskDependency = apps.get_model('tasks_app', 'TaskDependency')
+        SavedFilter = apps.get_model('tasks_app', 'SavedFilter')
+        SavedFilterResult = apps.get_model('tasks_app', 'SavedFilterResult')
+        ArchivedTask = apps.get_model('tasks_app', 'ArchivedTask')
+        ArchivedComment = apps.get_model('tasks_app', 'ArchivedComment')
+        ArchivedTaskObserver = apps.get_model('tasks_app', 'ArchivedTaskObserver')
+
+        return [
+            ('comments', Comment.objects.filter(task__project_id=project_id)),
+            ('observers', TaskObserver.objects.filter(task__project_id=project_id)),
+            ('due_notifications', TaskDueNotification.objects.filter(task__project_id=project_id)),
+            ('dependencies', TaskDependency.objects.filter(project_id=project_id)),
+            ('saved_filter_results', SavedFilterResult.objects.filter(
+                Q(task__project_id=project_id) | Q(saved_filter__project_id=project_id))),
+            ('saved_filters', SavedFilter.objects.filter(project_id=project_id)),
+            ('task_sprints', Task.sprint.through.objects.filter(
+                Q(task__project_id=project_id) | Q(sprint__project_id=project_id))),
+            ('tasks', Task.objects.filter(project_id=project_id)),
+            ('archived_comments', ArchivedComment.objects.filter(task__project_id=project_id)),
+            ('archived_observers', ArchivedTaskObserver.objects.filter(task__project_id=project_id)),
+            ('archived_task_sprints', ArchivedTask.sprint.through.objects.filter(
+                Q(archivedtask__project_id=project_id) | Q(sprint__project_id=project_id))),
+            ('archived_tasks', ArchivedTask.objects.filter(project_id=project_id)),
+            ('sprint_summaries', SprintSummary.objects.filter(project_id=project_id)),
+            ('sprints', Sprint.objects.filter(project_id=project_id)),
+            ('members', ProjectMember.objects.filter(project_id=project_id)),
+            ('project', Project.all_objects.filter(pk=project_id)),
+        ]
+
+    @classmethod
+    def unlink_children(cls, project_id, chunk_size):
+        """
+        Tasks (of this or other project) with parent in deleted project - parent is SET_NULL as in Task model
+        """
+        Task = apps.get_model('tasks_app', 'Task')
+        children = Task.objects.filter(parent__project_id=project_id).order_by()
+        while True:
+            pks = list(children.values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return
+            with transaction.atomic():
+                Task.objects.filter(pk__in=pks).update(parent=None)
+                SavedFilters.tasks_changed(Task.objects.filter(pk__in=pks))
+
+    @classmethod
+    def claimable(cls):
+        """
+        Jobs a worker may take: pending, failed and running ones with stale heartbeat (worker died)
+        """
+        Status = apps.get_model('projects_app', 'ProjectDeletionJob').Status
+        stale = timezone.now() - settings.PROJECT_DELETION_HEARTBEAT_TIMEOUT
+        return (Q(status__in=[Status.PENDING, Status.FAILED])
+                | Q(status=Status.RUNNING) & (Q(heartbeat_at__lt=stale) | Q(heartbeat_at__isnull=True)))
+
+    @classmethod
+    def claim(cls, job) -> bool:
+        """
+        Marks job running if it is still claimable - False when other worker took it first
+        """
+        ProjectDeletionJob = apps.get_model('projects_app', 'ProjectDeletionJob')
+        now = timezone.now()
+        claimed = ProjectDeletionJob.objects.filter(cls.claimable(), pk=job.pk).update(
+            status=job.Status.RUNNING, heartbeat_at=now, started_at=Coalesce('started_at', now), error='')
+        if claimed:
+            job.refresh_from_db()
+        return claimed == 1
+
+    @classmethod
+    def run(cls, job, chunk_size=None, progress=None):
+        """
+        Returns finished job or None when job was claimed by other worker
+        """
+        chunk_size = chunk_size or settings.PROJECT_DELETION_CHUNK_SIZE
+        Status = job.Status
+        if not cls.claim(job):
+            return None
+        steps = cls.steps(job.project_id)
+        if job.total_rows is None:
+            job.total_rows = sum(queryset.count() for _, queryset in steps)
+            job.save(update_fields=['total_rows'])
+
+        try:
+            cls.unlink_children(job.project_id, chunk_size)
+            for name, queryset in steps:
+                job.step = name
+                for deleted in delete_in_chunks(queryset, chunk_size):
+                    job.deleted_rows += deleted
+                    job.heartbeat_at = timezone.now()
+                    job.save(update_fields=['step', 'deleted_rows', 'heartbeat_at'])
+                    if progress:
+                        progress(job)
+        except Exception as e:
+            job.status = Status.FAILED
+            job.error = str(e)
+            job.save(update_fields=['status', 'error'])
+            raise
+
+        job.status = Status.DONE
+        job.step = ''
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'step', 'finished_at'])
+        return job
+
+    @classmethod
+    def pending_jobs(cls):
+        ProjectDeletionJob = apps.get_model('projects_app', 'ProjectDeletionJob')
+        return ProjectDeletionJob.objects.filter(cls.claimable()).order_by('pk')
+
+    @classmethod
+    def delete_task(cls, task, chunk_size=None):
+        """
+        Delete of single (possibly large) task: comments and observers are removed with chunked raw deletes,
+        so delete collector does not load them into memory
+        """
+        chunk_size = chunk_size or settings.PROJECT_DELETION_CHUNK_SIZE
+        with transaction.atomic():
+            for queryset in (task.comments.all(), task.observers.all()):
+                for _ in delete_in_chunks(queryset, chunk_size):
+                    pass
+            task.delete()
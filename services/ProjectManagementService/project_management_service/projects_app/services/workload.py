@@ -0,0 +1,100 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+class ProjectWorkload:
+    """
+    Open tasks and their estimate per assignee (and status) in project and in its started sprints.
+    Computed with grouped queries served by (project, assignee, status, estimate) index of Task.
+    Projects with at least WORKLOAD_SNAPSHOT_MIN_OPEN_TASKS open tasks are served from snapshot - the result
+    cached for WORKLOAD_SNAPSHOT_TIMEOUT seconds regardless of writes (snapshot_at says how old it is).
+    """
+
+    cache_key_prefix = 'workload-snapshot'
+
+    @classmethod
+    def cache(cls):
+        return caches[settings.RESPONSE_CACHE_ALIAS]
+
+    @classmethod
+    def use_snapshot(cls, project, snapshot=None) -> bool:
+        """
+        snapshot - explicitly requested mode, None picks it by project size (denormalized counters)
+        """
+        if snapshot is not None:
+            return snapshot
+        open_tasks = project.to_do_task_count + project.in_progress_task_count + project.in_review_task_count
+        return open_tasks >= settings.WORKLOAD_SNAPSHOT_MIN_OPEN_TASKS
+
+    @classmethod
+    def group(cls, rows) -> list:
+        """
+        rows (assignee, status, tasks, estimate) -> per assignee totals with status breakdown
+        """
+        assignees = {}
+        for assignee, status, tasks, estimate in rows:
+            workload = assignees.setdefault(assignee or None, {
+                'assignee': assignee or None, 'open_tasks': 0, 'estimate': 0, 'statuses': {}
+            })
+            by_status = workload['statuses'].setdefault(status, {'tasks': 0, 'estimate': 0})
+            workload['open_tasks'] += tasks
+            workload['estimate'] += estimate or 0
+            by_status['tasks'] += tasks
+            by_status['estimate'] += estimate or 0
+        return sorted(assignees.values(), key=lambda workload: (workload['assignee'] is None, workload['assignee']))
+
+    @classmethod
+    def compute(cls, project_id, sprint_id=None, priorities=()) -> dict:
+        Task = apps.get_model('tasks_app', 'Task')
+        Sprint = apps.get_model('sprints_app', 'Sprint')
+
+        tasks = Task.objects.filter(project_id=project_id).exclude(status=Status.CLOSED)
+        if priorities:
+            tasks = tasks.filter(priority__in=priorities)
+        sprints = Sprint.objects.filter(project_id=project_id)
+        if sprint_id is not None:
+            tasks = tasks.filter(sprint=sprint_id)
+            sprints = sprints.filter(pk=sprint_id)
+        else:
+            sprints = sprints.filter(status=SprintStatus.STARTED)
+        sprints = dict(sprints.order_by('pk').values_list('pk', 'name'))
+
+        rows = (tasks.values_list('assignee', 'status')
+                .annotate(tasks=Count('pk'), estimate=Sum('estimate')).order_by())
+        sprint_rows = {sprint: [] for sprint in sprints}
+        links = (Task.sprint.through.objects
+                 .filter(sprint_id__in=sprints, task__in=tasks.values('pk'))
+                 .values_list('sprint_id', 'task__assignee', 'task__status')
+                 .annotate(tasks=Count('task_id'), estimate=Sum('task__estimate')).order_by())
+        for sprint, *row in links:
+            sprint_rows[sprint].append(row)
+
+        return {
+            'project': project_id,
+            'snapshot_at': None,
+            'assignees': cls.group(rows),
+            'sprints': [{'sprint': sprint, 'name': name, 'assignees': cls.group(sprint_rows[sprint])}
+                        for sprint, name in sprints.items()],
+        }
+
+    @classmethod
+    def snapshot(cls, project_id, sprint_id=None, priorities=()) -> dict:
+        key = f'{cls.cache_key_prefix}:{project_id}:{sprint_id}:{",".join(sorted(priorities))}'
+        workload = cls.cache().get(key)
+        if workload is None:
+            workload = cls.compute(project_id, sprint_id, priorities)
+            workload['snapshot_at'] = timezone.now()
+            cls.cache().set(key, workload, settings.WORKLOAD_SNAPSHOT_TIMEOUT)
+        return workload
+
+    @classmethod
+    def get(cls, project, sprint_id=None, priorities=(), snapshot=None) -> dict:
+        if cls.use_snapshot(project, snapshot):
+            return cls.snapshot(project.pk, sprint_id, priorities)
+        return cls.compute(project.pk, sprint_id, priorities)
@@ -1,9 +1,11 @@
 from django.urls import path, include
 
-from .views import ProjectsView, ProjectByIdView, ProjectMembersView
+from .views import ProjectsView, ProjectByIdView, ProjectMembersView, ProjectDeletionJobView, ProjectWorkloadView
 
 urlpatterns = [
     path('', ProjectsView.as_view()),
+    path('deletions/<int:job_id>/', ProjectDeletionJobView.as_view()),
     path('<str:project_id>/', ProjectByIdView.as_view()),
-    path('<str:project_id>/members/', ProjectMembersView.as_view())
+    path('<str:project_id>/members/', ProjectMembersView.as_view()),
+    path('<str:project_id>/workload/', ProjectWorkloadView.as_view()),
 ]
\ No newline at end of file
@@ -1,5 +1,4 @@
 from django.db import transaction
-from django.db.models import Exists, OuterRef
 from django.shortcuts import get_object_or_404
 
 from rest_framework import status
@@ -8,15 +7,27 @@ from rest_framework import permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 
 from .models import Project
-from .models import ProjectMember
+from .models import ProjectMember, ProjectDeletionJob
+from .services.project_deletion import ProjectDeletion
+from .services.workload import ProjectWorkload
 from permissions.project_permissions import IsViewerOrDeny, IsAdminOrDeny
-from .serializers import ProjectSerializer, ProjectMemberSerializer, ProjectMemberRemoveSerializer
+from caching.response_cache import CachedResponseMixin
+from permissions.visibility import ProjectVisibility
+from utils.parsers import ColumnarJSONParser
+from utils.request_user import UserIdMixin
+from .serializers import (ProjectSerializer, ProjectMemberSerializer, ProjectMemberRemoveSerializer,
+                          ProjectDeletionJobSerializer, WorkloadQuerySerializer)
 
 
 
-class ProjectsView(generics.ListCreateAPIView):
+def include_counters(request) -> bool:
+    return request.method == 'GET' and request.query_params.get('counters', '').lower() in ('1', 'true')
+
+
+class ProjectsView(UserIdMixin, CachedResponseMixin, generics.ListCreateAPIView):
     """
     View for managing Projects (Create/Fetch All)
     List - Default fetch. Will only see projects where user is member
@@ -26,23 +37,18 @@ class ProjectsView(generics.ListCreateAPIView):
     serializer_class = ProjectSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_counters'] = include_counters(self.request)
+        return context
+
     def get_queryset(self):
         """
         Optimized solution to filter out projects that user should not see.
-        Looking inside database, in which projects user is member (any role)
+        Projects in which user is member (any role) are resolved once and cached
         """
         user_id = self.get_user_id()
-        return Project.objects.filter(
-            Exists(
-                ProjectMember.objects.filter(
-                    project=OuterRef('pk'),
-                    user_id=user_id
-                )
-            )
-        )
-
-    def get_user_id(self):
-        return self.request.headers.get('user_id') # TO DO: Change when user id correctly handled
+        return ProjectVisibility.filter_queryset(Project.objects.all(), user_id, project_field='pk')
 
     def perform_create(self, serializer):
         user_id = self.get_user_id()
@@ -66,15 +72,18 @@ class ProjectsView(generics.ListCreateAPIView):
 
 
 
-class ProjectByIdView(generics.RetrieveUpdateDestroyAPIView):
+class ProjectByIdView(UserIdMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Default methods for projects:
     - Fetch: For viewers
     - Update: For Admins
-    - Delete: For Admins
+    - Delete: For Admins. Project is soft deleted (invisible at once) and its rows are removed in background -
+      returns 202 with deletion job (progress at /projects/deletions/<job id>/)
     """
 
+    queryset = Project.objects.all()
     serializer_class = ProjectSerializer
+    lookup_url_kwarg = 'project_id'
     http_method_names = ['get', 'patch', 'delete']
     methods_permission_classes = {
         'GET': [IsViewerOrDeny],
@@ -87,8 +96,31 @@ class ProjectByIdView(generics.RetrieveUpdateDestroyAPIView):
         permission_classes += self.methods_permission_classes.get(self.request.method, [])
         return [p() for p in permission_classes]
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_counters'] = include_counters(self.request)
+        return context
+
+    def destroy(self, request, *args, **kwargs):
+        job = ProjectDeletion.request(self.get_object(), self.get_user_id())
+        return Response(ProjectDeletionJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-class ProjectMembersView(APIView):
+
+class ProjectDeletionJobView(UserIdMixin, generics.RetrieveAPIView):
+    """
+    Progress of background project deletion. Visible for user who deleted the project
+    """
+
+    serializer_class = ProjectDeletionJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    lookup_url_kwarg = 'job_id'
+
+    def get_queryset(self):
+        user_id = self.get_user_id()
+        return ProjectDeletionJob.objects.filter(requested_by=user_id)
+
+
+class ProjectMembersView(CachedResponseMixin, APIView):
     """
     Custom APIView for managing project members. Project ID is required for all methods
     GET - Get list of members in specific projects. Accessible for viewers
@@ -100,12 +132,18 @@ class ProjectMembersView(APIView):
         'POST': [IsAdminOrDeny],
         'DELETE': [IsAdminOrDeny]
     }
+    # POST body is a list of members - accepted in columnar form too
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, ColumnarJSONParser]
 
     def get_permissions(self):
         permission_classes = [permissions.IsAuthenticated]
         permission_classes += self.methods_permission_classes.get(self.request.method, [])
         return [p() for p in permission_classes]
 
+    def get_cache_project_ids(self, visible_project_ids):
+        project_id = self.kwargs['project_id']
+        return [project_id] if project_id in visible_project_ids else None
+
     def get(self, request, project_id):
         project = get_object_or_404(Project, id=project_id)
         role_param = request.query_params.get('role', None)
@@ -135,3 +173,27 @@ class ProjectMembersView(APIView):
             serializer.save()
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ProjectWorkloadView(APIView):
+    """
+    Open tasks and estimate per assignee (with status breakdown) in project and in each started sprint.
+    Accessible for viewers
+    GET - filters: sprint (sprint id - only this sprint), priority (repeatable),
+          snapshot (true / false - cached snapshot, by default used for large projects)
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsViewerOrDeny]
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project, id=project_id)
+        self.check_object_permissions(request, project)
+        query = WorkloadQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        workload = ProjectWorkload.get(
+            project,
+            sprint_id=query.validated_data.get('sprint'),
+            priorities=tuple(query.validated_data.get('priority', ())),
+            snapshot=query.validated_data['snapshot'],
+        )
+        return Response(workload, status=status.HTTP_200_OK)
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from .async_views import AsyncSprintsView, AsyncSprintByIdView
+
+urlpatterns = [
+    path('', AsyncSprintsView.as_view()),
+    path('<int:sprint_pk>/', AsyncSprintByIdView.as_view())
+]
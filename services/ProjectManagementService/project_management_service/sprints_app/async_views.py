@@ -0,0 +1,38 @@
+from .filters import SprintFilter
+from .models import Sprint
+from .serializers import SprintsSerializer
+
+from permissions.project_permissions import IsViewerOrDeny
+from permissions.visibility import ProjectVisibility
+from utils.async_views import AsyncReadView
+
+
+class AsyncSprintsView(AsyncReadView):
+    """
+    Async variant of SprintsView list (for viewers)
+    """
+
+    filterset_class = SprintFilter
+    serializer_class = SprintsSerializer
+
+    async def get_queryset(self):
+        user_id = self.get_user_id()
+        return await ProjectVisibility.afilter_queryset(Sprint.objects.all(), user_id)
+
+    async def get(self, request):
+        queryset = await self.filter_queryset(await self.get_queryset())
+        return self.render(await self.paginate(queryset))
+
+
+class AsyncSprintByIdView(AsyncReadView):
+    """
+    Async variant of SprintByIdView GET (for viewers)
+    """
+
+    permission_classes = [IsViewerOrDeny]
+    serializer_class = SprintsSerializer
+
+    async def get(self, request, sprint_pk):
+        sprint = await self.get_object_or_404(Sprint.objects.all(), id=sprint_pk)
+        await self.check_project_permissions(sprint.project_id)
+        return self.render(await self.serialize(sprint))
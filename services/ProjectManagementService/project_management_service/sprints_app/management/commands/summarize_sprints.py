@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from project_management_service.db_router import use_primary
+from sprints_app.models import Sprint
+from sprints_app.services.sprint_analytics import SprintAnalytics
+from sprints_app.services.sprint_status_management import SprintStatus
+
+
+class Command(BaseCommand):
+    help = ("Compute analytics summary of closed sprints that do not have one (sprints closed before summaries "
+            "were introduced). New sprints are summarized when they are closed")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help="Recompute summaries of all closed sprints")
+
+    def handle(self, *args, **options):
+        with use_primary():
+            sprints = Sprint.objects.filter(status=SprintStatus.CLOSED).order_by('pk')
+            if not options['all']:
+                sprints = sprints.filter(summary__isnull=True)
+            summarized = 0
+            for sprint in sprints.iterator():
+                SprintAnalytics.summarize(sprint)
+                summarized += 1
+            self.stdout.write(self.style.SUCCESS(f"Done. Summarized {summarized} sprints"))
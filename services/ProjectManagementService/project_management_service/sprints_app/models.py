@@ -1,22 +1,67 @@
-from django.db import models
+from django.db import models, transaction
 from django.core.validators import MinLengthValidator
-from .services.sprint_status_management import SprintStatus
-from utils.models_helpers import ProjectRelated
+from .services.sprint_status_management import SprintStatus, SPRINT_STATUS_CODES
+from .services.sprint_analytics import SprintAnalytics
+from projects_app.services.project_counters import ProjectCounters
+from utils.models_helpers import ChoiceCodeField, ProjectRelated, TrackedFields
 
-class Sprint(models.Model, ProjectRelated):
+class Sprint(TrackedFields, models.Model, ProjectRelated):
     id = models.AutoField(primary_key=True)
     name = models.CharField(max_length=32, validators=[MinLengthValidator(3)], blank=False)
     start_date = models.DateTimeField(null=True)
     close_date = models.DateTimeField(null=True)
     project = models.ForeignKey('projects_app.Project', on_delete=models.CASCADE, null=False, related_name='sprints')
 
-    status = models.CharField(choices=SprintStatus.choices,
-                              default=SprintStatus.CREATED,
-                              blank=False)
+    status = ChoiceCodeField(codes=SPRINT_STATUS_CODES,
+                             default=SprintStatus.CREATED,
+                             blank=False)
+
+    tracked_fields = ('project_id', 'status')
 
     def get_status(self) -> SprintStatus:
         return SprintStatus(self.status)
 
     def get_project(self):
         return self.project
-    # tasks - Task model. Many-to-Many.
\ No newline at end of file
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self.get_loaded_values()
+            super().save(*args, **kwargs)
+            ProjectCounters.sprint_changed(previous, self.get_current_values())
+            if self.status == SprintStatus.CLOSED and (previous is None or previous[1] != SprintStatus.CLOSED):
+                SprintAnalytics.summarize(self)
+        self.reset_loaded_values()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self.get_loaded_values()
+            result = super().delete(*args, **kwargs)
+            ProjectCounters.sprint_changed(previous, None)
+        return result
+    # tasks - Task model. Many-to-Many.
+
+class SprintSummary(models.Model, ProjectRelated):
+    """
+    Velocity and cycle times of closed sprint, computed once when sprint is closed (see services/sprint_analytics.py)
+    """
+    sprint = models.OneToOneField(Sprint, on_delete=models.CASCADE, primary_key=True, related_name='summary')
+    project = models.ForeignKey('projects_app.Project', on_delete=models.CASCADE, related_name='sprint_summaries')
+    start_date = models.DateTimeField(null=True)
+    close_date = models.DateTimeField()
+
+    planned_tasks = models.PositiveIntegerField(default=0)
+    planned_estimate = models.IntegerField(default=0)
+    completed_tasks = models.PositiveIntegerField(default=0)
+    completed_estimate = models.IntegerField(default=0)
+    # Sorted cycle times (seconds from creation to close) of completed tasks - merged for percentiles over sprints
+    cycle_times = models.JSONField(default=list)
+
+    class Meta:
+        indexes = [
+            # Last N closed sprints of project
+            models.Index(fields=['project', '-close_date'], name='sprint_summary_project_idx')
+        ]
+
+    def get_project(self):
+        return self.project
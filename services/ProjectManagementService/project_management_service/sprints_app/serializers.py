@@ -1,7 +1,10 @@
+from django.db import transaction
 from rest_framework import serializers
 
 from .models import Sprint
-from .services.sprint_status_management import SprintStatusManager, InvalidSprintStatusTransition
+from .services.sprint_status_management import SprintStatusManager, InvalidSprintStatusTransition, SprintStatus
+from tasks_app.services.task_management.task_sprint_manager import TaskSprintManagement
+from utils.fast_serializers import FastReadSerializer
 
 
 class SprintsSerializer(serializers.ModelSerializer):
@@ -10,6 +13,9 @@ class SprintsSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'start_date', 'close_date', 'project', 'status']
 
 
+sprint_fast_serializer = FastReadSerializer(SprintsSerializer)
+
+
 class SprintCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Sprint
@@ -17,9 +23,15 @@ class SprintCreateSerializer(serializers.ModelSerializer):
 
 
 class SprintUpdateSerializer(serializers.ModelSerializer):
+    """
+    rollover_to - with status Closed: unfinished tasks (and their subtrees) are added to this sprint
+    in the same transaction as the close
+    """
+    rollover_to = serializers.PrimaryKeyRelatedField(queryset=Sprint.objects.all(), write_only=True, required=False)
+
     class Meta:
         model = Sprint
-        fields = ['name', 'status']
+        fields = ['name', 'status', 'rollover_to']
 
     def to_internal_value(self, data):
         error = {
@@ -32,16 +44,37 @@ class SprintUpdateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(error)
         return super().to_internal_value(data)
 
+    def validate(self, attrs):
+        rollover_to = attrs.get('rollover_to')
+        if rollover_to is not None:
+            if attrs.get('status') != SprintStatus.CLOSED:
+                raise serializers.ValidationError({"errors": {"rollover_to": ["Allowed only when closing sprint"]}})
+            if rollover_to.pk == self.instance.pk:
+                raise serializers.ValidationError({"errors": {"rollover_to": ["Cannot roll over to the same sprint"]}})
+        return attrs
+
     def update(self, instance, validated_data):
         to_status = validated_data.pop('status', None)
-        if to_status:
-            try:
-                SprintStatusManager.change_status(to_status, instance)
-            except InvalidSprintStatusTransition as e:
-                raise serializers.ValidationError({
-                    "errors": {
-                        "status": str(e)
-                    }
-                })
-        validated_data["status"] = to_status if to_status else instance.status
-        return super().update(instance, validated_data)
\ No newline at end of file
+        rollover_to = validated_data.pop('rollover_to', None)
+        with transaction.atomic():
+            if to_status:
+                try:
+                    SprintStatusManager.change_status(to_status, instance)
+                except InvalidSprintStatusTransition as e:
+                    raise serializers.ValidationError({
+                        "errors": {
+                            "status": str(e)
+                        }
+                    })
+            validated_data["status"] = to_status if to_status else instance.status
+            sprint = super().update(instance, validated_data)
+            if rollover_to is not None:
+                try:
+                    TaskSprintManagement.rollover(sprint, rollover_to)
+                except serializers.ValidationError as e:
+                    raise serializers.ValidationError({"errors": {"rollover_to": [str(e.detail[0])]}})
+        return sprint
+
+class SprintAnalyticsQuerySerializer(serializers.Serializer):
+    project = serializers.CharField()
+    sprints = serializers.IntegerField(required=False, min_value=1, max_value=100, default=10)
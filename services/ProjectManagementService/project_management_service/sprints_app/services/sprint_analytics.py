@@ -0,0 +1,85 @@
+import heapq
+import math
+
+from django.apps import apps
+from django.utils import timezone
+
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+class SprintAnalytics:
+    """
+    Velocity (planned vs completed estimate) and cycle time percentiles over closed sprints of project.
+    Every sprint is summarized once, in the transaction that closes it (Sprint.save on move to Closed), into
+    SprintSummary - analytics read one row per sprint and never rescan tasks of historical sprints.
+    Planned work - tasks in sprint when it is closed, completed - those of them in Closed status.
+    Cycle time of task is time from its creation to close (status history is not stored).
+    """
+
+    percentiles = (50, 75, 90, 95)
+
+    @classmethod
+    def summarize(cls, sprint):
+        SprintSummary = apps.get_model('sprints_app', 'SprintSummary')
+        planned_tasks = planned_estimate = completed_tasks = completed_estimate = 0
+        cycle_times = []
+        tasks = sprint.tasks.values_list('status', 'estimate', 'creation_date', 'close_date')
+        for status, estimate, creation_date, close_date in tasks:
+            planned_tasks += 1
+            planned_estimate += estimate or 0
+            if status != Status.CLOSED:
+                continue
+            completed_tasks += 1
+            completed_estimate += estimate or 0
+            if close_date and creation_date:
+                cycle_times.append(max(0, round((close_date - creation_date).total_seconds())))
+
+        summary, _ = SprintSummary.objects.update_or_create(sprint=sprint, defaults={
+            'project_id': sprint.project_id,
+            'start_date': sprint.start_date,
+            'close_date': sprint.close_date or timezone.now(),
+            'planned_tasks': planned_tasks,
+            'planned_estimate': planned_estimate,
+            'completed_tasks': completed_tasks,
+            'completed_estimate': completed_estimate,
+            'cycle_times': sorted(cycle_times),
+        })
+        return summary
+
+    @classmethod
+    def percentile(cls, values, percent):
+        """
+        Nearest rank percentile of sorted values
+        """
+        if not values:
+            return None
+        return values[max(0, math.ceil(percent / 100 * len(values)) - 1)]
+
+    @classmethod
+    def for_project(cls, project_id, last_sprints) -> dict:
+        SprintSummary = apps.get_model('sprints_app', 'SprintSummary')
+        summaries = list(
+            SprintSummary.objects.filter(project_id=project_id).select_related('sprint')
+            .order_by('-close_date', '-sprint_id')[:last_sprints]
+        )[::-1]
+        cycle_times = list(heapq.merge(*(summary.cycle_times for summary in summaries)))
+
+        return {
+            'project': project_id,
+            'velocity': [{
+                'sprint': summary.sprint_id,
+                'name': summary.sprint.name,
+                'start_date': summary.start_date,
+                'close_date': summary.close_date,
+                'planned_tasks': summary.planned_tasks,
+                'planned_estimate': summary.planned_estimate,
+                'completed_tasks': summary.completed_tasks,
+                'completed_estimate': summary.completed_estimate,
+            } for summary in summaries],
+            'average_velocity': (round(sum(summary.completed_estimate for summary in summaries) / len(summaries), 2)
+                                 if summaries else None),
+            'cycle_time_seconds': {
+                'tasks': len(cycle_times),
+                **{f'p{percent}': cls.percentile(cycle_times, percent) for percent in cls.percentiles},
+            },
+        }
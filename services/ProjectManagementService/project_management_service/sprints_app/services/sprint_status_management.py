@@ -1,19 +1,32 @@
 from django.db import models
 from django.utils import timezone
 
+from utils.models_helpers import ChoiceCodes
+
 class SprintStatus(models.TextChoices):
     CREATED = 'Created', 'Created'
     STARTED = 'Started', 'Started'
     CLOSED = 'Closed', 'Closed'
 
+# Stored in database (ChoiceCodeField) - never renumber
+SPRINT_STATUS_CODES = ChoiceCodes(SprintStatus, {
+    SprintStatus.CREATED: 1,
+    SprintStatus.STARTED: 2,
+    SprintStatus.CLOSED: 3,
+})
+
 class InvalidSprintStatusTransition(Exception):
     pass
 
 class SprintStatusManager:
 
+    created = SPRINT_STATUS_CODES.code(SprintStatus.CREATED)
+    started = SPRINT_STATUS_CODES.code(SprintStatus.STARTED)
+    closed = SPRINT_STATUS_CODES.code(SprintStatus.CLOSED)
+
     @classmethod
     def start_sprint(cls, sprint):
-        if sprint.status == SprintStatus.CREATED:
+        if SPRINT_STATUS_CODES.code(sprint.status) == cls.created:
             sprint.start_date = timezone.now()
             sprint.close_date = None
             return
@@ -21,17 +34,21 @@ class SprintStatusManager:
 
     @classmethod
     def close_sprint(cls, sprint):
-        if sprint.status == SprintStatus.STARTED:
+        if SPRINT_STATUS_CODES.code(sprint.status) == cls.started:
             sprint.close_date = timezone.now()
             return
         raise InvalidSprintStatusTransition(f'Sprint ID: {sprint.id} - Cannot close sprint when it has status: "{sprint.status}"')
 
     @classmethod
-    def change_status(cls, to_status: SprintStatus, sprint):
-        if to_status == SprintStatus.STARTED:
+    def change_status(cls, to_status: SprintStatus | int, sprint):
+        try:
+            to_code = SPRINT_STATUS_CODES.code(to_status)
+        except ValueError:
+            to_code = None
+        if to_code == cls.started:
             cls.start_sprint(sprint)
-        elif to_status == SprintStatus.CLOSED:
+        elif to_code == cls.closed:
             cls.close_sprint(sprint)
         else:
             raise InvalidSprintStatusTransition(
-                f'Sprint ID: {sprint.id} - Cannot move sprint to status: "{to_status}"')
\ No newline at end of file
+                f'Sprint ID: {sprint.id} - Cannot move sprint to status: "{to_status}"')
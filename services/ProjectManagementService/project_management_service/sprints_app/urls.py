@@ -1,8 +1,10 @@
 from django.urls import path, include
 
-from .views import SprintsView, SprintByIdView
+from .views import SprintsView, SprintByIdView, SprintCriticalPathView, SprintAnalyticsView
 
 urlpatterns = [
     path('', SprintsView.as_view()),
-    path('<int:sprint_pk>/', SprintByIdView.as_view())
+    path('analytics/', SprintAnalyticsView.as_view()),
+    path('<int:sprint_pk>/', SprintByIdView.as_view()),
+    path('<int:sprint_pk>/critical-path/', SprintCriticalPathView.as_view()),
 ]
\ No newline at end of file
@@ -2,17 +2,26 @@ from rest_framework import status
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import permissions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Exists, OuterRef
 
 from .models import Sprint
-from .serializers import SprintsSerializer, SprintCreateSerializer, SprintUpdateSerializer
+from .serializers import (SprintsSerializer, SprintCreateSerializer, SprintUpdateSerializer, sprint_fast_serializer,
+                          SprintAnalyticsQuerySerializer)
+from .services.sprint_analytics import SprintAnalytics
 from .filters import SprintFilter
 from permissions.project_permissions import IsViewerOrDeny, IsDeveloperOrDeny, IsAdminOrDeny
-from projects_app.models import ProjectMember
+from caching.response_cache import CachedResponseMixin, project_from_query_params
+from permissions.visibility import ProjectVisibility
+from utils.fast_serializers import FastListMixin
+from utils.request_user import UserIdMixin
+from tasks_app.views import CriticalPathMixin
+from projects_app.models import Project
 
 
-class SprintsView(generics.ListCreateAPIView):
+class SprintsView(UserIdMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView):
     """
     View for managing Sprints (Create/Fetch All)
     List - handled by default (by viewers)
@@ -22,28 +31,21 @@ class SprintsView(generics.ListCreateAPIView):
     queryset = Sprint.objects.all()
     filter_backends = [DjangoFilterBackend]
     filterset_class = SprintFilter
-    methods_permissions_classes = {
+    fast_serializer = sprint_fast_serializer
+    methods_permission_classes = {
         'POST': [IsDeveloperOrDeny]
     }
 
     def get_queryset(self):
         """
         Optimized solution to filter out sprints in projects that user should not see.
-        Creating additional column with annotate that will have True/False regarding if ProjectMember has line
-        with sprints project and user's ID
+        User's projects are resolved once (cached) and used in indexed project_id IN (...) filter
         """
         user_id = self.get_user_id()
-        return Sprint.objects.annotate(
-            is_member=Exists(
-                ProjectMember.objects.filter(
-                    project=OuterRef('project_id'),
-                    user=user_id
-                )
-            )
-        ).filter(is_member=True)
-
-    def get_user_id(self):
-        return self.request.headers.get('user_id') # TO DO: Change when user id correctly handled
+        return ProjectVisibility.filter_queryset(Sprint.objects.all(), user_id)
+
+    def get_cache_project_ids(self, visible_project_ids):
+        return project_from_query_params(self.request, visible_project_ids)
 
     def get_permissions(self):
         permission_classes = [permissions.IsAuthenticated]
@@ -67,7 +69,7 @@ class SprintsView(generics.ListCreateAPIView):
         return Response(response_details.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class SprintByIdView(generics.RetrieveUpdateDestroyAPIView):
+class SprintByIdView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Class for interacting with one specific sprint
     Get - handled by default (for viewers)
@@ -75,11 +77,11 @@ class SprintByIdView(generics.RetrieveUpdateDestroyAPIView):
     Patch - custom implementation. Using different serializers for update and response (for devs and admins)
     """
 
-    queryset = Sprint.objects.all()
+    queryset = ProjectVisibility.not_deleted(Sprint.objects.all())
     lookup_field = 'id'
     lookup_url_kwarg = 'sprint_pk'
     http_method_names = ['get', 'patch', 'delete']
-    methods_permissions_classes = {
+    methods_permission_classes = {
         'GET': [IsViewerOrDeny],
         'PATCH': [IsDeveloperOrDeny],
         'DELETE': [IsAdminOrDeny]
@@ -90,6 +92,10 @@ class SprintByIdView(generics.RetrieveUpdateDestroyAPIView):
         permission_classes += self.methods_permission_classes.get(self.request.method, [])
         return [p() for p in permission_classes]
 
+    def get_cache_project_ids(self, visible_project_ids):
+        project_id = Sprint.objects.filter(pk=self.kwargs['sprint_pk']).values_list('project_id', flat=True).first()
+        return [project_id] if project_id in visible_project_ids else None
+
     def get_serializer_class(self):
         if self.request.method in ["GET", "DELETE"]:
             return SprintsSerializer
@@ -106,3 +112,39 @@ class SprintByIdView(generics.RetrieveUpdateDestroyAPIView):
 
         response_details = SprintsSerializer(instance=serializer.instance)
         return Response(response_details.data, status=status.HTTP_200_OK)
+
+
+class SprintCriticalPathView(CachedResponseMixin, CriticalPathMixin, generics.GenericAPIView):
+    """
+    Critical path over tasks of sprint (see tasks_app.views.CriticalPathMixin)
+    """
+
+    queryset = ProjectVisibility.not_deleted(Sprint.objects.all())
+    lookup_field = 'id'
+    lookup_url_kwarg = 'sprint_pk'
+    permission_classes = [IsAuthenticated, IsViewerOrDeny]
+
+    def get_cache_project_ids(self, visible_project_ids):
+        project_id = Sprint.objects.filter(pk=self.kwargs['sprint_pk']).values_list('project_id', flat=True).first()
+        return [project_id] if project_id in visible_project_ids else None
+
+    def get_critical_path_tasks(self, obj):
+        return obj.tasks.filter(project_id=obj.project_id)
+
+
+class SprintAnalyticsView(APIView):
+    """
+    Velocity over last closed sprints of project and cycle time percentiles of tasks completed in them
+    (see services/sprint_analytics.py). Accessible for viewers
+    GET - project (required), sprints - number of last closed sprints (default 10)
+    """
+
+    permission_classes = [IsAuthenticated, IsViewerOrDeny]
+
+    def get(self, request):
+        query = SprintAnalyticsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        project = get_object_or_404(Project, id=query.validated_data['project'])
+        self.check_object_permissions(request, project)
+        analytics = SprintAnalytics.for_project(project.pk, query.validated_data['sprints'])
+        return Response(analytics, status=status.HTTP_200_OK)
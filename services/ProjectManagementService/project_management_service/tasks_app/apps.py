@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TasksAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401 - due date scheduler and dependency graph versions
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .async_views import AsyncTasksView, AsyncTaskByIdView, AsyncCommentListView
+
+urlpatterns = [
+    path('', AsyncTasksView.as_view()),
+    path('<str:task_pk>/', AsyncTaskByIdView.as_view()),
+    path('<str:task_pk>/comments/', AsyncCommentListView.as_view()),
+]
@@ -0,0 +1,62 @@
+from django.http import Http404
+
+from .filters import TaskFilter, CommentFilter
+from .models import Task, Comment, ArchivedTask
+from .serializers import TaskSerializer, CommentSerializer, ArchivedTaskSerializer
+
+from permissions.project_permissions import IsViewerOrDeny
+from permissions.visibility import ProjectVisibility
+from utils.async_views import AsyncReadView
+
+
+class AsyncTasksView(AsyncReadView):
+    """
+    Async variant of TasksView list (for viewers)
+    """
+
+    filterset_class = TaskFilter
+    serializer_class = TaskSerializer
+
+    async def get_queryset(self):
+        user_id = self.get_user_id()
+        return await ProjectVisibility.afilter_queryset(Task.objects.select_related('parent').prefetch_related('sprint'),
+                                                     user_id)
+
+    async def get(self, request):
+        queryset = await self.filter_queryset(await self.get_queryset())
+        return self.render(await self.paginate(queryset))
+
+
+class AsyncTaskByIdView(AsyncReadView):
+    """
+    Async variant of TaskByIdView GET (for viewers). Archived task is returned from archive
+    """
+
+    permission_classes = [IsViewerOrDeny]
+    serializer_class = TaskSerializer
+
+    async def get(self, request, task_pk):
+        try:
+            task = await self.get_object_or_404(Task.objects.select_related('parent').prefetch_related('sprint'),
+                                                key=task_pk)
+        except Http404:
+            task = await self.get_object_or_404(ArchivedTask.objects.prefetch_related('sprint'), key=task_pk)
+            self.serializer_class = ArchivedTaskSerializer
+        await self.check_project_permissions(task.project_id)
+        return self.render(await self.serialize(task))
+
+
+class AsyncCommentListView(AsyncReadView):
+    """
+    Async variant of CommentListCreateView list. Comments of given task (for viewers)
+    """
+
+    permission_classes = [IsViewerOrDeny]
+    filterset_class = CommentFilter
+    serializer_class = CommentSerializer
+
+    async def get(self, request, task_pk):
+        task = await self.get_object_or_404(Task.objects.only('id', 'key', 'project_id'), key=task_pk)
+        await self.check_project_permissions(task.project_id)
+        queryset = await self.filter_queryset(Comment.objects.filter(task_id=task.pk).select_related('task'))
+        return self.render(await self.paginate(queryset))
@@ -1,6 +1,9 @@
 import django_filters
+from django.db.models import Q
+from django.utils import timezone
 
-from .models import Task, Comment
+from .models import Task, Comment, TaskDueNotification, ArchivedTask, ArchivedComment
+from .services.task_management.task_status_workflow import Status
 
 class TaskFilter(django_filters.FilterSet):
     due_date_after = django_filters.IsoDateTimeFilter(
@@ -21,12 +24,32 @@ class TaskFilter(django_filters.FilterSet):
     close_date_before = django_filters.IsoDateTimeFilter(
         field_name="close_date", lookup_expr="lte"
     )
+    # Open tasks only - both served by partial index on due date of open tasks
+    overdue = django_filters.BooleanFilter(method='filter_overdue')
+    due_within = django_filters.DurationFilter(method='filter_due_within')  # e.g. "P3D", "PT12H", "3600"
+    # Related tasks are filtered by key ("<PROJECT>-<number>")
+    parent = django_filters.CharFilter(field_name='parent__key')
 
     class Meta:
         model = Task
         fields = ['assignee', 'creator', 'due_date', 'creation_date', 'close_date', 'parent', 'sprint', 'project',
                   'type', 'priority', 'status']
 
+    def filter_overdue(self, queryset, name, value):
+        overdue = Q(due_date__lt=timezone.now()) & ~Q(status=Status.CLOSED)
+        return queryset.filter(overdue) if value else queryset.exclude(overdue)
+
+    def filter_due_within(self, queryset, name, value):
+        now = timezone.now()
+        return queryset.filter(due_date__gte=now, due_date__lte=now + value).exclude(status=Status.CLOSED)
+
+
+class ArchivedTaskFilter(TaskFilter):
+    parent = django_filters.CharFilter(field_name='parent_key')
+
+    class Meta(TaskFilter.Meta):
+        model = ArchivedTask
+
 
 class CommentFilter(django_filters.FilterSet):
     creation_date_after = django_filters.IsoDateTimeFilter(
@@ -35,7 +58,21 @@ class CommentFilter(django_filters.FilterSet):
     creation_date_before = django_filters.IsoDateTimeFilter(
         field_name="creation_date", lookup_expr="lte"
     )
+    task = django_filters.CharFilter(field_name='task__key')
 
     class Meta:
         model = Comment
-        fields = ['author', 'task', 'creation_date']
\ No newline at end of file
+        fields = ['author', 'task', 'creation_date']
+
+
+class ArchivedCommentFilter(CommentFilter):
+    class Meta(CommentFilter.Meta):
+        model = ArchivedComment
+
+
+class TaskDueNotificationFilter(django_filters.FilterSet):
+    task = django_filters.CharFilter(field_name='task__key')
+
+    class Meta:
+        model = TaskDueNotification
+        fields = ['kind', 'task']
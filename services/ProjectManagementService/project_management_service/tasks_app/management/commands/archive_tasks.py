@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from project_management_service.db_router import use_primary
+from tasks_app.services.task_archive import TaskArchive
+
+
+class Command(BaseCommand):
+    help = ("Move tasks of long closed sprints and long closed tasks (with comments and observers) to archive "
+            "tables. Safe to interrupt and run again, e.g. periodically from cron")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after given number of batches")
+        parser.add_argument('--sprint-retention-days', type=int, default=None)
+        parser.add_argument('--task-retention-days', type=int, default=None)
+
+    def handle(self, *args, **options):
+        with use_primary():
+            archived = TaskArchive.run(
+                batch_size=options['batch_size'],
+                max_batches=options['max_batches'],
+                sprint_retention_days=options['sprint_retention_days'],
+                task_retention_days=options['task_retention_days'],
+                progress=lambda total: self.stdout.write(f"Archived {total} tasks"),
+            )
+            self.stdout.write(self.style.SUCCESS(f"Done. Archived {archived} tasks"))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks_app.services.task_key_migration import TaskKeyMigration, TaskKeyMigrationError
+
+
+class Command(BaseCommand):
+    help = ("Move existing PostgreSQL database from string task ids to integer ids with string key column, online. "
+            "Run phases in order: prepare, backfill (safe to interrupt and run again), swap (short table locks, "
+            "deploy new code right after), validate. status shows rows left for backfill")
+
+    def add_arguments(self, parser):
+        parser.add_argument('phase', choices=[*TaskKeyMigration.phases, 'status'])
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        try:
+            migration = TaskKeyMigration(using=options['database'])
+            getattr(self, options['phase'])(migration, options)
+        except TaskKeyMigrationError as e:
+            raise CommandError(str(e))
+
+    def prepare(self, migration, options):
+        migration.prepare()
+        self.stdout.write(self.style.SUCCESS("Prepared. Run backfill"))
+
+    def backfill(self, migration, options):
+        updated = migration.backfill(
+            batch_size=options['batch_size'],
+            progress=lambda table, total: self.stdout.write(f"{table}: updated {total} rows"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Done. Updated {updated} rows, indexes are built. Run swap"))
+
+    def swap(self, migration, options):
+        migration.swap()
+        self.stdout.write(self.style.SUCCESS("Swapped. Deploy code with integer task ids, then run validate"))
+
+    def validate(self, migration, options):
+        for constraint in migration.validate():
+            self.stdout.write(f"Validated {constraint}")
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    def status(self, migration, options):
+        pending = migration.status()
+        if not pending:
+            self.stdout.write("Swapped")
+        for name, rows in pending.items():
+            self.stdout.write(f"{name}: {rows} rows left")
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from project_management_service.db_router import use_primary
+from tasks_app.services.due_date_scheduler import due_date_scheduler
+
+
+class Command(BaseCommand):
+    help = ("Fire due soon and overdue events of open tasks to their assignees and observers. "
+            "Runs until stopped, or once with --once (e.g. from cron)")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Fire events due now and exit")
+        parser.add_argument('--max-sleep', type=float, default=60, help="Max seconds between checks")
+
+    def handle(self, *args, **options):
+        with use_primary():
+            while True:
+                fired = due_date_scheduler.run_pending()
+                if fired:
+                    self.stdout.write(f"Sent {fired} notifications")
+                if options['once']:
+                    break
+                wait = (due_date_scheduler.next_wakeup() - timezone.now()).total_seconds()
+                time.sleep(min(max(wait, 0.1), options['max_sleep']))
+            self.stdout.write(self.style.SUCCESS("Done"))
@@ -1,12 +1,20 @@
 from django.db import models, transaction
+from django.db.models import Q
 from django.utils import timezone
 
-from .services.task_management.task_status_workflow import TaskStatusWorkFlow, IncorrectTaskTransition, Status
-from .services.task_management.task_relationship import TaskType, IncorrectTaskRelationship, TaskRelationship
-from utils.models_helpers import ProjectRelated
-
-class Task(models.Model, ProjectRelated):
-    id = models.CharField(max_length=64, primary_key=True)
+from .services.task_management.task_status_workflow import (TaskStatusWorkFlow, IncorrectTaskTransition, Status,
+                                                            STATUS_CODES)
+from .services.task_management.task_relationship import (TaskType, IncorrectTaskRelationship, TaskRelationship,
+                                                         TASK_TYPE_CODES)
+from .services.saved_filters import SavedFilters
+from projects_app.services.project_counters import ProjectCounters
+from utils.models_helpers import ChoiceCodeField, ChoiceCodes, ProjectRelated, TrackedFields
+
+class Task(TrackedFields, models.Model, ProjectRelated):
+    # Compact internal primary key - referenced by parent, sprint links, comments, observers, notifications
+    # and dependencies. API identifies tasks by key "<PROJECT>-<number>"
+    id = models.BigAutoField(primary_key=True)
+    key = models.CharField(max_length=64, unique=True)
     number = models.IntegerField(null=False)
 
     summary = models.CharField(max_length=100)
@@ -27,7 +35,8 @@ class Task(models.Model, ProjectRelated):
     estimate = models.IntegerField(null=True, blank=True)
 
 
-    type = models.CharField(max_length=20, choices=TaskType.choices, default=TaskType.TASK)
+    # Choice fields are stored as small integer codes, values are strings in Python and API (ChoiceCodeField)
+    type = ChoiceCodeField(codes=TASK_TYPE_CODES, default=TaskType.TASK)
 
     class Priority(models.TextChoices):
         URGENT = 'Urgent', 'Urgent'
@@ -35,9 +44,28 @@ class Task(models.Model, ProjectRelated):
         MEDIUM = 'Medium', 'Medium'
         LOW = 'Low', 'Low'
 
-    priority = models.CharField(max_length=10, choices=Priority.choices, default=Priority.MEDIUM)
+    # Stored in database - never renumber
+    PRIORITY_CODES = ChoiceCodes(Priority, {
+        Priority.URGENT: 1,
+        Priority.HIGH: 2,
+        Priority.MEDIUM: 3,
+        Priority.LOW: 4,
+    })
+
+    priority = ChoiceCodeField(codes=PRIORITY_CODES, default=Priority.MEDIUM)
+
+    status = ChoiceCodeField(codes=STATUS_CODES, default=Status.TO_DO)
+
+    tracked_fields = ('project_id', 'status')
 
-    status = models.CharField(max_length=20, choices=Status.choices, default=Status.TO_DO)
+    class Meta:
+        indexes = [
+            # Open tasks by due date - overdue / due_within filters and DueDateScheduler
+            models.Index(fields=['due_date'], condition=Q(due_date__isnull=False) & ~Q(status=Status.CLOSED),
+                         name='task_open_due_date_idx'),
+            # Workload aggregates grouped by assignee and status (projects_app/services/workload.py) - covering
+            models.Index(fields=['project', 'assignee', 'status', 'estimate'], name='task_workload_idx'),
+        ]
 
     class ProjectRequiredException(Exception):
         pass
@@ -71,9 +99,9 @@ class Task(models.Model, ProjectRelated):
             project_locked.last_task_index = (project_locked.last_task_index or 0) + 1
             project_locked.save(update_fields=['last_task_index'])
             new_number = project_locked.last_task_index
-            task_id = f"{str(project_locked.id)}-{new_number}"
+            task_key = f"{str(project_locked.id)}-{new_number}"
             return cls.objects.create(
-                id=task_id,
+                key=task_key,
                 project=project_locked,
                 number=new_number,
                 **kwargs
@@ -84,7 +112,7 @@ class Task(models.Model, ProjectRelated):
             self.remove_parent()
 
         if not TaskRelationship.can_be_related(parent.get_type(), self.get_type()):
-            raise IncorrectTaskRelationship(f'Task ID: {self.id} (type: {self.get_type()}) - Cannot add parent with id "{parent.id}" (type: "{parent.get_type()}")')
+            raise IncorrectTaskRelationship(f'Task ID: {self.key} (type: {self.get_type()}) - Cannot add parent with id "{parent.key}" (type: "{parent.get_type()}")')
 
         self.parent = parent
 
@@ -94,11 +122,20 @@ class Task(models.Model, ProjectRelated):
 
     def change_status(self, to_status: Status):
         if not TaskStatusWorkFlow.can_transition(self.get_status(), to_status):
-            raise IncorrectTaskTransition(f'Task ID: {self.id} - Cannot change status from "{self.status}" to "{to_status}"')
+            raise IncorrectTaskTransition(f'Task ID: {self.key} - Cannot change status from "{self.status}" to "{to_status}"')
 
 
         self.status = to_status
 
+    def track_close_date(self):
+        """
+        Close date is set when task is saved as Closed (kept if already known) and cleared when it is reopened
+        """
+        if self.status != Status.CLOSED:
+            self.close_date = None
+        elif self.close_date is None:
+            self.close_date = timezone.now()
+
     def get_project(self):
         return self.project
 
@@ -111,15 +148,30 @@ class Task(models.Model, ProjectRelated):
         update_fields=None,
     ):
         self.last_edit_time = timezone.now()
-        super().save(*args,
-                     force_insert=force_insert,
-                     force_update=force_update,
-                     using=using,
-                     update_fields=update_fields
-                     )
+        self.track_close_date()
+        if update_fields is not None and 'status' in update_fields:
+            update_fields = {*update_fields, 'close_date'}
+        with transaction.atomic(using=using):
+            previous = self.get_loaded_values()
+            super().save(*args,
+                         force_insert=force_insert,
+                         force_update=force_update,
+                         using=using,
+                         update_fields=update_fields
+                         )
+            ProjectCounters.task_changed(previous, self.get_current_values())
+            SavedFilters.task_changed(self, created=previous is None)
+        self.reset_loaded_values()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = self.get_loaded_values()
+            result = super().delete(*args, **kwargs)
+            ProjectCounters.task_changed(previous, None)
+        return result
 
     def __str__(self):
-        return f"{self.id} - {self.summary}"
+        return f"{self.key} - {self.summary}"
 
 
 class TaskObserver(models.Model, ProjectRelated):
@@ -131,6 +183,27 @@ class TaskObserver(models.Model, ProjectRelated):
         return self.task.get_project()
 
 
+class TaskDependency(models.Model, ProjectRelated):
+    """
+    Blocker task has to be finished before blocked task. Both tasks are in the same project,
+    links never form a cycle (see services/task_dependencies.py)
+    """
+    id = models.AutoField(primary_key=True)
+    blocker = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='blocking')
+    blocked = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='blocked_by')
+    project = models.ForeignKey('projects_app.Project', on_delete=models.CASCADE, related_name='task_dependencies')
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['blocker', 'blocked'], name='unique_task_dependency'),
+            models.CheckConstraint(condition=~Q(blocker=models.F('blocked')), name='task_dependency_not_self')
+        ]
+
+    def get_project(self):
+        return self.project
+
+
 class Comment(models.Model, ProjectRelated):
     id = models.AutoField(primary_key=True)
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='comments', null=False)
@@ -159,4 +232,128 @@ class Comment(models.Model, ProjectRelated):
                      )
 
     def __str__(self):
-        return f"Comment by {self.author} on {self.creation_date}"
\ No newline at end of file
+        return f"Comment by {self.author} on {self.creation_date}"
+
+class TaskDueNotification(models.Model):
+    """
+    Due soon / overdue event of task for its assignee or observer (see services/due_date_scheduler.py).
+    Fired once per task, user, kind and due date - moving due date fires it again
+    """
+
+    class Kind(models.TextChoices):
+        DUE_SOON = 'Due soon', 'Due soon'
+        OVERDUE = 'Overdue', 'Overdue'
+
+    id = models.AutoField(primary_key=True)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='due_notifications')
+    user_id = models.CharField(max_length=64)
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    due_date = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'user_id', 'kind', 'due_date'], name='unique_task_due_notification')
+        ]
+        indexes = [
+            models.Index(fields=['user_id', '-created_at'], name='due_notification_user_idx')
+        ]
+
+
+class SavedFilter(models.Model):
+    """
+    TaskFilter parameters saved by user under name, with materialized set of matching tasks kept up to date
+    on task writes (see services/saved_filters.py)
+    """
+    id = models.AutoField(primary_key=True)
+    owner = models.CharField(max_length=64)  # user id supplied by request
+    name = models.CharField(max_length=64)
+    params = models.JSONField(default=dict)  # TaskFilter query parameters
+    # Compiled params - [attname, lookup, value] conditions evaluated against saved task in memory
+    conditions = models.JSONField(default=list)
+    # Set when params limit filter to one project - only tasks of this project are evaluated against it
+    project = models.ForeignKey('projects_app.Project', on_delete=models.CASCADE, null=True, blank=True,
+                                related_name='saved_filters')
+    creation_date = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'name'], name='unique_saved_filter_name')
+        ]
+
+
+class SavedFilterResult(models.Model):
+    """
+    Task matching saved filter
+    """
+    id = models.BigAutoField(primary_key=True)
+    saved_filter = models.ForeignKey(SavedFilter, on_delete=models.CASCADE, related_name='results')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='saved_filter_results')
+
+    class Meta:
+        constraints = [
+            # Listing of saved filter reads tasks by this key
+            models.UniqueConstraint(fields=['saved_filter', 'task'], name='unique_saved_filter_result')
+        ]
+
+
+class ArchivedTask(models.Model, ProjectRelated):
+    """
+    Cold storage of Task (see services/task_archive.py). Same columns as Task, rows keep their ids and keys.
+    Parent is not a database constraint - it may point to hot or archived task.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    key = models.CharField(max_length=64, unique=True)
+    number = models.IntegerField(null=False)
+
+    summary = models.CharField(max_length=100)
+    description = models.CharField(max_length=255, blank=True)
+
+    assignee = models.CharField(max_length=64, blank=True, null=True)
+    creator = models.CharField(max_length=64, blank=False)
+
+    due_date = models.DateTimeField(null=True, blank=True)
+    creation_date = models.DateTimeField()
+    close_date = models.DateTimeField(null=True, blank=True)
+    last_edit_time = models.DateTimeField()
+
+    parent = models.ForeignKey(Task, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True,
+                               related_name='+')
+    # Parent is always hot when task is archived (task with hot children is kept) - its key is stored with the row
+    parent_key = models.CharField(max_length=64, null=True, blank=True)
+    sprint = models.ManyToManyField('sprints_app.Sprint', related_name='archived_tasks', blank=True)
+    project = models.ForeignKey('projects_app.Project', on_delete=models.CASCADE, related_name='archived_tasks')
+
+    estimate = models.IntegerField(null=True, blank=True)
+    type = ChoiceCodeField(codes=TASK_TYPE_CODES, default=TaskType.TASK)
+    priority = ChoiceCodeField(codes=Task.PRIORITY_CODES, default=Task.Priority.MEDIUM)
+    status = ChoiceCodeField(codes=STATUS_CODES, default=Status.TO_DO)
+
+    archived_at = models.DateTimeField()
+
+    def get_project(self):
+        return self.project
+
+    def __str__(self):
+        return f"{self.key} - {self.summary} (archived)"
+
+
+class ArchivedTaskObserver(models.Model, ProjectRelated):
+    id = models.AutoField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='observers')
+    user_id = models.CharField(max_length=64)
+
+    def get_project(self):
+        return self.task.get_project()
+
+
+class ArchivedComment(models.Model, ProjectRelated):
+    id = models.AutoField(primary_key=True)
+    task = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, related_name='comments', null=False)
+    author = models.CharField(max_length=64)
+    content = models.CharField(max_length=255)
+    creation_date = models.DateTimeField()
+    last_edit_time = models.DateTimeField()
+
+    def get_project(self):
+        return self.task.get_project()
@@ -1,19 +1,57 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
 
-from .models import Task, Comment, TaskObserver
+from .models import Task, Comment, TaskObserver, TaskDueNotification, ArchivedTask, ArchivedComment, SavedFilter
 from .services.task_management.task_status_workflow import Status, IncorrectTaskTransition
 from .services.task_management.task_relationship import IncorrectTaskRelationship
 from .services.task_management.task_sprint_manager import TaskSprintManagement
+from .services.saved_filters import SavedFilters, InvalidSavedFilter
+from .services.task_bulk_edit import TaskBulkEdit
 from projects_app.models import Project
 from sprints_app.models import Sprint
+from utils.fast_serializers import FastReadSerializer
+
+class TaskKeyField(serializers.SlugRelatedField):
+    """
+    Related task represented by its key ("<PROJECT>-<number>") - the id of task in API
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'key')
+        if not kwargs.get('read_only'):
+            kwargs.setdefault('queryset', Task.objects.all())
+        super().__init__(**kwargs)
+
 
 class TaskSerializer(serializers.ModelSerializer):
+    id = serializers.CharField(source='key', read_only=True)
+    parent = TaskKeyField(read_only=True)
+
     class Meta:
         model = Task
         fields = ['id', 'summary', 'description', 'assignee', 'creator', 'due_date', 'creation_date', 'close_date',
                   'last_edit_time', 'parent', 'sprint', 'project', 'estimate', 'type', 'priority', 'status']
 
+
+task_fast_serializer = FastReadSerializer(TaskSerializer)
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    id = serializers.CharField(source='key', read_only=True)
+    parent = serializers.CharField(source='parent_key', read_only=True)
+
+    class Meta:
+        model = ArchivedTask
+        fields = [*TaskSerializer.Meta.fields, 'archived_at']
+
+
+archived_task_fast_serializer = FastReadSerializer(ArchivedTaskSerializer)
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
+    parent = TaskKeyField(required=False, allow_null=True)
+
     class Meta:
         model = Task
         fields = ['summary', 'description', 'assignee', 'due_date', 'parent', 'sprint', 'project', 'estimate',
@@ -26,7 +64,6 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             "description": {"required": False, "allow_blank": True},
             "assignee": {"required": False, "allow_blank": True},
             "due_date": {"required": False, "allow_null": True},
-            "parent": {"required": False, "allow_null": True},
             "sprint": {"required": False, "allow_null": True},
             "estimate": {"required": False, "allow_null": True},
             "priority": {"required": False, "allow_null": True},
@@ -65,6 +102,7 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
     remove_sprint = serializers.PrimaryKeyRelatedField(
         queryset=Sprint.objects.all(), required=False, write_only=True, many=True
     )
+    parent = TaskKeyField(required=False, allow_null=True)
 
     class Meta:
         model = Task
@@ -117,19 +155,36 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
 
 
 class CommentSerializer(serializers.ModelSerializer):
+    task = TaskKeyField(read_only=True)
+
     class Meta:
         model = Comment
         fields = ['id', 'task', 'author', 'content', 'creation_date', 'last_edit_time']
 
 
+comment_fast_serializer = FastReadSerializer(CommentSerializer)
+
+
+class ArchivedCommentSerializer(serializers.ModelSerializer):
+    task = TaskKeyField(read_only=True)
+
+    class Meta:
+        model = ArchivedComment
+        fields = CommentSerializer.Meta.fields
+
+
+archived_comment_fast_serializer = FastReadSerializer(ArchivedCommentSerializer)
+
+
 class CommentCreateSerializer(serializers.ModelSerializer):
+    task = TaskKeyField(read_only=True)
+
     class Meta:
         model = Comment
         fields = ['task', 'author', 'content']
 
         extra_kwargs = {
-            "author": {"read_only": True},
-            "task": {"read_only": True}
+            "author": {"read_only": True}
         }
 
     def create(self, validated_data):
@@ -149,13 +204,14 @@ class CommentUpdateSerializer(serializers.ModelSerializer):
 
 
 class TaskObserverSerializer(serializers.ModelSerializer):
+    task = TaskKeyField(read_only=True)
+
     class Meta:
         model = TaskObserver
         fields = ['task', 'user_id']
 
         extra_kwargs = {
-            "user_id": {"read_only": True},
-            "task": {"read_only": True}
+            "user_id": {"read_only": True}
         }
 
     def create(self, validated_data):
@@ -165,3 +221,191 @@ class TaskObserverSerializer(serializers.ModelSerializer):
         }
         validated_data.update(internal_data)
         return super().create(internal_data)
+
+
+class TaskDueNotificationSerializer(serializers.ModelSerializer):
+    task = TaskKeyField(read_only=True)
+
+    class Meta:
+        model = TaskDueNotification
+        fields = ['id', 'task', 'kind', 'due_date', 'created_at']
+
+
+class TaskDependencySerializer(serializers.Serializer):
+    """
+    Exactly one of: blocks - id of task blocked by this task, blocked_by - id of task blocking this task
+    """
+    blocks = serializers.CharField(required=False)
+    blocked_by = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if len(attrs) != 1:
+            raise serializers.ValidationError({"errors": {"non_field_errors": [
+                "Exactly one of 'blocks' and 'blocked_by' is required"]}})
+        return attrs
+
+
+class SavedFilterSerializer(serializers.ModelSerializer):
+    """
+    params - TaskFilter query parameters (e.g. {"assignee": "me", "status": "To Do", "priority": "Urgent"}).
+    Context: owner - user id
+    """
+    params = serializers.DictField(child=serializers.CharField(allow_blank=True))
+
+    class Meta:
+        model = SavedFilter
+        fields = ['id', 'name', 'params', 'project', 'creation_date']
+
+        extra_kwargs = {
+            "project": {"read_only": True}
+        }
+
+    def validate(self, attrs):
+        owner = self.context.get("owner")
+        if 'name' in attrs:
+            same_name = SavedFilter.objects.filter(owner=owner, name=attrs['name'])
+            if self.instance is not None:
+                same_name = same_name.exclude(pk=self.instance.pk)
+            if same_name.exists():
+                raise serializers.ValidationError({"errors": {"name": ["Saved filter with this name already exists"]}})
+        limit = settings.SAVED_FILTER_MAX_PER_USER
+        if self.instance is None and SavedFilter.objects.filter(owner=owner).count() >= limit:
+            raise serializers.ValidationError({"errors": {"non_field_errors": [
+                f"Max {limit} saved filters per user"]}})
+        if 'params' in attrs:
+            try:
+                attrs['conditions'], attrs['project_id'] = SavedFilters.compile(attrs['params'])
+            except InvalidSavedFilter as e:
+                raise serializers.ValidationError({"errors": {"params": [str(e)]}})
+        return attrs
+
+    def create(self, validated_data):
+        validated_data['owner'] = self.context.get("owner")
+        with transaction.atomic():
+            saved_filter = super().create(validated_data)
+            SavedFilters.refresh(saved_filter)
+        return saved_filter
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            saved_filter = super().update(instance, validated_data)
+            if 'params' in validated_data:
+                SavedFilters.refresh(saved_filter)
+        return saved_filter
+
+
+class TaskIncludeSerializer(TaskSerializer):
+    """
+    Task details with embedded related objects (compound document). Context:
+    include - names from TaskIncludeSerializer.include_options
+    Related objects are expected to be prefetched by view (included_<name> attributes and <name>_count annotations)
+    """
+
+    include_options = ('comments', 'observers', 'children', 'parent')
+
+    included = serializers.SerializerMethodField()
+
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ['included']
+
+    def get_included(self, obj):
+        include = self.context.get('include', ())
+        included = {}
+        if 'comments' in include:
+            included['comments'] = {
+                'count': obj.comments_count,
+                'results': CommentSerializer(obj.included_comments, many=True).data
+            }
+        if 'observers' in include:
+            included['observers'] = {
+                'count': obj.observers_count,
+                'results': TaskObserverSerializer(obj.included_observers, many=True).data
+            }
+        if 'children' in include:
+            included['children'] = {
+                'count': obj.children_count,
+                'results': TaskSerializer(obj.included_children, many=True).data
+            }
+        if 'parent' in include:
+            included['parent'] = TaskSerializer(obj.parent).data if obj.parent else None
+        return included
+
+
+class TaskBatchSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.CharField(max_length=64),
+        allow_empty=False,
+        max_length=settings.TASK_BATCH_MAX_IDS
+    )
+
+    def validate_ids(self, value):
+        return list(dict.fromkeys(value))  # Remove duplicates, keep order
+
+
+class TaskBulkPatchSerializer(serializers.ModelSerializer):
+    """
+    Field values of bulk edit (see services/task_bulk_edit.py)
+    """
+
+    class Meta:
+        model = Task
+        fields = list(TaskBulkEdit.fields)
+        extra_kwargs = {field: {'required': False} for field in TaskBulkEdit.fields}
+
+    def validate(self, attrs):
+        unknown = [name for name in self.initial_data if name not in self.fields]
+        if unknown:
+            raise serializers.ValidationError(f'Fields cannot be edited in bulk: {", ".join(unknown)}. '
+                                              f'Allowed: {", ".join(TaskBulkEdit.fields)}')
+        if not attrs:
+            raise serializers.ValidationError('No fields to edit')
+        return attrs
+
+
+class TaskBulkEditSerializer(serializers.Serializer):
+    """
+    Either the same patch for tasks - {"ids": [...], "patch": {...}} - or patch per task - {"items": [{"id": ...,
+    <field>: ...}, ...]}. validated_data holds requested ids, patches (task id -> values) and errors of invalid items
+    """
+    ids = serializers.ListField(
+        child=serializers.CharField(max_length=64),
+        required=False,
+        allow_empty=False,
+        max_length=settings.TASK_BULK_EDIT_MAX_ITEMS
+    )
+    patch = serializers.DictField(required=False)
+    items = serializers.ListField(
+        child=serializers.DictField(),
+        required=False,
+        allow_empty=False,
+        max_length=settings.TASK_BULK_EDIT_MAX_ITEMS
+    )
+
+    def validate(self, attrs):
+        if ('items' in attrs) == ('ids' in attrs or 'patch' in attrs):
+            raise serializers.ValidationError({"errors": {"items": ['Send either ids with patch or items']}})
+
+        if 'items' not in attrs:
+            if 'ids' not in attrs or 'patch' not in attrs:
+                raise serializers.ValidationError({"errors": {"patch": ['Both ids and patch are required']}})
+            patch = TaskBulkPatchSerializer(data=attrs['patch'])
+            if not patch.is_valid():
+                raise serializers.ValidationError({"errors": {"patch": patch.errors}})
+            ids = list(dict.fromkeys(attrs['ids']))
+            return {'ids': ids, 'patches': dict.fromkeys(ids, patch.validated_data), 'errors': {}}
+
+        ids, patches, errors = [], {}, {}
+        for item in attrs['items']:
+            item = dict(item)
+            task_id = item.pop('id', None)
+            if not isinstance(task_id, str) or not task_id:
+                raise serializers.ValidationError({"errors": {"items": ['Every item needs task id']}})
+            if task_id in patches or task_id in errors:
+                raise serializers.ValidationError({"errors": {"items": [f'Task {task_id} is edited more than once']}})
+            ids.append(task_id)
+            patch = TaskBulkPatchSerializer(data=item)
+            if patch.is_valid():
+                patches[task_id] = patch.validated_data
+            else:
+                errors[task_id] = patch.errors
+        return {'ids': ids, 'patches': patches, 'errors': errors}
@@ -0,0 +1,162 @@
+import heapq
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.dispatch import Signal
+from django.utils import timezone
+
+from tasks_app.models import Task, TaskObserver, TaskDueNotification
+from tasks_app.services.task_management.task_status_workflow import Status
+
+# Sent for every fired event with task, kind (TaskDueNotification.Kind) and user_ids that were notified
+task_due = Signal()
+
+
+class DueDateScheduler:
+    """
+    Fires due soon (DUE_SOON_WINDOW before due date) and overdue events of open tasks to their assignee
+    and observers - events are stored as TaskDueNotification rows and sent with task_due signal.
+    Upcoming events are kept in min-heap ordered by fire time. Heap holds only events of the next
+    DUE_DATE_SCHEDULER_HORIZON and is rebuilt from indexed query (partial index on due date of open tasks)
+    when horizon passes, so memory does not grow with number of tasks.
+    Task saves in this process update heap at once (tasks_app/signals.py). Changes made by other processes
+    are picked up with next rebuild, and before firing every event is checked against current task state.
+    Heap entries are never removed - task with changed due date or closed task makes its old entries stale,
+    they are skipped when popped.
+    """
+
+    Kind = TaskDueNotification.Kind
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._heap = []  # (fire_at, task_id, kind, due_date)
+        self._due_dates = {}  # task_id -> due date of scheduled entries
+        self.horizon_end = None
+
+    @property
+    def started(self) -> bool:
+        return self.horizon_end is not None
+
+    @classmethod
+    def open_tasks(cls):
+        return Task.objects.filter(due_date__isnull=False).exclude(status=Status.CLOSED)
+
+    @classmethod
+    def entries(cls, task_id, due_date, now) -> list:
+        entries = [(due_date, task_id, cls.Kind.OVERDUE, due_date)]
+        if due_date > now:  # already overdue task is not due soon any more
+            entries.append((due_date - settings.DUE_SOON_WINDOW, task_id, cls.Kind.DUE_SOON, due_date))
+        return entries
+
+    def push(self, task_id, due_date, now):
+        self._due_dates[task_id] = due_date
+        for entry in self.entries(task_id, due_date, now):
+            if entry[0] < self.horizon_end:
+                heapq.heappush(self._heap, entry)
+
+    def rebuild(self, now=None):
+        now = now or timezone.now()
+        horizon_end = now + settings.DUE_DATE_SCHEDULER_HORIZON
+        already_overdue = TaskDueNotification.objects.filter(
+            task_id=OuterRef('pk'), kind=self.Kind.OVERDUE, due_date=OuterRef('due_date'))
+        tasks = (
+            self.open_tasks()
+            .filter(due_date__lt=horizon_end + settings.DUE_SOON_WINDOW)
+            .exclude(Exists(already_overdue))
+            .values_list('pk', 'due_date')
+        )
+        with self._lock:
+            self._heap = []
+            self._due_dates = {}
+            self.horizon_end = horizon_end
+            for task_id, due_date in tasks:
+                self.push(task_id, due_date, now)
+
+    def task_changed(self, task_id, due_date, status, now=None):
+        if not self.started:
+            return
+        now = now or timezone.now()
+        with self._lock:
+            if due_date is None or status == Status.CLOSED:
+                self._due_dates.pop(task_id, None)
+            elif self._due_dates.get(task_id) != due_date:
+                self.push(task_id, due_date, now)
+
+    def task_deleted(self, task_id):
+        with self._lock:
+            self._due_dates.pop(task_id, None)
+
+    def pop_due(self, now) -> list:
+        """
+        Entries with fire time up to now, stale ones skipped
+        """
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                entry = heapq.heappop(self._heap)
+                if self._due_dates.get(entry[1]) == entry[3]:
+                    due.append(entry)
+        return due
+
+    def next_wakeup(self):
+        with self._lock:
+            return min(self._heap[0][0], self.horizon_end) if self._heap else self.horizon_end
+
+    def run_pending(self, now=None) -> int:
+        """
+        Fire events due up to now, rebuild when horizon has passed. Returns number of created notifications
+        """
+        now = now or timezone.now()
+        if not self.started:
+            self.rebuild(now)
+        fired = self.fire(self.pop_due(now))
+        if now >= self.horizon_end:
+            self.rebuild(now)
+            fired += self.fire(self.pop_due(now))
+        return fired
+
+    def fire(self, entries) -> int:
+        if not entries:
+            return 0
+        task_ids = {task_id for _, task_id, _, _ in entries}
+        # Current state - task may have been closed or rescheduled by other process
+        tasks = self.open_tasks().filter(pk__in=task_ids).in_bulk()
+        events = dict.fromkeys((tasks[task_id], kind) for _, task_id, kind, due_date in entries
+                               if task_id in tasks and tasks[task_id].due_date == due_date)
+        if not events:
+            return 0
+
+        recipients = defaultdict(set)
+        for task_id, user_id in TaskObserver.objects.filter(task_id__in=task_ids).values_list('task_id', 'user_id'):
+            recipients[task_id].add(user_id)
+        for task in tasks.values():
+            if task.assignee:
+                recipients[task.pk].add(task.assignee)
+        already_fired = set(
+            TaskDueNotification.objects.filter(task_id__in=task_ids).values_list('task_id', 'user_id', 'kind',
+                                                                                   'due_date'))
+
+        notifications = []
+        sent = []
+        for task, kind in events:
+            user_ids = sorted(user_id for user_id in recipients[task.pk]
+                              if (task.pk, user_id, kind, task.due_date) not in already_fired)
+            notifications += [TaskDueNotification(task=task, user_id=user_id, kind=kind, due_date=task.due_date)
+                              for user_id in user_ids]
+            if user_ids:
+                sent.append((task, kind, user_ids))
+        TaskDueNotification.objects.bulk_create(notifications, ignore_conflicts=True)
+        for task, kind, user_ids in sent:
+            task_due.send(sender=self.__class__, task=task, kind=kind, user_ids=user_ids)
+        return len(notifications)
+
+    def reset(self):
+        with self._lock:
+            self._heap = []
+            self._due_dates = {}
+            self.horizon_end = None
+
+
+due_date_scheduler = DueDateScheduler()
@@ -0,0 +1,158 @@
+import operator
+from datetime import datetime
+
+from django.apps import apps
+from django.conf import settings
+from django.core.validators import EMPTY_VALUES
+from django.db import transaction
+from django.db.models import DateTimeField, Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidSavedFilter(Exception):
+    pass
+
+
+class SavedFilters:
+    """
+    Saved TaskFilter parameters with materialized set of matching tasks (SavedFilterResult rows), so listing
+    a saved filter is a keyed read instead of running the filter query.
+    Parameters are compiled once into conditions on task columns ([attname, lookup, value]). Every task write
+    (Task.save, in its transaction) evaluates conditions of candidate filters - those of task project and those
+    not limited to a project - against the saved row in memory and adds / removes its result rows.
+    Only filters decided by the task row itself can be saved: sprint (links change without task write) and
+    overdue / due_within (change with time) are rejected.
+    Tasks removed without Task.delete (archive, project deletion) remove their result rows explicitly.
+    Task written concurrently with refresh of a filter may be missed by it until the next refresh.
+    """
+
+    unsupported = ('sprint', 'overdue', 'due_within')
+    operators = {
+        'exact': operator.eq,
+        'gte': operator.ge,
+        'lte': operator.le,
+    }
+
+    @classmethod
+    def compile(cls, params: dict) -> tuple:
+        """
+        (conditions, project_id or None) of TaskFilter query parameters, InvalidSavedFilter if they cannot be saved
+        """
+        from tasks_app.filters import TaskFilter
+        Task = apps.get_model('tasks_app', 'Task')
+
+        filterset = TaskFilter(data=params, queryset=Task.objects.none())
+        unknown = [name for name in params if name not in filterset.filters]
+        if unknown:
+            raise InvalidSavedFilter(f'Unknown filters: {", ".join(unknown)}')
+        unsupported = [name for name in params if name in cls.unsupported]
+        if unsupported:
+            raise InvalidSavedFilter(f'Filters cannot be saved: {", ".join(unsupported)}')
+        if not filterset.is_valid():
+            raise InvalidSavedFilter('; '.join(f'{name}: {" ".join(errors)}'
+                                               for name, errors in filterset.errors.items()))
+
+        conditions, project_id = [], None
+        for name in params:
+            value = filterset.form.cleaned_data.get(name)
+            if value in EMPTY_VALUES:
+                continue
+            definition = filterset.filters[name]
+            if definition.field_name == 'parent__key':
+                attname = 'parent_id'
+                value = Task.objects.filter(key=value).values_list('pk', flat=True).first()
+                if value is None:
+                    raise InvalidSavedFilter(f'Task "{params[name]}" does not exist')
+            else:
+                field = Task._meta.get_field(definition.field_name)
+                attname = field.attname
+                if field.is_relation:
+                    value = value.pk
+            if attname == 'project_id':
+                project_id = value
+            conditions.append([attname, definition.lookup_expr, cls.dump(value)])
+        return conditions, project_id
+
+    @classmethod
+    def dump(cls, value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    @classmethod
+    def load(cls, conditions) -> list:
+        Task = apps.get_model('tasks_app', 'Task')
+        return [(attname, cls.operators[lookup],
+                 parse_datetime(value) if isinstance(Task._meta.get_field(attname), DateTimeField) else value)
+                for attname, lookup, value in conditions]
+
+    @classmethod
+    def matches(cls, conditions, task) -> bool:
+        """
+        conditions - loaded (see load) - as the filter query would decide for this row
+        """
+        for attname, compare, value in conditions:
+            actual = getattr(task, attname)
+            # NULL never matches in SQL comparison
+            if actual is None or not compare(actual, value):
+                return False
+        return True
+
+    @classmethod
+    def task_changed(cls, task, created=False):
+        cls.tasks_changed([task], created=created)
+
+    @classmethod
+    def tasks_changed(cls, tasks, created=False):
+        """
+        Update result sets for written tasks (also used after bulk writes not going through Task.save) -
+        candidate filters and current results are read once for all tasks
+        """
+        SavedFilter = apps.get_model('tasks_app', 'SavedFilter')
+        SavedFilterResult = apps.get_model('tasks_app', 'SavedFilterResult')
+        tasks = list(tasks)
+        if not tasks:
+            return
+
+        project_ids = {task.project_id for task in tasks}
+        candidates = [
+            (pk, project_id, cls.load(conditions)) for pk, project_id, conditions in
+            SavedFilter.objects.filter(Q(project_id__in=project_ids) | Q(project__isnull=True))
+            .values_list('pk', 'project_id', 'conditions')
+        ]
+        matching = {(pk, task.pk) for task in tasks for pk, project_id, conditions in candidates
+                    if project_id in (None, task.project_id) and cls.matches(conditions, task)}
+        existing = {} if created else {
+            (saved_filter_id, task_id): pk for pk, saved_filter_id, task_id in
+            SavedFilterResult.objects.filter(task_id__in=[task.pk for task in tasks])
+            .values_list('pk', 'saved_filter_id', 'task_id')
+        }
+        stale = [pk for key, pk in existing.items() if key not in matching]
+        if stale:
+            SavedFilterResult.objects.filter(pk__in=stale).delete()
+        added = [SavedFilterResult(saved_filter_id=saved_filter_id, task_id=task_id)
+                 for saved_filter_id, task_id in matching if (saved_filter_id, task_id) not in existing]
+        if added:
+            SavedFilterResult.objects.bulk_create(added, ignore_conflicts=True)
+
+    @classmethod
+    def refresh(cls, saved_filter, batch_size=None) -> int:
+        """
+        Materialize result set of saved filter from scratch (on create and on change of parameters).
+        Returns number of matching tasks
+        """
+        from tasks_app.filters import TaskFilter
+        Task = apps.get_model('tasks_app', 'Task')
+        SavedFilterResult = apps.get_model('tasks_app', 'SavedFilterResult')
+        batch_size = batch_size or settings.SAVED_FILTER_BATCH_SIZE
+
+        with transaction.atomic():
+            SavedFilterResult.objects.filter(saved_filter=saved_filter).delete()
+            task_ids = (TaskFilter(data=saved_filter.params, queryset=Task.objects.all()).qs
+                        .order_by().values_list('pk', flat=True))
+            total, batch = 0, []
+            for task_id in task_ids.iterator(chunk_size=batch_size):
+                batch.append(SavedFilterResult(saved_filter_id=saved_filter.pk, task_id=task_id))
+                if len(batch) >= batch_size:
+                    total += len(SavedFilterResult.objects.bulk_create(batch))
+                    batch = []
+            total += len(SavedFilterResult.objects.bulk_create(batch))
+        return total
@@ -0,0 +1,129 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from caching.generations import ProjectGenerations
+from projects_app.services.project_counters import ProjectCounters
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.models import (Task, Comment, TaskObserver, TaskDueNotification, TaskDependency, ArchivedTask,
+                              ArchivedComment, ArchivedTaskObserver, SavedFilterResult)
+from tasks_app.services.task_dependencies import TaskDependencies
+from tasks_app.services.task_management.task_status_workflow import Status
+from utils.models_helpers import raw_delete
+
+
+class TaskArchive:
+    """
+    Moves cold tasks from hot tables (Task, Comment, TaskObserver, sprint links) to archive tables.
+    Task is cold when:
+    - all its sprints are closed for more than ARCHIVE_SPRINT_RETENTION_DAYS, or
+    - it is closed for more than ARCHIVE_TASK_RETENTION_DAYS.
+    Task with children left in hot table is kept, so hot rows never reference archived parent
+    (it becomes cold once its children are archived).
+    Each batch is moved in its own transaction and candidates are selected from current state, so the job
+    can be stopped at any time and started again - it continues with what is left.
+    Due date notifications, dependency links and saved filter results of archived tasks are not kept.
+    """
+
+    @classmethod
+    def cutoffs(cls, sprint_retention_days=None, task_retention_days=None):
+        """
+        (sprint_cutoff, task_cutoff) - sprints / tasks closed before these times are cold
+        """
+        now = timezone.now()
+        if sprint_retention_days is None:
+            sprint_retention_days = settings.ARCHIVE_SPRINT_RETENTION_DAYS
+        if task_retention_days is None:
+            task_retention_days = settings.ARCHIVE_TASK_RETENTION_DAYS
+        return now - timedelta(days=sprint_retention_days), now - timedelta(days=task_retention_days)
+
+    @classmethod
+    def candidates(cls, sprint_cutoff, task_cutoff):
+        links = Task.sprint.through.objects.filter(task_id=OuterRef('pk'))
+        cold_sprint = Q(sprint__status=SprintStatus.CLOSED, sprint__close_date__lt=sprint_cutoff)
+        return (
+            Task.objects
+            .filter(
+                Q(Exists(links.filter(cold_sprint)), ~Exists(links.exclude(cold_sprint)))
+                | Q(status=Status.CLOSED, close_date__lt=task_cutoff)
+            )
+            .exclude(Exists(Task.objects.filter(parent_id=OuterRef('pk'))))
+            .order_by('pk')
+        )
+
+    @classmethod
+    def copy_rows(cls, queryset, target_model, sources=None, **extra) -> list:
+        """
+        Copy rows to model with the same columns, preserving primary keys.
+        sources - {column: lookup} for columns of target model read from related rows
+        """
+        sources = sources or {}
+        columns = [field.attname for field in target_model._meta.concrete_fields
+                   if field.attname not in extra and field.attname not in sources]
+        rows = [target_model(**row, **extra)
+                for row in queryset.values(*columns, **{column: F(lookup) for column, lookup in sources.items()})]
+        return target_model.objects.bulk_create(rows)
+
+    @classmethod
+    def archive_batch(cls, batch_size, sprint_cutoff, task_cutoff) -> int:
+        """
+        Archive up to batch_size cold tasks with their comments, observers and sprint links.
+        Returns number of archived tasks (0 when nothing is left)
+        """
+        with transaction.atomic():
+            candidates = cls.candidates(sprint_cutoff, task_cutoff).select_for_update()
+            task_ids = list(candidates.values_list('pk', flat=True)[:batch_size])
+            if not task_ids:
+                return 0
+
+            tasks = Task.objects.filter(pk__in=task_ids)
+            statuses = Counter(tasks.values_list('project_id', 'status'))
+            cls.copy_rows(tasks, ArchivedTask, sources={'parent_key': 'parent__key'}, archived_at=timezone.now())
+            links = Task.sprint.through.objects.filter(task_id__in=task_ids)
+            ArchivedTask.sprint.through.objects.bulk_create([
+                ArchivedTask.sprint.through(archivedtask_id=task_id, sprint_id=sprint_id)
+                for task_id, sprint_id in links.values_list('task_id', 'sprint_id')
+            ])
+            comments = Comment.objects.filter(task_id__in=task_ids)
+            cls.copy_rows(comments, ArchivedComment)
+            observers = TaskObserver.objects.filter(task_id__in=task_ids)
+            cls.copy_rows(observers, ArchivedTaskObserver)
+
+            notifications = TaskDueNotification.objects.filter(task_id__in=task_ids)
+            saved_filter_results = SavedFilterResult.objects.filter(task_id__in=task_ids)
+            dependencies = TaskDependency.objects.filter(Q(blocker_id__in=task_ids) | Q(blocked_id__in=task_ids))
+            dependency_projects = set(dependencies.values_list('project_id', flat=True))
+            for queryset in (comments, observers, notifications, saved_filter_results, dependencies, links,
+                             tasks):
+                raw_delete(queryset)
+            if dependency_projects:
+                TaskDependencies.changed(*dependency_projects)
+
+            for (project_id, status), total in statuses.items():
+                if ProjectCounters.task_field(status):
+                    ProjectCounters.apply(project_id, {ProjectCounters.task_field(status): -total})
+            ProjectGenerations.bump(*{project_id for project_id, _ in statuses})
+        return len(task_ids)
+
+    @classmethod
+    def run(cls, batch_size=None, max_batches=None, sprint_retention_days=None, task_retention_days=None,
+            progress=None) -> int:
+        """
+        Archive batches until no cold task is left (or max_batches is reached). Returns number of archived tasks
+        """
+        batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        sprint_cutoff, task_cutoff = cls.cutoffs(sprint_retention_days, task_retention_days)
+        archived = batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = cls.archive_batch(batch_size, sprint_cutoff, task_cutoff)
+            if not moved:
+                break
+            archived += moved
+            batches += 1
+            if progress:
+                progress(archived)
+        return archived
@@ -0,0 +1,103 @@
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from caching.generations import ProjectGenerations
+from permissions.project_permissions import IsDeveloperOrDeny, active_members
+from tasks_app.services.saved_filters import SavedFilters
+
+
+class TaskBulkEdit:
+    """
+    Field edits (assignee, priority, estimate, due date) of many tasks in one transaction - the same patch for all
+    tasks or a patch per task. Tasks are locked in batches in primary key order, membership is checked once per
+    project and changed tasks are written with bulk_update of changed columns (and last_edit_time) only, grouped by
+    the set of changed columns.
+    bulk_update does not go through Task.save and sends no signals, so the work done there is repeated for the whole
+    batch: saved filter results, response cache generations and due date scheduler (after commit).
+    Edited fields are not counted in ProjectCounters (project, status) - counters stay as they are.
+    Results per task id:
+    - updated / unchanged (patch equal to current values)
+    - not_found - task does not exist or is in project user cannot see (as in /tasks/batch/)
+    - forbidden - user is only viewer of the project
+    """
+
+    fields = ('assignee', 'priority', 'estimate', 'due_date')
+
+    UPDATED = 'updated'
+    UNCHANGED = 'unchanged'
+    NOT_FOUND = 'not_found'
+    FORBIDDEN = 'forbidden'
+
+    @classmethod
+    def apply(cls, user_id, patches: dict, batch_size=None) -> dict:
+        """
+        patches - task key -> {field: value} (validated values). Returns task key -> result
+        """
+        Task = apps.get_model('tasks_app', 'Task')
+        batch_size = batch_size or settings.TASK_BULK_EDIT_BATCH_SIZE
+        keys = list(patches)
+
+        with transaction.atomic():
+            # Keys resolved to primary keys first and rows locked in primary key order across all batches - bulk
+            # edits of overlapping tasks wait for each other instead of deadlocking
+            pks = []
+            for i in range(0, len(keys), batch_size):
+                pks.extend(Task.objects.filter(key__in=keys[i:i + batch_size]).values_list('pk', flat=True))
+            pks.sort()
+            tasks = {}
+            for i in range(0, len(pks), batch_size):
+                queryset = Task.objects.select_for_update().filter(pk__in=pks[i:i + batch_size]).order_by('pk')
+                tasks.update((task.key, task) for task in queryset)
+
+            # Permission check once per project
+            roles = dict(active_members(user_id, project_id__in={task.project_id for task in tasks.values()})
+                         .values_list('project_id', 'role'))
+            results, changed = {}, {}
+            for key in keys:
+                task = tasks.get(key)
+                if task is None or task.project_id not in roles:
+                    results[key] = cls.NOT_FOUND
+                elif roles[task.project_id] not in IsDeveloperOrDeny.allowed_roles:
+                    results[key] = cls.FORBIDDEN
+                else:
+                    columns = tuple(field for field in cls.fields
+                                    if field in patches[key] and getattr(task, field) != patches[key][field])
+                    results[key] = cls.UPDATED if columns else cls.UNCHANGED
+                    if columns:
+                        for field in columns:
+                            setattr(task, field, patches[key][field])
+                        changed.setdefault(columns, []).append(task)
+
+            cls.write(changed, batch_size)
+        return results
+
+    @classmethod
+    def write(cls, changed: dict, batch_size):
+        """
+        changed - tuple of changed columns -> tasks
+        """
+        Task = apps.get_model('tasks_app', 'Task')
+        now = timezone.now()
+        updated = []
+        for columns, tasks in changed.items():
+            for task in tasks:
+                task.last_edit_time = now
+            Task.objects.bulk_update(tasks, [*columns, 'last_edit_time'], batch_size=batch_size)
+            updated.extend(tasks)
+        if not updated:
+            return
+
+        SavedFilters.tasks_changed(updated)
+        ProjectGenerations.bump(*{task.project_id for task in updated})
+        due_dates = [(task.pk, task.due_date, task.status) for columns, tasks in changed.items()
+                     if 'due_date' in columns for task in tasks]
+        if due_dates:
+            transaction.on_commit(lambda: cls.reschedule(due_dates))
+
+    @classmethod
+    def reschedule(cls, due_dates):
+        from tasks_app.services.due_date_scheduler import due_date_scheduler
+        for task_id, due_date, status in due_dates:
+            due_date_scheduler.task_changed(task_id, due_date, status)
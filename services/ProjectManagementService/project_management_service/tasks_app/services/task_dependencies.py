@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from projects_app.models import Project
+from tasks_app.models import Task, TaskDependency
+
+
+class IncorrectTaskDependency(Exception):
+    pass
+
+
+class TaskDependencyCycle(IncorrectTaskDependency):
+    pass
+
+
+class TaskDependencies:
+    """
+    "Blocks / blocked by" links between tasks of one project.
+    Dependency graph of project (blocker -> blocked adjacency) is loaded with one flat query and kept in memory
+    of the process, tagged with Project.dependency_version. Every link change moves the version forward in the same
+    transaction (tasks_app/signals.py), so stale graph is never used - it is loaded again. Version is never lower
+    than current time in ns, so version of rolled back change is not reused by a later one.
+    New link is checked for cycle under project row lock: concurrent links can not close a cycle together.
+    """
+
+    _lock = threading.Lock()
+    _graphs = OrderedDict()  # project_id -> (dependency_version, {blocker_id: frozenset(blocked_ids)})
+
+    @classmethod
+    def load(cls, project_id) -> dict:
+        graph = {}
+        links = TaskDependency.objects.filter(project_id=project_id).values_list('blocker_id', 'blocked_id')
+        for blocker_id, blocked_id in links:
+            graph.setdefault(blocker_id, set()).add(blocked_id)
+        return {blocker_id: frozenset(blocked_ids) for blocker_id, blocked_ids in graph.items()}
+
+    @classmethod
+    def graph(cls, project_id, version=None) -> dict:
+        if version is None:
+            version = Project.all_objects.filter(pk=project_id).values_list('dependency_version', flat=True).first()
+        with cls._lock:
+            cached = cls._graphs.get(project_id)
+            if cached is not None and cached[0] == version:
+                cls._graphs.move_to_end(project_id)
+                return cached[1]
+        graph = cls.load(project_id)
+        with cls._lock:
+            cls._graphs[project_id] = (version, graph)
+            cls._graphs.move_to_end(project_id)
+            while len(cls._graphs) > settings.DEPENDENCY_GRAPH_CACHE_PROJECTS:
+                cls._graphs.popitem(last=False)
+        return graph
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._graphs.clear()
+
+    @classmethod
+    def changed(cls, *project_ids):
+        Project.all_objects.filter(pk__in=set(project_ids)).update(
+            dependency_version=Greatest(F('dependency_version') + 1, Value(time.time_ns())))
+
+    @classmethod
+    def find_path(cls, graph, source, target):
+        """
+        Path of task ids from source to target following links (iterative DFS), None when target is not reachable
+        """
+        previous = {source: None}
+        stack = [source]
+        while stack:
+            task_id = stack.pop()
+            if task_id == target:
+                path = []
+                while task_id is not None:
+                    path.append(task_id)
+                    task_id = previous[task_id]
+                return path[::-1]
+            for blocked_id in graph.get(task_id, ()):
+                if blocked_id not in previous:
+                    previous[blocked_id] = task_id
+                    stack.append(blocked_id)
+        return None
+
+    @classmethod
+    def add(cls, blocker, blocked):
+        """
+        Returns (dependency, created)
+        """
+        if blocker.project_id != blocked.project_id:
+            raise IncorrectTaskDependency(f'Task {blocker.key} and task {blocked.key} are not in the same project')
+        if blocker.pk == blocked.pk:
+            raise TaskDependencyCycle(f'Task {blocker.key} cannot block itself')
+        with transaction.atomic():
+            version = (Project.all_objects.select_for_update().filter(pk=blocker.project_id)
+                       .values_list('dependency_version', flat=True).get())
+            graph = cls.graph(blocker.project_id, version)
+            if blocked.pk in graph.get(blocker.pk, ()):
+                return TaskDependency.objects.get(blocker=blocker, blocked=blocked), False
+            path = cls.find_path(graph, blocked.pk, blocker.pk)
+            if path:
+                keys = dict(Task.objects.filter(pk__in=path).values_list('pk', 'key'))
+                raise TaskDependencyCycle(f'Task {blocker.key} cannot block task {blocked.key} - it would create '
+                                          f'cycle: {" -> ".join([blocker.key, *(keys[task_id] for task_id in path)])}')
+            return TaskDependency.objects.create(blocker=blocker, blocked=blocked, project_id=blocker.project_id), True
+
+    @classmethod
+    def remove(cls, blocker, blocked) -> bool:
+        deleted, _ = TaskDependency.objects.filter(blocker=blocker, blocked=blocked).delete()
+        return bool(deleted)
+
+    @classmethod
+    def critical_path(cls, project_id, tasks) -> dict:
+        """
+        Schedule of tasks [(id, estimate)] when task starts once all its blockers (among these tasks) are finished
+        and takes `estimate` (no estimate - 0). Earliest start / finish in forward pass, slack in backward pass
+        over topological order (Kahn) - O(tasks + links). Critical path is the longest chain (zero slack).
+        """
+        graph = cls.graph(project_id)
+        estimates = {task_id: estimate or 0 for task_id, estimate in tasks}
+        successors = {task_id: [blocked_id for blocked_id in graph.get(task_id, ()) if blocked_id in estimates]
+                      for task_id in estimates}
+        blockers_left = dict.fromkeys(estimates, 0)
+        for blocked_ids in successors.values():
+            for blocked_id in blocked_ids:
+                blockers_left[blocked_id] += 1
+
+        order = []
+        start = dict.fromkeys(estimates, 0)
+        critical_blocker = dict.fromkeys(estimates)
+        queue = deque(task_id for task_id, count in blockers_left.items() if count == 0)
+        while queue:
+            task_id = queue.popleft()
+            order.append(task_id)
+            finish = start[task_id] + estimates[task_id]
+            for blocked_id in successors[task_id]:
+                if critical_blocker[blocked_id] is None or finish > start[blocked_id]:
+                    start[blocked_id] = finish
+                    critical_blocker[blocked_id] = task_id
+                blockers_left[blocked_id] -= 1
+                if blockers_left[blocked_id] == 0:
+                    queue.append(blocked_id)
+
+        finish = {task_id: start[task_id] + estimates[task_id] for task_id in order}
+        total = max(finish.values(), default=0)
+        latest_finish = {}
+        for task_id in reversed(order):
+            latest_finish[task_id] = min((latest_finish[blocked_id] - estimates[blocked_id]
+                                          for blocked_id in successors[task_id]), default=total)
+
+        path = []
+        task_id = next((task_id for task_id in order if finish[task_id] == total), None)
+        while task_id is not None:
+            path.append(task_id)
+            task_id = critical_blocker[task_id]
+
+        return {
+            'earliest_finish': total,
+            'critical_path': path[::-1],
+            'tasks': [{
+                'id': task_id,
+                'estimate': estimates[task_id],
+                'earliest_start': start[task_id],
+                'earliest_finish': finish[task_id],
+                'slack': latest_finish[task_id] - finish[task_id],
+            } for task_id in order],
+        }
@@ -0,0 +1,343 @@
+from collections import namedtuple
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import CheckConstraint, UniqueConstraint
+
+from utils.online_migration import OnlineColumnMigration, OnlineMigrationError
+
+
+class TaskKeyMigrationError(OnlineMigrationError):
+    pass
+
+
+# Column of `model` (`field`) referencing task by its old string id, resolved to new id in any of `owners`
+Reference = namedtuple('Reference', ['model', 'field', 'owners'])
+
+
+class TaskKeyMigration(OnlineColumnMigration):
+    """
+    Moves existing PostgreSQL database from string primary key of Task and ArchivedTask ("<PROJECT>-<number>")
+    to integer one, the string is kept as unique `key` column. Every column referencing tasks (parent, sprint
+    links, comments, observers, due notifications, dependencies, archive tables) is moved to the integer id.
+    Runs online in phases while old code keeps serving requests - only swap takes table locks, for a short time:
+    - prepare: new nullable columns (metadata only change), id sequence shared by hot and archived tasks as default
+      of new rows, triggers resolving new reference columns of rows written meanwhile
+    - backfill: ids and references of existing rows in batches (each in its own transaction - can be stopped and
+      run again), then concurrently built indexes and validated NOT NULL checks for new columns
+    - swap: one transaction - old columns dropped, new ones renamed in their place, primary keys and unique
+      constraints attached to prebuilt indexes, foreign keys added as NOT VALID. Deploy new code right after
+    - validate: constraints added in swap are validated without blocking writes
+    Archived task keeps the id it had as hot task only when archived after prepare - ids are never reused
+    between the two tables, references are resolved by old string id in both.
+    """
+
+    title = 'Online task key migration'
+    error = TaskKeyMigrationError
+    batch_size_setting = 'TASK_KEY_MIGRATION_BATCH_SIZE'
+    lock_timeout_setting = 'TASK_KEY_MIGRATION_LOCK_TIMEOUT'
+    new_id = 'new_id'
+
+    def __init__(self, using='default'):
+        super().__init__(using)
+        self.Task = apps.get_model('tasks_app', 'Task')
+        self.ArchivedTask = apps.get_model('tasks_app', 'ArchivedTask')
+        self.owners = (self.Task, self.ArchivedTask)
+        self.sequence = f'{self.Task._meta.db_table}_id_seq'
+
+    # Schema description (from current models)
+
+    def references(self) -> list:
+        references = []
+        for model in apps.get_models(include_auto_created=True):
+            for field in model._meta.concrete_fields:
+                if field.many_to_one and field.related_model in self.owners:
+                    # Reference without database constraint (parent of archived task) may point to either table
+                    owners = (field.related_model,) if field.db_constraint else self.owners
+                    references.append(Reference(model, field, owners))
+        return references
+
+    def unique_sets(self, model, columns) -> list:
+        """
+        (name, columns) of unique constraints of model containing any of columns
+        """
+        opts = model._meta
+        unique = [(constraint.name, [opts.get_field(name).column for name in constraint.fields])
+                  for constraint in opts.constraints
+                  if isinstance(constraint, UniqueConstraint) and constraint.fields and constraint.condition is None]
+        for names in opts.unique_together:
+            fields = [opts.get_field(name).column for name in names]
+            unique.append((self.name(opts.db_table, *fields, 'uniq'), fields))
+        return [(name, fields) for name, fields in unique if set(fields) & set(columns)]
+
+    def new_column(self, field) -> str:
+        return f'new_{field.column}'
+
+    def key_field(self, reference):
+        """
+        Column keeping string key of referenced task (e.g. ArchivedTask.parent_key), old reference value is the key
+        """
+        try:
+            return reference.model._meta.get_field(f'{reference.field.name}_key')
+        except FieldDoesNotExist:
+            return None
+
+    def tables(self) -> list:
+        tables = [owner._meta.db_table for owner in self.owners]
+        for reference in self.references():
+            if reference.model._meta.db_table not in tables:
+                tables.append(reference.model._meta.db_table)
+        return tables
+
+    # Database state
+
+    def swapped(self, cursor) -> bool:
+        return 'key' in self.columns(cursor, self.Task._meta.db_table)
+
+    def prepared(self, cursor) -> bool:
+        return self.new_id in self.columns(cursor, self.Task._meta.db_table)
+
+    def trigger_names(self, reference):
+        table = reference.model._meta.db_table
+        return self.name(table, reference.field.column, 'key_migration'), self.name(table, reference.field.column,
+                                                                                   'key_migration_fn')
+
+    # Phases
+
+    def prepare(self):
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            if self.swapped(cursor):
+                raise TaskKeyMigrationError('Task keys are already migrated')
+            self.set_lock_timeout(cursor)
+            self.execute(cursor, f'CREATE SEQUENCE IF NOT EXISTS {self.quote(self.sequence)} AS bigint')
+            for owner in self.owners:
+                table = self.quote(owner._meta.db_table)
+                # Nullable column without default is added without rewriting table, default applies to new rows
+                self.execute(cursor, f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {self.new_id} bigint')
+                self.execute(cursor, f"ALTER TABLE {table} ALTER COLUMN {self.new_id} "
+                                     f"SET DEFAULT nextval('{self.sequence}')")
+
+            for reference in self.references():
+                table = self.quote(reference.model._meta.db_table)
+                column, new_column = reference.field.column, self.new_column(reference.field)
+                assignments = [f'NEW.{new_column} := {self.resolve(reference, f"NEW.{self.quote(column)}")};']
+                key_field = self.key_field(reference)
+                if key_field is not None:
+                    self.execute(cursor, f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {self.quote(key_field.column)} '
+                                         f'varchar({key_field.max_length})')
+                    assignments.append(f'NEW.{self.quote(key_field.column)} := NEW.{self.quote(column)};')
+                self.execute(cursor, f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {new_column} bigint')
+
+                self.create_trigger(cursor, reference.model._meta.db_table, column, *self.trigger_names(reference),
+                                    assignments)
+
+    def resolve(self, reference, value) -> str:
+        """
+        SQL expression - new id of task referenced with old string id `value`
+        """
+        owners = [f'(SELECT owner.{self.new_id} FROM {self.quote(owner._meta.db_table)} AS owner '
+                  f'WHERE owner.{self.quote(owner._meta.pk.column)} = {value})' for owner in reference.owners]
+        return owners[0] if len(owners) == 1 else f'COALESCE({", ".join(owners)})'
+
+    def backfill(self, batch_size=None, progress=None) -> int:
+        """
+        Returns number of updated rows
+        """
+        batch_size = self.batch_size(batch_size)
+        updated = 0
+        with self.connection.cursor() as cursor:
+            if self.swapped(cursor) or not self.prepared(cursor):
+                raise TaskKeyMigrationError('Backfill runs between prepare and swap')
+
+            for owner in self.owners:
+                table, pk = self.quote(owner._meta.db_table), self.quote(owner._meta.pk.column)
+                while True:
+                    rows = self.execute(cursor, f"UPDATE {table} SET {self.new_id} = nextval('{self.sequence}') "
+                                                f"WHERE {pk} IN (SELECT {pk} FROM {table} WHERE {self.new_id} IS NULL "
+                                                f"ORDER BY {pk} LIMIT %s)", [batch_size]).rowcount
+                    if not rows:
+                        break
+                    updated += rows
+                    if progress:
+                        progress(owner._meta.db_table, updated)
+
+            for reference in self.references():
+                updated = self.backfill_reference(cursor, reference, batch_size, updated, progress)
+
+            self.build_indexes(cursor)
+        return updated
+
+    def backfill_reference(self, cursor, reference, batch_size, updated, progress) -> int:
+        table = self.quote(reference.model._meta.db_table)
+        pk = self.quote(reference.model._meta.pk.column)
+        column, new_column = self.quote(reference.field.column), self.new_column(reference.field)
+        assignments = [f'{new_column} = {self.resolve(reference, f"ref.{column}")}']
+        key_field = self.key_field(reference)
+        if key_field is not None:
+            assignments.append(f'{self.quote(key_field.column)} = ref.{column}')
+
+        last_pk = None
+        while True:
+            # Keyset pagination - reference to task that no longer exists stays NULL and is not selected again
+            after = f' AND {pk} > %s' if last_pk is not None else ''
+            params = [last_pk] if last_pk is not None else []
+            self.execute(cursor, f'SELECT {pk} FROM {table} WHERE {new_column} IS NULL AND {column} IS NOT NULL'
+                                 f'{after} ORDER BY {pk} LIMIT %s', [*params, batch_size])
+            pks = [row[0] for row in cursor.fetchall()]
+            if not pks:
+                return updated
+            updated += self.execute(cursor, f'UPDATE {table} AS ref SET {", ".join(assignments)} '
+                                            f'WHERE ref.{pk} = ANY(%s)', [pks]).rowcount
+            last_pk = pks[-1]
+            if progress:
+                progress(f'{reference.model._meta.db_table}.{reference.field.column}', updated)
+
+    def build_indexes(self, cursor):
+        for owner in self.owners:
+            table = owner._meta.db_table
+            self.create_index(cursor, self.name(table, self.new_id, 'uniq'), table, [self.new_id], unique=True)
+            self.create_index(cursor, self.name(table, 'key', 'uniq'), table, [self.quote(owner._meta.pk.column)],
+                              unique=True)
+            self.add_not_null_check(cursor, table, self.new_id)
+
+        for reference in self.references():
+            table, field = reference.model._meta.db_table, reference.field
+            if field.db_index:
+                self.create_index(cursor, self.name(table, self.new_column(field), 'idx'), table,
+                                  [self.new_column(field)])
+            if not field.null:
+                self.add_not_null_check(cursor, table, self.new_column(field))
+
+        for model, columns in self.reference_columns().items():
+            for name, fields in self.unique_sets(model, columns):
+                self.create_index(cursor, self.name(name, 'new'), model._meta.db_table,
+                                  [f'new_{column}' if column in columns else self.quote(column) for column in fields],
+                                  unique=True)
+
+    def reference_columns(self) -> dict:
+        columns = {}
+        for reference in self.references():
+            columns.setdefault(reference.model, []).append(reference.field.column)
+        return columns
+
+    def swap(self):
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            if self.swapped(cursor):
+                raise TaskKeyMigrationError('Task keys are already migrated')
+            if not self.prepared(cursor):
+                raise TaskKeyMigrationError('Run prepare and backfill first')
+            self.set_lock_timeout(cursor)
+            tables = ', '.join(self.quote(table) for table in self.tables())
+            self.execute(cursor, f'LOCK TABLE {tables} IN ACCESS EXCLUSIVE MODE')
+            self.check_backfilled(cursor)
+
+            for reference in self.references():
+                table = self.quote(reference.model._meta.db_table)
+                self.drop_trigger(cursor, reference.model._meta.db_table, *self.trigger_names(reference))
+                # Drops foreign key, indexes and constraints of old column as well
+                self.execute(cursor, f'ALTER TABLE {table} DROP COLUMN {self.quote(reference.field.column)} CASCADE')
+                self.execute(cursor, f'ALTER TABLE {table} RENAME COLUMN {self.new_column(reference.field)} '
+                                     f'TO {self.quote(reference.field.column)}')
+
+            for owner in self.owners:
+                self.swap_owner(cursor, owner)
+
+            for reference in self.references():
+                self.attach_reference(cursor, reference)
+
+            for model, columns in self.reference_columns().items():
+                table = self.quote(model._meta.db_table)
+                for name, _ in self.unique_sets(model, columns):
+                    self.execute(cursor, f'ALTER TABLE {table} ADD CONSTRAINT {self.quote(name)} '
+                                         f'UNIQUE USING INDEX {self.quote(self.name(name, "new"))}')
+                # Check constraints over dropped columns were dropped with them
+                with self.connection.schema_editor(atomic=False) as schema_editor:
+                    for constraint in model._meta.constraints:
+                        if (not isinstance(constraint, CheckConstraint)
+                                or self.constraint_exists(cursor, model._meta.db_table, constraint.name)):
+                            continue
+                        check = constraint._get_check_sql(model, schema_editor)
+                        self.execute(cursor, f'ALTER TABLE {table} ADD CONSTRAINT {self.quote(constraint.name)} '
+                                         f'CHECK ({check}) NOT VALID')
+
+    def check_backfilled(self, cursor):
+        for owner in self.owners:
+            self.execute(cursor, f'SELECT count(*) FROM {self.quote(owner._meta.db_table)} '
+                                 f'WHERE {self.new_id} IS NULL')
+            if cursor.fetchone()[0]:
+                raise TaskKeyMigrationError(f'{owner._meta.db_table} has rows without new id - run backfill')
+        for reference in self.references():
+            if not reference.field.db_constraint:
+                continue  # reference to task that no longer exists becomes NULL
+            self.execute(cursor, f'SELECT count(*) FROM {self.quote(reference.model._meta.db_table)} '
+                                 f'WHERE {self.new_column(reference.field)} IS NULL '
+                                 f'AND {self.quote(reference.field.column)} IS NOT NULL')
+            if cursor.fetchone()[0]:
+                raise TaskKeyMigrationError(f'{reference.model._meta.db_table}.{reference.field.column} has rows '
+                                            f'without new id - run backfill')
+
+    def swap_owner(self, cursor, owner):
+        table = owner._meta.db_table
+        quoted = self.quote(table)
+        self.execute(cursor, "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+                     [table])
+        primary_key = cursor.fetchone()[0]
+        self.execute(cursor, f'ALTER TABLE {quoted} DROP CONSTRAINT {self.quote(primary_key)}')
+        self.execute(cursor, f'ALTER TABLE {quoted} RENAME COLUMN {self.quote(owner._meta.pk.column)} TO key')
+        self.execute(cursor, f'ALTER TABLE {quoted} RENAME COLUMN {self.new_id} TO {self.quote(owner._meta.pk.column)}')
+        self.set_not_null(cursor, table, owner._meta.pk.column, self.not_null_check(table, self.new_id))
+        self.execute(cursor, f'ALTER TABLE {quoted} ADD CONSTRAINT {self.quote(primary_key)} PRIMARY KEY '
+                             f'USING INDEX {self.quote(self.name(table, self.new_id, "uniq"))}')
+        self.execute(cursor, f'ALTER TABLE {quoted} ADD CONSTRAINT {self.quote(self.name(table, "key", "uniq"))} '
+                             f'UNIQUE USING INDEX {self.quote(self.name(table, "key", "uniq"))}')
+        pk = self.quote(owner._meta.pk.column)
+        if owner is self.Task:
+            self.execute(cursor, f'ALTER SEQUENCE {self.quote(self.sequence)} OWNED BY {quoted}.{pk}')
+        else:
+            # Archived task takes id of hot task
+            self.execute(cursor, f'ALTER TABLE {quoted} ALTER COLUMN {pk} DROP DEFAULT')
+
+    def attach_reference(self, cursor, reference):
+        table, field = reference.model._meta.db_table, reference.field
+        if not field.null:
+            self.set_not_null(cursor, table, field.column, self.not_null_check(table, self.new_column(field)))
+        if field.db_index:
+            self.execute(cursor, f'ALTER INDEX {self.quote(self.name(table, self.new_column(field), "idx"))} '
+                                 f'RENAME TO {self.quote(self.name(table, field.column, "idx"))}')
+        if field.db_constraint:
+            owner = field.related_model._meta
+            self.execute(cursor, f'ALTER TABLE {self.quote(table)} ADD CONSTRAINT '
+                                 f'{self.quote(self.name(table, field.column, "fk"))} FOREIGN KEY '
+                                 f'({self.quote(field.column)}) REFERENCES {self.quote(owner.db_table)} '
+                                 f'({self.quote(owner.pk.column)}) DEFERRABLE INITIALLY DEFERRED NOT VALID')
+
+    def validate(self) -> list:
+        """
+        Validates constraints added as NOT VALID by swap (SHARE UPDATE EXCLUSIVE lock - reads and writes go on)
+        """
+        with self.connection.cursor() as cursor:
+            if not self.swapped(cursor):
+                raise TaskKeyMigrationError('Run swap first')
+            return self.validate_tables(cursor, self.tables())
+
+    def status(self) -> dict:
+        """
+        Rows still waiting for backfill per table / column (empty once swapped)
+        """
+        with self.connection.cursor() as cursor:
+            if self.swapped(cursor):
+                return {}
+            if not self.prepared(cursor):
+                raise TaskKeyMigrationError('Run prepare first')
+            pending = {}
+            for owner in self.owners:
+                self.execute(cursor, f'SELECT count(*) FROM {self.quote(owner._meta.db_table)} '
+                                     f'WHERE {self.new_id} IS NULL')
+                pending[owner._meta.db_table] = cursor.fetchone()[0]
+            for reference in self.references():
+                self.execute(cursor, f'SELECT count(*) FROM {self.quote(reference.model._meta.db_table)} '
+                                     f'WHERE {self.new_column(reference.field)} IS NULL '
+                                     f'AND {self.quote(reference.field.column)} IS NOT NULL')
+                pending[f'{reference.model._meta.db_table}.{reference.field.column}'] = cursor.fetchone()[0]
+            return pending
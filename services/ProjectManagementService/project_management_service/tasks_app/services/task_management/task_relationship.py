@@ -1,5 +1,7 @@
 from django.db import models
 
+from utils.models_helpers import ChoiceCodes
+
 
 class TaskType(models.TextChoices):
     SUBTASK = 'Subtask', 'Subtask'
@@ -10,6 +12,17 @@ class TaskType(models.TextChoices):
     SUPPORT = 'Support', 'Support'
 
 
+# Stored in database (ChoiceCodeField) - never renumber
+TASK_TYPE_CODES = ChoiceCodes(TaskType, {
+    TaskType.SUBTASK: 1,
+    TaskType.TASK: 2,
+    TaskType.EPIC: 3,
+    TaskType.INITIATIVE: 4,
+    TaskType.BUG: 5,
+    TaskType.SUPPORT: 6,
+})
+
+
 class IncorrectTaskRelationship(Exception):
     pass
 
@@ -19,13 +32,13 @@ class TaskRelationship:
     possible_children = {
         TaskType.SUBTASK: (),
         TaskType.TASK: (
-            TaskType.SUBTASK
+            TaskType.SUBTASK,
         ),
         TaskType.BUG: (
-            TaskType.SUBTASK
+            TaskType.SUBTASK,
         ),
         TaskType.SUPPORT: (
-            TaskType.SUBTASK
+            TaskType.SUBTASK,
         ),
         TaskType.EPIC: (
             TaskType.TASK,
@@ -33,10 +46,14 @@ class TaskRelationship:
             TaskType.SUPPORT
         ),
         TaskType.INITIATIVE: (
-            TaskType.EPIC
+            TaskType.EPIC,
         )
     }
 
+    # Allowed child type codes of each type code as bit set
+    children_masks = {TASK_TYPE_CODES.code(parent): TASK_TYPE_CODES.mask(children)
+                      for parent, children in possible_children.items()}
+
     @classmethod
-    def can_be_related(cls, parent_type: TaskType, child_type: TaskType) -> bool:
-        return child_type in cls.possible_children[parent_type]
\ No newline at end of file
+    def can_be_related(cls, parent_type: TaskType | int, child_type: TaskType | int) -> bool:
+        return bool(cls.children_masks[TASK_TYPE_CODES.code(parent_type)] >> TASK_TYPE_CODES.code(child_type) & 1)
@@ -1,7 +1,11 @@
 from django.db import transaction
 from rest_framework import serializers
 from sprints_app.models import Sprint
+from sprints_app.services.sprint_status_management import SprintStatus
+from caching.generations import ProjectGenerations
+from tasks_app.models import Task
 from .task_relationship import TaskType
+from .task_status_workflow import Status
 
 class TaskSprintManagement:
 
@@ -30,3 +34,37 @@ class TaskSprintManagement:
             task.sprint.add(sprint)
             for child in task.children:
                 cls.add_task_to_sprint(child, sprint)
+
+    @classmethod
+    def subtree_ids(cls, task_ids) -> set:
+        """
+        Given tasks and all their descendants - one query per hierarchy level, not per task
+        """
+        found = set(task_ids)
+        level = found
+        while level:
+            level = set(Task.objects.filter(parent_id__in=level).values_list('pk', flat=True)) - found
+            found |= level
+        return found
+
+    @classmethod
+    def rollover(cls, sprint, target) -> int:
+        """
+        Add unfinished (not Closed) tasks of sprint with their subtrees to target sprint - one bulk insert
+        into task-sprint links. Tasks keep link to the closed sprint (its history). Returns number of added links
+        """
+        if target.project_id != sprint.project_id:
+            raise serializers.ValidationError("Sprints are in different projects")
+        if target.status == SprintStatus.CLOSED:
+            raise serializers.ValidationError("Cannot roll over tasks to already closed sprint")
+
+        unfinished = sprint.tasks.exclude(status=Status.CLOSED).values_list('pk', flat=True)
+        task_ids = cls.subtree_ids(unfinished)
+        Link = Task.sprint.through
+        with transaction.atomic():
+            already_linked = set(Link.objects.filter(sprint=target, task_id__in=task_ids)
+                                 .values_list('task_id', flat=True))
+            new_links = [Link(task_id=task_id, sprint_id=target.pk) for task_id in sorted(task_ids - already_linked)]
+            Link.objects.bulk_create(new_links, ignore_conflicts=True)
+            ProjectGenerations.bump(sprint.project_id)  # bulk insert sends no m2m_changed
+        return len(new_links)
@@ -1,5 +1,7 @@
 from django.db import models
 
+from utils.models_helpers import ChoiceCodes
+
 
 class Status(models.TextChoices):
     TO_DO = 'To Do', 'To Do'
@@ -8,6 +10,15 @@ class Status(models.TextChoices):
     CLOSED = 'Closed', 'Closed'
 
 
+# Stored in database (ChoiceCodeField) - never renumber
+STATUS_CODES = ChoiceCodes(Status, {
+    Status.TO_DO: 1,
+    Status.IN_PROGRESS: 2,
+    Status.IN_REVIEW: 3,
+    Status.CLOSED: 4,
+})
+
+
 class IncorrectTaskTransition(Exception):
     pass
 
@@ -35,6 +46,9 @@ class TaskStatusWorkFlow:
         )
     }
 
+    # Allowed target codes of each status code as bit set
+    transition_masks = {STATUS_CODES.code(status): STATUS_CODES.mask(targets) for status, targets in transitions.items()}
+
     @classmethod
-    def can_transition(cls, from_status: Status, to_status: Status) -> bool:
-        return to_status in cls.transitions[from_status]
+    def can_transition(cls, from_status: Status | int, to_status: Status | int) -> bool:
+        return bool(cls.transition_masks[STATUS_CODES.code(from_status)] >> STATUS_CODES.code(to_status) & 1)
@@ -0,0 +1,458 @@
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from utils.models_helpers import ChoiceCodeField
+
+
+class InvalidTaskQuery(Exception):
+    pass
+
+
+# Syntax tree
+Comparison = namedtuple('Comparison', ['field', 'op', 'value'])     # op: = != < <= > >= ~ !~ in !in empty !empty
+BoolOp = namedtuple('BoolOp', ['op', 'children'])                   # op: and / or
+Not = namedtuple('Not', ['child'])
+Now = namedtuple('Now', ['offset'])                                 # now() + offset, resolved at execution
+Day = namedtuple('Day', ['date'])                                   # date literal - the whole day
+
+# Parsed and compiled query. q is None when query depends on now() - compiled from tree at execution
+Plan = namedtuple('Plan', ['tree', 'q', 'order_by'])
+
+Token = namedtuple('Token', ['kind', 'text', 'position'])
+
+
+class TaskQuery:
+    """
+    Small query language over tasks (GET /tasks/?q=...), e.g.
+        project = ABC AND (status IN ("To Do", "In Progress") OR priority = Urgent) AND due_date < now()+7d
+        ORDER BY priority, due_date DESC
+    - operators: = != < <= > >= (dates and numbers), IN / NOT IN (...), IS EMPTY / IS NOT EMPTY,
+      ~ / !~ text match with * wildcard at start and / or end of pattern; AND, OR, NOT, parentheses
+    - values: bare words (ABC, ABC-12, Urgent), quoted strings, numbers, dates (2025-01-31 is the whole day),
+      ISO datetimes, now() with optional offset in m / h / d / w
+    - ORDER BY fields with ASC / DESC. Choice fields (status, priority, type) sort by their stored code -
+      priority ascending is Urgent first, status ascending follows the workflow (To Do ... Closed)
+    Queries are parsed and compiled into Q trees once - plans are kept in bounded LRU cache of the process keyed
+    by query text. Queries that would defeat indexes (leading wildcard text match) are rejected unless they are
+    restricted to projects (top level project = / project IN).
+    """
+
+    fields = {
+        'id': 'key',
+        'key': 'key',
+        'project': 'project_id',
+        'summary': 'summary',
+        'description': 'description',
+        'assignee': 'assignee',
+        'creator': 'creator',
+        'type': 'type',
+        'priority': 'priority',
+        'status': 'status',
+        'estimate': 'estimate',
+        'due_date': 'due_date',
+        'creation_date': 'creation_date',
+        'close_date': 'close_date',
+        'last_edit_time': 'last_edit_time',
+        'parent': 'parent__key',
+        'sprint': 'sprint',
+    }
+    keywords = {'and', 'or', 'not', 'in', 'is', 'empty', 'null', 'order', 'by', 'asc', 'desc'}
+    units = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+    # Literals outside of these would overflow in Python or database
+    integer_range = (-2 ** 31, 2 ** 31 - 1)
+    max_offset = timedelta(days=100 * 365)
+    token_pattern = re.compile(r'''
+        (?P<space>\s+)
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<op><=|>=|!=|!~|=|<|>|~)
+      | (?P<lparen>\()
+      | (?P<rparen>\))
+      | (?P<comma>,)
+      | (?P<now>now\(\))
+      | (?P<offset>[+-]\s*\d+[mhdw]\b)
+      | (?P<word>[A-Za-z0-9_*][A-Za-z0-9_.:*+\-]*)
+    ''', re.VERBOSE | re.IGNORECASE)
+
+    _lock = threading.Lock()
+    _plans = OrderedDict()  # query text -> Plan
+
+    # Plans
+
+    @classmethod
+    def plan(cls, text) -> Plan:
+        with cls._lock:
+            plan = cls._plans.get(text)
+            if plan is not None:
+                cls._plans.move_to_end(text)
+                return plan
+        plan = cls.build(text)
+        with cls._lock:
+            cls._plans[text] = plan
+            cls._plans.move_to_end(text)
+            while len(cls._plans) > settings.TASK_QUERY_CACHE_SIZE:
+                cls._plans.popitem(last=False)
+        return plan
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._plans.clear()
+
+    @classmethod
+    def build(cls, text) -> Plan:
+        if len(text) > settings.TASK_QUERY_MAX_LENGTH:
+            raise InvalidTaskQuery(f'Query is longer than {settings.TASK_QUERY_MAX_LENGTH} characters')
+        tree, order_by = Parser(cls, cls.tokenize(text)).query()
+        cls.check_indexes(tree)
+        q = cls.compile(tree) if tree is not None and not cls.uses_now(tree) else None
+        return Plan(tree, q, order_by)
+
+    @classmethod
+    def filter(cls, queryset, text):
+        plan = cls.plan(text.strip())
+        if plan.tree is not None:
+            queryset = queryset.filter(plan.q if plan.q is not None else cls.compile(plan.tree, timezone.now()))
+        if plan.order_by:
+            queryset = queryset.order_by(*plan.order_by, 'pk')
+        return queryset
+
+    # Tokens
+
+    @classmethod
+    def tokenize(cls, text) -> list:
+        tokens, position = [], 0
+        while position < len(text):
+            match = cls.token_pattern.match(text, position)
+            if match is None:
+                raise InvalidTaskQuery(f'Unexpected character at {position}: "{text[position]}"')
+            kind, value = match.lastgroup, match.group()
+            if kind == 'word' and value.lower() in cls.keywords:
+                kind = value.lower()
+            elif kind == 'string':
+                value = re.sub(r'\\(.)', r'\1', value[1:-1])
+            if kind != 'space':
+                tokens.append(Token(kind, value, position))
+            position = match.end()
+        tokens.append(Token('end', '', len(text)))
+        return tokens
+
+    # Values
+
+    @classmethod
+    def model_field(cls, field):
+        Task = apps.get_model('tasks_app', 'Task')
+        if field == 'parent':
+            return Task._meta.get_field('key')
+        if field == 'sprint':
+            return models.IntegerField()
+        return Task._meta.get_field(cls.fields[field].removesuffix('_id'))
+
+    @classmethod
+    def value(cls, field, token):
+        """
+        Python value of literal token for field
+        """
+        model_field = cls.model_field(field)
+        text = token.text
+        if isinstance(model_field, models.DateTimeField):
+            if token.kind == 'now':
+                return Now(timedelta())
+            # Date literal is the whole day (parse_datetime would read it as midnight)
+            try:
+                day = parse_date(text)
+                moment = parse_datetime(text) if day is None else None
+                if day is not None:
+                    cls.day_bounds(day)
+                    return Day(day)
+                if moment is not None:
+                    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+            except (OverflowError, ValueError):
+                pass
+            raise InvalidTaskQuery(f'{field}: expected date, datetime or now(), got "{text}"')
+        if token.kind == 'now':
+            raise InvalidTaskQuery(f'{field}: now() is allowed only for dates')
+        if isinstance(model_field, ChoiceCodeField):
+            values = {value.lower(): value for value in model_field.choice_codes.choices.values}
+            if text.lower() not in values:
+                raise InvalidTaskQuery(f'{field}: unknown value "{text}", expected one of {list(values.values())}')
+            return values[text.lower()]
+        if isinstance(model_field, models.IntegerField):
+            try:
+                number = int(text)
+            except ValueError:
+                raise InvalidTaskQuery(f'{field}: expected number, got "{text}"') from None
+            if not cls.integer_range[0] <= number <= cls.integer_range[1]:
+                raise InvalidTaskQuery(f'{field}: number {text} is out of range')
+            return number
+        return text
+
+    @classmethod
+    def ordered(cls, field) -> bool:
+        return isinstance(cls.model_field(field), (models.DateTimeField, models.IntegerField)) \
+            and not isinstance(cls.model_field(field), ChoiceCodeField) and field != 'sprint'
+
+    @classmethod
+    def text(cls, field) -> bool:
+        return isinstance(cls.model_field(field), models.CharField)
+
+    # Checks
+
+    @classmethod
+    def uses_now(cls, node) -> bool:
+        if isinstance(node, BoolOp):
+            return any(cls.uses_now(child) for child in node.children)
+        if isinstance(node, Not):
+            return cls.uses_now(node.child)
+        return isinstance(node.value, Now)
+
+    @classmethod
+    def comparisons(cls, node):
+        if isinstance(node, BoolOp):
+            for child in node.children:
+                yield from cls.comparisons(child)
+        elif isinstance(node, Not):
+            yield from cls.comparisons(node.child)
+        else:
+            yield node
+
+    @classmethod
+    def restricted_to_projects(cls, tree) -> bool:
+        conjuncts = tree.children if isinstance(tree, BoolOp) and tree.op == 'and' else [tree]
+        return any(isinstance(node, Comparison) and node.field == 'project' and node.op in ('=', 'in')
+                   for node in conjuncts)
+
+    @classmethod
+    def check_indexes(cls, tree):
+        if tree is None or cls.restricted_to_projects(tree):
+            return
+        for node in cls.comparisons(tree):
+            if node.op in ('~', '!~') and node.value.startswith('*'):
+                raise InvalidTaskQuery(f'{node.field} ~ "{node.value}": leading wildcard scans all tasks - '
+                                       f'restrict query to projects (project = ... AND ...)')
+
+    # Compilation
+
+    @classmethod
+    def compile(cls, node, now=None) -> Q:
+        if isinstance(node, BoolOp):
+            q = Q()
+            for child in node.children:
+                q = q & cls.compile(child, now) if node.op == 'and' else q | cls.compile(child, now)
+            return q
+        if isinstance(node, Not):
+            return ~cls.compile(node.child, now)
+        return cls.compile_comparison(node, now)
+
+    @classmethod
+    def compile_comparison(cls, node, now) -> Q:
+        field, op, value = cls.fields[node.field], node.op, node.value
+        if isinstance(value, Now):
+            value = now + value.offset
+
+        if op in ('empty', '!empty'):
+            model_field = cls.model_field(node.field)
+            q = Q(**{f'{field}__isnull': True}) if model_field.null else Q(**{field: ''})
+            return q if op == 'empty' else ~q
+        if op in ('in', '!in'):
+            q = cls.sprint_q(value) if node.field == 'sprint' else Q(**{f'{field}__in': value})
+            return q if op == 'in' else ~q
+        if op in ('~', '!~'):
+            q = cls.match_q(field, value)
+            return q if op == '~' else ~q
+        if node.field == 'sprint':
+            q = cls.sprint_q([value])
+            return q if op == '=' else ~q
+        if isinstance(value, Day):
+            return cls.day_q(field, op, value.date)
+
+        lookups = {'=': 'exact', '<': 'lt', '<=': 'lte', '>': 'gt', '>=': 'gte'}
+        if op == '!=':
+            return ~Q(**{field: value})
+        return Q(**{f'{field}__{lookups[op]}': value})
+
+    @classmethod
+    def sprint_q(cls, sprint_ids) -> Q:
+        # Subquery on links - no join, no duplicated rows
+        Task = apps.get_model('tasks_app', 'Task')
+        return Q(pk__in=Task.sprint.through.objects.filter(sprint_id__in=sprint_ids).values('task_id'))
+
+    @classmethod
+    def match_q(cls, field, pattern) -> Q:
+        starts, ends = pattern.startswith('*'), pattern.endswith('*') and len(pattern) > 1
+        text = pattern.strip('*')
+        if starts and ends:
+            return Q(**{f'{field}__contains': text})
+        if starts:
+            return Q(**{f'{field}__endswith': text})
+        if ends:
+            return Q(**{f'{field}__startswith': text})
+        return Q(**{field: text})
+
+    @classmethod
+    def day_bounds(cls, day) -> tuple:
+        """
+        (start, end) of day in current time zone, OverflowError / ValueError at the ends of calendar
+        """
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        return start, start + timedelta(days=1)
+
+    @classmethod
+    def day_q(cls, field, op, day) -> Q:
+        try:
+            start, end = cls.day_bounds(day)
+        except (OverflowError, ValueError):
+            raise InvalidTaskQuery(f'{field}: date {day} is out of range') from None
+        if op in ('=', '!='):
+            q = Q(**{f'{field}__gte': start, f'{field}__lt': end})
+            return q if op == '=' else ~q
+        bounds = {'<': ('lt', start), '<=': ('lt', end), '>': ('gte', end), '>=': ('gte', start)}
+        lookup, bound = bounds[op]
+        return Q(**{f'{field}__{lookup}': bound})
+
+
+class Parser:
+    """
+    Recursive descent parser of TaskQuery tokens:
+        query      := [or_expr] [ORDER BY field [ASC|DESC] {, field [ASC|DESC]}]
+        or_expr    := and_expr {OR and_expr}
+        and_expr   := not_expr {AND not_expr}
+        not_expr   := NOT not_expr | ( or_expr ) | comparison
+        comparison := field op value | field [NOT] IN ( value {, value} ) | field IS [NOT] EMPTY
+    """
+
+    def __init__(self, query, tokens):
+        self.query_class = query
+        self.tokens = tokens
+        self.index = 0
+
+    @property
+    def current(self) -> Token:
+        return self.tokens[self.index]
+
+    def advance(self) -> Token:
+        token = self.current
+        self.index += 1
+        return token
+
+    def expect(self, *kinds) -> Token:
+        if self.current.kind not in kinds:
+            found = self.current.text or 'end of query'
+            raise InvalidTaskQuery(f'Expected {" or ".join(kinds)} at {self.current.position}, got "{found}"')
+        return self.advance()
+
+    def query(self):
+        tree = None
+        if self.current.kind not in ('order', 'end'):
+            tree = self.or_expr()
+        order_by = []
+        if self.current.kind == 'order':
+            self.advance()
+            self.expect('by')
+            order_by.append(self.order_field())
+            while self.current.kind == 'comma':
+                self.advance()
+                order_by.append(self.order_field())
+        self.expect('end')
+        if tree is None and not order_by:
+            raise InvalidTaskQuery('Query is empty')
+        return tree, order_by
+
+    def order_field(self) -> str:
+        field = self.field()
+        if field == 'sprint':
+            raise InvalidTaskQuery('Cannot order by sprint')
+        direction = self.advance().kind if self.current.kind in ('asc', 'desc') else 'asc'
+        column = self.query_class.fields[field]
+        return f'-{column}' if direction == 'desc' else column
+
+    def field(self) -> str:
+        token = self.expect('word')
+        field = token.text.lower()
+        if field not in self.query_class.fields:
+            raise InvalidTaskQuery(f'Unknown field "{token.text}" at {token.position}, '
+                                   f'expected one of {list(self.query_class.fields)}')
+        return field
+
+    def or_expr(self):
+        children = [self.and_expr()]
+        while self.current.kind == 'or':
+            self.advance()
+            children.append(self.and_expr())
+        return children[0] if len(children) == 1 else BoolOp('or', tuple(children))
+
+    def and_expr(self):
+        children = [self.not_expr()]
+        while self.current.kind == 'and':
+            self.advance()
+            children.append(self.not_expr())
+        return children[0] if len(children) == 1 else BoolOp('and', tuple(children))
+
+    def not_expr(self):
+        if self.current.kind == 'not':
+            self.advance()
+            return Not(self.not_expr())
+        if self.current.kind == 'lparen':
+            self.advance()
+            node = self.or_expr()
+            self.expect('rparen')
+            return node
+        return self.comparison()
+
+    def comparison(self) -> Comparison:
+        query = self.query_class
+        field = self.field()
+        if self.current.kind == 'is':
+            self.advance()
+            negated = self.current.kind == 'not'
+            if negated:
+                self.advance()
+            self.expect('empty', 'null')
+            return Comparison(field, '!empty' if negated else 'empty', None)
+        if self.current.kind in ('in', 'not'):
+            negated = self.advance().kind == 'not'
+            if negated:
+                self.expect('in')
+            self.expect('lparen')
+            values = [self.literal(field)]
+            while self.current.kind == 'comma':
+                self.advance()
+                values.append(self.literal(field))
+            self.expect('rparen')
+            if any(isinstance(value, (Now, Day)) for value in values):
+                raise InvalidTaskQuery(f'{field}: IN takes exact values, use comparisons for dates')
+            return Comparison(field, '!in' if negated else 'in', tuple(values))
+
+        op = self.expect('op')
+        if op.text in ('<', '<=', '>', '>=') and not query.ordered(field):
+            raise InvalidTaskQuery(f'{field}: "{op.text}" is allowed only for dates and numbers')
+        if op.text in ('~', '!~'):
+            if not query.text(field):
+                raise InvalidTaskQuery(f'{field}: "{op.text}" is allowed only for text fields')
+            pattern = self.expect('string', 'word').text
+            if '*' in pattern.strip('*') or not pattern.strip('*'):
+                raise InvalidTaskQuery(f'{field} ~ "{pattern}": wildcard * is allowed only at start and end')
+            return Comparison(field, op.text, pattern)
+        return Comparison(field, op.text, self.literal(field))
+
+    def literal(self, field):
+        token = self.expect('word', 'string', 'now')
+        value = self.query_class.value(field, token)
+        if isinstance(value, Now) and self.current.kind == 'offset':
+            offset = self.advance().text.replace(' ', '')
+            try:
+                delta = timedelta(**{self.query_class.units[offset[-1].lower()]: int(offset[:-1])})
+            except (OverflowError, ValueError):
+                delta = None
+            if delta is None or abs(delta) > self.query_class.max_offset:
+                raise InvalidTaskQuery(f'{field}: offset {offset} is out of range')
+            value = Now(delta)
+        return value
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Task, TaskDependency
+from .services.due_date_scheduler import due_date_scheduler
+from .services.task_dependencies import TaskDependencies
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, **kwargs):
+    task_id, due_date, status = instance.pk, instance.due_date, instance.status
+    transaction.on_commit(lambda: due_date_scheduler.task_changed(task_id, due_date, status))
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    task_id = instance.pk
+    transaction.on_commit(lambda: due_date_scheduler.task_deleted(task_id))
+
+
+@receiver([post_save, post_delete], sender=TaskDependency)
+def task_dependency_changed(sender, instance, **kwargs):
+    # In the same transaction - dependency graph cached with old version is not used any more
+    TaskDependencies.changed(instance.project_id)
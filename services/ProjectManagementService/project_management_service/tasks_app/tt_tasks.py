@@ -83,7 +83,7 @@ def test_task_create_successful():
 
     assert task_epic.project == project
     assert task_epic.sprint.filter(id=sprint.id).exists()
-    assert task_epic.id == f'{project_id}-{project.last_task_index}'
+    assert task_epic.key == f'{project_id}-{project.last_task_index}'
     assert task_epic.number == project.last_task_index
     assert task_epic.summary == task_summary
     assert task_epic.description == task_description
@@ -107,7 +107,7 @@ def test_task_create_successful():
         parent=task_epic
     )
 
-    assert task_bug.id == f'{project.id}-{project.last_task_index}'
+    assert task_bug.key == f'{project.id}-{project.last_task_index}'
     assert task_bug.parent == task_epic
     assert task_bug.type == task_bug_type
 
@@ -141,7 +141,7 @@ def test_task_create_without_sprint():
     )
 
     project.refresh_from_db()
-    assert task.id == f'{project_id}-{project.last_task_index}'
+    assert task.key == f'{project_id}-{project.last_task_index}'
 
 
 @pytest.mark.django_db
@@ -161,7 +161,7 @@ def test_task_create_without_parent():
         priority=Task.Priority.MEDIUM,
     )
 
-    assert task.id == f'{project_id}-{project.last_task_index}'
+    assert task.key == f'{project_id}-{project.last_task_index}'
 
 @pytest.mark.django_db
 def test_task_parent_relation():
@@ -1,11 +1,21 @@
 from django.urls import path, include
 
-from .views import TasksView, TaskByIdView, CommentByIdView, CommentListCreateView, TaskObserversView
+from .views import (TasksView, TaskByIdView, CommentByIdView, CommentListCreateView, TaskObserversView, TaskBatchView,
+                    TaskBulkEditView, TaskDueNotificationsView, TaskDependenciesView, TaskCriticalPathView,
+                    SavedFiltersView, SavedFilterByIdView, SavedFilterTasksView)
 
 urlpatterns = [
     path('', TasksView.as_view()),
+    path('batch/', TaskBatchView.as_view()),
+    path('bulk/', TaskBulkEditView.as_view()),
+    path('due-notifications/', TaskDueNotificationsView.as_view()),
+    path('saved-filters/', SavedFiltersView.as_view()),
+    path('saved-filters/<int:filter_pk>/', SavedFilterByIdView.as_view()),
+    path('saved-filters/<int:filter_pk>/tasks/', SavedFilterTasksView.as_view()),
     path('<str:task_pk>/', TaskByIdView.as_view()),
     path('<str:task_pk>/comments/', CommentListCreateView.as_view()),
     path('<str:task_pk>/observers/', TaskObserversView.as_view()),
+    path('<str:task_pk>/dependencies/', TaskDependenciesView.as_view()),
+    path('<str:task_pk>/critical-path/', TaskCriticalPathView.as_view()),
     path('comments/<int:comment_pk>/', CommentByIdView.as_view()),
 ]
\ No newline at end of file
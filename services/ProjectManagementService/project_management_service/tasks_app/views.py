@@ -7,53 +7,106 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK
 from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
 
-from django.db.models import Exists, OuterRef
+from django.conf import settings
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 
-from .filters import TaskFilter, CommentFilter
-from .models import Task, Comment, TaskObserver
+from .filters import TaskFilter, CommentFilter, ArchivedTaskFilter, ArchivedCommentFilter, TaskDueNotificationFilter
+from .models import Task, Comment, TaskObserver, TaskDueNotification, ArchivedTask, ArchivedComment, SavedFilter
 from .serializers import (TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer, CommentSerializer,
                           CommentCreateSerializer, CommentUpdateSerializer,
-                          TaskObserverSerializer)
+                          TaskObserverSerializer, TaskIncludeSerializer, TaskBatchSerializer, TaskBulkEditSerializer,
+                          TaskDueNotificationSerializer, TaskDependencySerializer,
+                          ArchivedTaskSerializer, ArchivedCommentSerializer, SavedFilterSerializer,
+                          task_fast_serializer, comment_fast_serializer, archived_task_fast_serializer,
+                          archived_comment_fast_serializer)
 
 from permissions.project_permissions import IsDeveloperOrDeny, IsViewerOrDeny, IsAdminOrDeny
-from projects_app.models import ProjectMember
+from projects_app.services.project_deletion import ProjectDeletion
+from .services.task_dependencies import TaskDependencies, IncorrectTaskDependency
+from .services.task_query import TaskQuery, InvalidTaskQuery
+from .services.task_bulk_edit import TaskBulkEdit
+from caching.response_cache import CachedResponseMixin, project_from_query_params, project_from_task_id
+from permissions.visibility import ProjectVisibility
+from utils.fast_serializers import FastListMixin
+from utils.request_user import UserIdMixin
 
 
-class TasksView(generics.ListCreateAPIView):
+def archived_requested(request) -> bool:
+    """
+    List views read archive tables (see services/task_archive.py) only for GET with ?archived=true
+    """
+    return request.method == 'GET' and request.query_params.get('archived', '').lower() in ('true', '1')
+
+
+class ArchiveFallbackMixin:
+    """
+    Mixin for detail views: GET of object that is not in hot table is served from archive table
+    (same permission checks, archive serializer)
+    """
+
+    archive_queryset = None
+    archive_serializer_class = None
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            lookup = {self.lookup_field: self.kwargs[self.lookup_url_kwarg or self.lookup_field]}
+            instance = get_object_or_404(self.archive_queryset.all(), **lookup)
+            self.check_object_permissions(request, instance)
+            return Response(self.archive_serializer_class(instance).data)
+
+
+class TasksView(UserIdMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView):
     """
     Class for List / Create Tasks
-    GET - Fetch list of accessible tasks (for viewers)
+    GET - Fetch list of accessible tasks (for viewers). Archived tasks are listed (instead of hot ones)
+          with archived=true. Hot tasks can be queried with q (see TaskQuery), e.g.
+          q=project = ABC AND status IN ("To Do", "In Progress") ORDER BY priority
     POST - Create Task (for devs and admins)
     """
 
     queryset = Task.objects.all()
     filter_backends = [DjangoFilterBackend]
-    filterset_class = TaskFilter
-    methods_permissions_classes = {
+    fast_serializer = task_fast_serializer
+    methods_permission_classes = {
         'POST': [IsDeveloperOrDeny]
     }
 
     def get_queryset(self):
         """
         Optimized solution to filter out tasks in projects that user should not see.
-        Creating additional column with annotate that will have True/False regarding if ProjectMember has line
-        with task project and user's ID
+        User's projects are resolved once (cached) and used in indexed project_id IN (...) filter
         """
         user_id = self.get_user_id()
-        return Task.objects.annotate(
-            is_member=Exists(
-                ProjectMember.objects.filter(
-                    project=OuterRef('project_id'),
-                    user=user_id
-                )
-            )
-        ).filter(is_member=True)
-
-    def get_user_id(self):
-        return self.request.headers.get('user_id') # TO DO: Change when user id correctly handled
+        query = self.request.query_params.get('q')
+        if archived_requested(self.request):
+            if query:
+                raise ValidationError({"errors": {"q": ["Query is not supported for archived tasks"]}})
+            return ProjectVisibility.filter_queryset(ArchivedTask.objects.all(), user_id)
+        queryset = ProjectVisibility.filter_queryset(Task.objects.select_related('parent'), user_id)
+        if query:
+            try:
+                queryset = TaskQuery.filter(queryset, query)
+            except InvalidTaskQuery as e:
+                raise ValidationError({"errors": {"q": [str(e)]}})
+        return queryset
+
+    @property
+    def filterset_class(self):
+        return ArchivedTaskFilter if archived_requested(self.request) else TaskFilter
+
+    def get_fast_serializer(self):
+        return archived_task_fast_serializer if archived_requested(self.request) else self.fast_serializer
+
+    def get_cache_project_ids(self, visible_project_ids):
+        return project_from_query_params(self.request, visible_project_ids)
 
     def get_permissions(self):
         permission_classes = [permissions.IsAuthenticated]
@@ -61,6 +114,8 @@ class TasksView(generics.ListCreateAPIView):
         return [p() for p in permission_classes]
 
     def get_serializer_class(self):
+        if archived_requested(self.request):
+            return ArchivedTaskSerializer
         if self.request.method == "GET":
             return TaskSerializer
         if self.request.method == "POST":
@@ -80,20 +135,26 @@ class TasksView(generics.ListCreateAPIView):
         return Response(response_details.data, status=status.HTTP_201_CREATED, headers=headers)
 
 
-class TaskByIdView(generics.RetrieveUpdateDestroyAPIView):
+class TaskByIdView(CachedResponseMixin, ArchiveFallbackMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     View for managing single task
-    GET - Get task details (for viewers)
+    GET - Get task details (for viewers). Optional include=comments,observers,children,parent embeds related
+          objects (up to include_limit of each) - one permission check and prefetch queries instead of 4 requests.
+          Archived task is returned from archive (without include)
     PATCH - Update partially task (for devs and admins)
     DELETE - Remove task (for admins
     """
 
 
-    queryset = Task.objects.all()
-    lookup_field = 'id'
+    queryset = ProjectVisibility.not_deleted(Task.objects.all())
+    archive_queryset = ProjectVisibility.not_deleted(
+        ArchivedTask.objects.select_related('project').prefetch_related('sprint')
+    )
+    archive_serializer_class = ArchivedTaskSerializer
+    lookup_field = 'key'
     lookup_url_kwarg = 'task_pk'
     http_method_names = ['get', 'patch', 'delete']
-    methods_permissions_classes = {
+    methods_permission_classes = {
         'GET': [IsViewerOrDeny],
         'PATCH': [IsDeveloperOrDeny],
         'DELETE': [IsAdminOrDeny]
@@ -105,7 +166,63 @@ class TaskByIdView(generics.RetrieveUpdateDestroyAPIView):
         return [p() for p in permission_classes]
 
 
+    def get_cache_project_ids(self, visible_project_ids):
+        return project_from_task_id(self.kwargs['task_pk'], visible_project_ids)
+
+    def get_include(self):
+        param = self.request.query_params.get('include')
+        if self.request.method != 'GET' or not param:
+            return ()
+        include = tuple(dict.fromkeys(name.strip() for name in param.split(',') if name.strip()))
+        unknown = [name for name in include if name not in TaskIncludeSerializer.include_options]
+        if unknown:
+            raise ValidationError({"include": [f"Unknown include: {', '.join(unknown)}. "
+                                               f"Allowed: {', '.join(TaskIncludeSerializer.include_options)}"]})
+        return include
+
+    def get_include_limit(self):
+        try:
+            limit = int(self.request.query_params.get('include_limit', settings.TASK_INCLUDE_LIMIT))
+        except ValueError:
+            raise ValidationError({"include_limit": ["A valid integer is required."]})
+        return max(0, min(limit, settings.TASK_INCLUDE_MAX_LIMIT))
+
+    def get_queryset(self):
+        include = self.get_include()
+        if not include:
+            return ProjectVisibility.not_deleted(Task.objects.select_related('parent'))
+
+        limit = self.get_include_limit()
+        # project for permission check
+        queryset = ProjectVisibility.not_deleted(
+            Task.objects.select_related('project', 'parent').prefetch_related('sprint')
+        )
+        related = {
+            'comments': (Comment, Comment.objects.order_by('creation_date', 'id')),
+            'observers': (TaskObserver, TaskObserver.objects.order_by('id')),
+            'children': (Task, Task.objects.select_related('parent').prefetch_related('sprint').order_by('number')),
+        }
+        for name in include:
+            if name == 'parent':
+                queryset = queryset.select_related('parent__parent').prefetch_related('parent__sprint')
+                continue
+            model, related_queryset = related[name]
+            fk = 'parent' if model is Task else 'task'
+            count = (model.objects.filter(**{fk: OuterRef('pk')}).order_by()
+                     .values(fk).annotate(total=Count('pk')).values('total'))
+            queryset = queryset.annotate(**{f'{name}_count': Coalesce(Subquery(count), 0)}).prefetch_related(
+                Prefetch(name, queryset=related_queryset[:limit], to_attr=f'included_{name}')
+            )
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.get_include()
+        return context
+
     def get_serializer_class(self):
+        if self.request.method == 'GET' and self.get_include():
+            return TaskIncludeSerializer
         if self.request.method in ['GET', 'DELETE']:
             return TaskSerializer
         if self.request.method == 'PATCH':
@@ -122,52 +239,53 @@ class TaskByIdView(generics.RetrieveUpdateDestroyAPIView):
         response_details = TaskSerializer(instance=serializer.instance)
         return Response(response_details.data, status=status.HTTP_200_OK)
 
+    def perform_destroy(self, instance):
+        ProjectDeletion.delete_task(instance)
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(UserIdMixin, CachedResponseMixin, FastListMixin, generics.ListCreateAPIView):
     """
     View for List / Create comments related to specific task
-    GET - Get all comments for given task
+    GET - Get all comments for given task (comments of archived task with archived=true)
     POST - Create new comment for given task
     """
 
     filter_backends = [DjangoFilterBackend]
-    filterset_class = CommentFilter
-    methods_permissions_classes = {
+    fast_serializer = comment_fast_serializer
+    methods_permission_classes = {
         'POST': [IsDeveloperOrDeny]
     }
 
-    def get_queryset(self):
-        """
-        Optimized solution to filter out comments in projects that user should not see.
-        Creating additional column with annotate that will have True/False regarding if ProjectMember has line
-        with comment project and user's ID
-        """
-        user_id = self.get_user_id()
-        return Comment.objects.annotate(
-            is_member=Exists(
-                ProjectMember.objects.filter(
-                    project=OuterRef('project_id'),
-                    user=user_id
-                )
-            )
-        ).filter(is_member=True)
-
-    def get_user_id(self):
-        return self.request.headers.get('user_id') # TO DO: Change when user id correctly handled
-
     def get_permissions(self):
         permission_classes = [permissions.IsAuthenticated]
         permission_classes += self.methods_permission_classes.get(self.request.method, [])
         return [p() for p in permission_classes]
 
+    def get_cache_project_ids(self, visible_project_ids):
+        return project_from_task_id(self.kwargs['task_pk'], visible_project_ids)
+
     def get_queryset(self):
+        """
+        Comments of given task. Task in project that user should not see is handled as not existing
+        """
         task_pk = self.kwargs["task_pk"]
-        task = get_object_or_404(Task, pk=task_pk)
-        comments = Comment.objects.filter(task=task)
+        archived = archived_requested(self.request)
+        visible_tasks = ProjectVisibility.filter_queryset((ArchivedTask if archived else Task).objects.all(),
+                                                          self.get_user_id())
+        task = get_object_or_404(visible_tasks, key=task_pk)
+        comments = (ArchivedComment if archived else Comment).objects.filter(task=task).select_related('task')
         return comments
 
+    @property
+    def filterset_class(self):
+        return ArchivedCommentFilter if archived_requested(self.request) else CommentFilter
+
+    def get_fast_serializer(self):
+        return archived_comment_fast_serializer if archived_requested(self.request) else self.fast_serializer
+
     def get_serializer_class(self):
+        if archived_requested(self.request):
+            return ArchivedCommentSerializer
         if self.request.method == "GET":
             return CommentSerializer
         if self.request.method == "POST":
@@ -176,26 +294,29 @@ class CommentListCreateView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         task_pk = self.kwargs["task_pk"]
-        task = get_object_or_404(Task, pk=task_pk)
+        task = get_object_or_404(ProjectVisibility.not_deleted(Task.objects.all()), key=task_pk)
         serializer.save(
             task=task,
             user_id=uuid.uuid4() #  TO DO: replace with real user id later
         )
 
 
-class CommentByIdView(generics.RetrieveUpdateDestroyAPIView):
+class CommentByIdView(ArchiveFallbackMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     View for managing existing comment
-    GET - Get comment details
+    GET - Get comment details (also comment of archived task)
     PATCH - Edit comment
     DELETE - Remove comment
     """
 
-    queryset = Comment.objects.all()
+    queryset = ProjectVisibility.not_deleted(Comment.objects.all(), project_field='task__project')
+    archive_queryset = ProjectVisibility.not_deleted(ArchivedComment.objects.select_related('task__project'),
+                                                     project_field='task__project')
+    archive_serializer_class = ArchivedCommentSerializer
     lookup_field = 'id'
     lookup_url_kwarg = 'comment_pk'
     http_method_names = ['get', 'patch', 'delete']
-    methods_permissions_classes = {
+    methods_permission_classes = {
         'GET': [IsViewerOrDeny],
         'PATCH': [IsDeveloperOrDeny],
         'DELETE': [IsAdminOrDeny]
@@ -225,7 +346,7 @@ class CommentByIdView(generics.RetrieveUpdateDestroyAPIView):
         return Response(response_details.data, status=HTTP_200_OK)
 
 
-class TaskObserversView(APIView):
+class TaskObserversView(UserIdMixin, CachedResponseMixin, APIView):
     """
     View for managing observers inside task
     GET - List all observers in task
@@ -235,11 +356,11 @@ class TaskObserversView(APIView):
 
     permission_classes = [IsAuthenticated, IsViewerOrDeny]
 
-    def get_user_id(self, request):
-        return request.headers.get('user_id') # TO DO: Change when user id correctly handled
+    def get_cache_project_ids(self, visible_project_ids):
+        return project_from_task_id(self.kwargs['task_pk'], visible_project_ids)
 
     def get_task(self, request, task_pk):
-        obj = get_object_or_404(Task, id=task_pk)
+        obj = get_object_or_404(ProjectVisibility.not_deleted(Task.objects.all()), key=task_pk)
         self.check_object_permissions(request, obj)
         return obj
 
@@ -255,7 +376,7 @@ class TaskObserversView(APIView):
             data={},
             context={
                 "task": task,
-                "user_id": self.get_user_id(request) #  TO DO: replace with real user id later
+                "user_id": self.get_user_id()
             }
         )
         if serializer.is_valid():
@@ -265,10 +386,241 @@ class TaskObserversView(APIView):
 
     def delete(self, request, task_pk):
         task = self.get_task(request, task_pk)
-        user_id = self.get_user_id(request) #  TO DO: replace with real user id later
+        user_id = self.get_user_id()
         if not user_id:
             return Response({"error": "Missing user_id parameter"}, status=status.HTTP_400_BAD_REQUEST) # Remove after TO DO
         deleted, _ = TaskObserver.objects.filter(task=task, user_id=user_id).delete()
         if deleted:
             return Response(status=status.HTTP_204_NO_CONTENT)
         return Response({"error": "Observer not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class TaskBatchView(UserIdMixin, APIView):
+    """
+    Fetch many tasks by id in one request
+    POST - body {"ids": [...]} (task keys). Returns found tasks in requested order and ids that do not exist
+           or are in projects user cannot see (both reported as missing)
+    """
+
+    permission_classes = [IsAuthenticated]
+    batch_size = 1000
+
+    def post(self, request):
+        serializer = TaskBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        # Visibility checked per project (cached project ids), not per task
+        tasks = {}
+        for i in range(0, len(ids), self.batch_size):
+            queryset = ProjectVisibility.filter_queryset(
+                Task.objects.filter(key__in=ids[i:i + self.batch_size]), self.get_user_id()
+            ).select_related('parent').prefetch_related('sprint')
+            tasks.update((task.key, task) for task in queryset)
+
+        found = [tasks[task_id] for task_id in ids if task_id in tasks]
+        return Response({
+            "results": TaskSerializer(found, many=True).data,
+            "missing": [task_id for task_id in ids if task_id not in tasks]
+        }, status=status.HTTP_200_OK)
+
+
+class TaskBulkEditView(UserIdMixin, APIView):
+    """
+    Edit assignee, priority, estimate and due date of many tasks in one request (see services/task_bulk_edit.py)
+    PATCH - body {"ids": [...], "patch": {...}} (same values for all tasks) or {"items": [{"id": ..., ...}, ...]}
+            (values per task). Returns result of every task in requested order - updated, unchanged, not_found,
+            forbidden or invalid (with errors of its values)
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request):
+        serializer = TaskBulkEditSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids, patches, errors = (serializer.validated_data[name] for name in ('ids', 'patches', 'errors'))
+
+        results = TaskBulkEdit.apply(self.get_user_id(), patches) if patches else {}
+        return Response({
+            "results": [
+                {"id": task_id, "result": "invalid", "errors": errors[task_id]} if task_id in errors
+                else {"id": task_id, "result": results[task_id]}
+                for task_id in ids
+            ]
+        }, status=status.HTTP_200_OK)
+
+
+class TaskDueNotificationsView(UserIdMixin, generics.ListAPIView):
+    """
+    Due soon / overdue notifications of current user (see services/due_date_scheduler.py), newest first
+    GET - filter with kind, task
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = TaskDueNotificationSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = TaskDueNotificationFilter
+
+    def get_queryset(self):
+        user_id = self.get_user_id()
+        queryset = (TaskDueNotification.objects.filter(user_id=user_id).select_related('task')
+                    .order_by('-created_at', '-id'))
+        return ProjectVisibility.filter_queryset(queryset, user_id, project_field='task__project_id')
+
+
+class SavedFiltersView(UserIdMixin, generics.ListCreateAPIView):
+    """
+    Saved task filters of current user (see services/saved_filters.py)
+    GET - list of saved filters
+    POST - save TaskFilter parameters under name, matching tasks are materialized at once
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = SavedFilterSerializer
+
+    def get_queryset(self):
+        return SavedFilter.objects.filter(owner=self.get_user_id()).order_by('pk')
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'owner': self.get_user_id()}
+
+
+class SavedFilterByIdView(UserIdMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    Saved task filter of current user
+    GET - details
+    PUT / PATCH - rename or change parameters (result set is materialized again)
+    DELETE - delete
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = SavedFilterSerializer
+    lookup_url_kwarg = 'filter_pk'
+
+    def get_queryset(self):
+        return SavedFilter.objects.filter(owner=self.get_user_id())
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'owner': self.get_user_id()}
+
+
+class SavedFilterTasksView(UserIdMixin, FastListMixin, generics.ListAPIView):
+    """
+    GET - tasks matching saved filter of current user, read from its materialized result set
+          (tasks of projects the user can see)
+    """
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = TaskSerializer
+    fast_serializer = task_fast_serializer
+
+    def get_queryset(self):
+        user_id = self.get_user_id()
+        saved_filter = get_object_or_404(SavedFilter.objects.all(), pk=self.kwargs['filter_pk'], owner=user_id)
+        tasks = (Task.objects.filter(saved_filter_results__saved_filter=saved_filter)
+                 .select_related('parent').order_by('pk'))
+        return ProjectVisibility.filter_queryset(tasks, user_id)
+
+
+class TaskDependenciesView(APIView):
+    """
+    "Blocks / blocked by" links of task (see services/task_dependencies.py)
+    GET - ids of tasks this task blocks and is blocked by (for viewers)
+    POST - add link, body {"blocks": <task id>} or {"blocked_by": <task id>}, both tasks in the same project.
+           Link that would close a cycle is rejected (for devs and admins)
+    DELETE - remove link, the same body (for devs and admins)
+    """
+
+    methods_permission_classes = {
+        'GET': [IsViewerOrDeny],
+        'POST': [IsDeveloperOrDeny],
+        'DELETE': [IsDeveloperOrDeny]
+    }
+
+    def get_permissions(self):
+        permission_classes = [permissions.IsAuthenticated]
+        permission_classes += self.methods_permission_classes.get(self.request.method, [])
+        return [p() for p in permission_classes]
+
+    def get_task(self, request, task_pk):
+        obj = get_object_or_404(ProjectVisibility.not_deleted(Task.objects.all()), key=task_pk)
+        self.check_object_permissions(request, obj)
+        return obj
+
+    def get_link(self, request, task):
+        """
+        (blocker, blocked) from request body
+        """
+        serializer = TaskDependencySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        (field, other_id), = serializer.validated_data.items()
+        other = Task.objects.filter(key=other_id).first()
+        if other is None:
+            raise ValidationError({"errors": {field: [f'Task {other_id} does not exist']}})
+        return (task, other) if field == 'blocks' else (other, task)
+
+    def dependencies(self, task):
+        return {
+            "blocks": list(task.blocking.order_by('blocked__number').values_list('blocked__key', flat=True)),
+            "blocked_by": list(task.blocked_by.order_by('blocker__number').values_list('blocker__key', flat=True)),
+        }
+
+    def get(self, request, task_pk):
+        task = self.get_task(request, task_pk)
+        return Response(self.dependencies(task), status=status.HTTP_200_OK)
+
+    def post(self, request, task_pk):
+        task = self.get_task(request, task_pk)
+        blocker, blocked = self.get_link(request, task)
+        try:
+            _, created = TaskDependencies.add(blocker, blocked)
+        except IncorrectTaskDependency as e:
+            field = 'blocks' if blocker == task else 'blocked_by'
+            raise ValidationError({"errors": {field: [str(e)]}})
+        return Response(self.dependencies(task), status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    def delete(self, request, task_pk):
+        task = self.get_task(request, task_pk)
+        blocker, blocked = self.get_link(request, task)
+        if TaskDependencies.remove(blocker, blocked):
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response({"error": "Dependency not found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class CriticalPathMixin:
+    """
+    GET - earliest start / finish and slack of tasks by `estimate` and dependency links between them, and the
+          longest chain of blocking tasks (critical path). Cached until tasks, estimates or links change
+          (project generation)
+    """
+
+    def get_critical_path_tasks(self, obj):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        obj = self.get_object()
+        tasks = self.get_critical_path_tasks(obj).order_by('number').values_list('pk', 'key', 'estimate')
+        keys = {pk: key for pk, key, _ in tasks}
+        schedule = TaskDependencies.critical_path(obj.project_id, [(pk, estimate) for pk, _, estimate in tasks])
+        # Dependency graph is kept by internal ids - tasks are identified by keys in API
+        schedule['critical_path'] = [keys[pk] for pk in schedule['critical_path']]
+        for task in schedule['tasks']:
+            task['id'] = keys[task['id']]
+        return Response(schedule, status=status.HTTP_200_OK)
+
+
+class TaskCriticalPathView(CachedResponseMixin, CriticalPathMixin, generics.GenericAPIView):
+    """
+    Critical path over children of task (e.g. tasks of epic)
+    """
+
+    queryset = ProjectVisibility.not_deleted(Task.objects.all())
+    lookup_field = 'key'
+    lookup_url_kwarg = 'task_pk'
+    permission_classes = [IsAuthenticated, IsViewerOrDeny]
+
+    def get_cache_project_ids(self, visible_project_ids):
+        return project_from_task_id(self.kwargs['task_pk'], visible_project_ids)
+
+    def get_critical_path_tasks(self, obj):
+        return obj.children.all()
@@ -0,0 +1,53 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from rest_framework.test import APIClient
+
+from middleware.admission import admission_controller
+from projects_app.models import Project, ProjectMember
+from tasks_app.services.due_date_scheduler import due_date_scheduler
+from tasks_app.services.task_dependencies import TaskDependencies
+from tasks_app.services.task_query import TaskQuery
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Cached data (e.g. visible projects) must not leak between tests - each test has its own database state
+    """
+    for cache in caches.all(initialized_only=True):
+        cache.clear()
+    admission_controller.reset()
+    due_date_scheduler.reset()
+    TaskDependencies.reset()
+    TaskQuery.reset()
+    yield
+
+
+@pytest.fixture
+def project(db, request):
+    """
+    Project "TTT" with "member" as viewer. Defaults are overridden by project marker on module or test, e.g.
+    pytestmark = pytest.mark.project(id="DEL", member="admin", role=ProjectMember.Role.ADMIN)
+    or by indirect parametrization with dict of the same keys. member=None - project without members.
+    Tasks, sprints and other members are created by tests that need them.
+    """
+    marker = request.node.get_closest_marker("project")
+    options = {"id": "TTT", "member": "member", "role": ProjectMember.Role.VIEWER,
+               **(marker.kwargs if marker else {}), **getattr(request, "param", {})}
+    project = Project.objects.create(project_name="Project", id=options["id"])
+    if options["member"] is not None:
+        ProjectMember.objects.create(user_id=options["member"], project=project, role=options["role"])
+    return project
+
+
+@pytest.fixture
+def api_client():
+    """
+    api_client(user_id) - DRF client of user_id (user_id header and authenticated user)
+    """
+    def api_client(user_id="member"):
+        client = APIClient(headers={"user_id": user_id})
+        client.force_authenticate(User(username=user_id))
+        return client
+    return api_client
@@ -0,0 +1,57 @@
+import pytest
+from django.test import override_settings
+
+from permissions.visibility import ProjectVisibility
+from projects_app.models import Project, ProjectMember
+from tasks_app.models import Task
+
+
+@pytest.fixture
+def projects(db):
+    projects = [Project.objects.create(project_name=f"Project {i}", id=f"TT{i}") for i in range(3)]
+    for project in projects[:2]:
+        ProjectMember.objects.create(user_id="member", project=project, role=ProjectMember.Role.VIEWER)
+        Task.create_for_project(project=project, summary="Task", creator="member")
+    Task.create_for_project(project=projects[2], summary="Hidden", creator="other")
+    return projects
+
+
+@pytest.mark.django_db
+def test_visible_project_ids_cached(projects, django_assert_num_queries):
+    # Given
+    assert ProjectVisibility.project_ids("member") == ["TT0", "TT1"]
+
+    # When - Then
+    with django_assert_num_queries(0):
+        assert ProjectVisibility.project_ids("member") == ["TT0", "TT1"]
+
+
+@pytest.mark.django_db
+def test_membership_change_invalidates_cache(projects, django_capture_on_commit_callbacks):
+    # Given
+    assert ProjectVisibility.project_ids("member") == ["TT0", "TT1"]
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        projects[2].add_member("member", ProjectMember.Role.VIEWER)
+        projects[0].remove_member("member")
+
+    # Then
+    assert ProjectVisibility.project_ids("member") == ["TT1", "TT2"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('max_inline_ids', [1000, 1])
+def test_filter_queryset_with_ids_or_subquery(projects, max_inline_ids):
+    # When
+    with override_settings(VISIBILITY_MAX_INLINE_IDS=max_inline_ids):
+        tasks = ProjectVisibility.filter_queryset(Task.objects.all(), "member")
+
+        # Then
+        assert sorted(tasks.values_list('key', flat=True)) == ["TT0-1", "TT1-1"]
+        assert ("SELECT" in str(tasks.query).split("WHERE", 1)[1]) is (max_inline_ids == 1)
+
+
+@pytest.mark.django_db
+def test_no_user_sees_nothing(projects):
+    assert not ProjectVisibility.filter_queryset(Task.objects.all(), None).exists()
@@ -0,0 +1,96 @@
+import pytest
+from django.core.management import call_command
+
+from projects_app.models import Project, ProjectMember
+from projects_app.serializers import ProjectSerializer
+from sprints_app.models import Sprint
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.models import Task
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+pytestmark = pytest.mark.project(member=None)
+
+
+def counters(project):
+    project.refresh_from_db()
+    return ProjectSerializer(project, context={'include_counters': True}).data
+
+
+@pytest.mark.django_db
+def test_task_counters_follow_status(project):
+    # Given
+    task = Task.create_for_project(project=project, summary="Task", creator="user")
+    Task.create_for_project(project=project, summary="Task", creator="user")
+
+    # When
+    task = Task.objects.get(pk=task.pk)
+    task.change_status(Status.IN_PROGRESS)
+    task.save()
+
+    # Then
+    assert counters(project)['task_counts'] == {"To Do": 1, "In Progress": 1, "In Review": 0, "Closed": 0}
+
+    # When
+    task.delete()
+
+    # Then
+    assert counters(project)['task_counts'] == {"To Do": 1, "In Progress": 0, "In Review": 0, "Closed": 0}
+
+
+@pytest.mark.django_db
+def test_write_with_drifted_counter_at_zero(project):
+    # Given - counter drifted to 0 while task exists
+    task = Task.create_for_project(project=project, summary="Task", creator="user")
+    Project.objects.filter(pk=project.pk).update(to_do_task_count=0)
+
+    # When
+    task.change_status(Status.IN_PROGRESS)
+    task.save()
+    Task.create_for_project(project=project, summary="Task", creator="user").delete()
+
+    # Then - counters stay non negative, reconcile fixes the drift
+    assert counters(project)['task_counts'] == {"To Do": 0, "In Progress": 1, "In Review": 0, "Closed": 0}
+    Project.objects.filter(pk=project.pk).update(in_progress_task_count=0)
+    task.delete()
+    assert counters(project)['task_counts']["In Progress"] == 0
+
+
+@pytest.mark.django_db
+def test_sprint_and_member_counters(project):
+    # Given
+    sprint = Sprint.objects.create(name="Sprint", project=project)
+    Sprint.objects.create(name="Sprint 2", project=project)
+    project.add_member("user1", ProjectMember.Role.ADMIN)
+    project.add_member("user2", ProjectMember.Role.VIEWER)
+
+    # When
+    sprint.status = SprintStatus.CLOSED
+    sprint.save()
+    project.remove_member("user2")
+
+    # Then
+    data = counters(project)
+    assert data['open_sprint_count'] == 1
+    assert data['member_count'] == 1
+
+
+@pytest.mark.django_db
+def test_counters_not_serialized_by_default(project):
+    assert set(ProjectSerializer(project).data) == {'id', 'project_name'}
+
+
+@pytest.mark.django_db
+def test_reconcile_command_fixes_drift(project):
+    # Given
+    Task.create_for_project(project=project, summary="Task", creator="user")
+    project.add_member("user1", ProjectMember.Role.ADMIN)
+    Project.objects.filter(pk=project.pk).update(to_do_task_count=7, member_count=0)
+
+    # When
+    call_command('reconcile_project_counters', batch_size=1)
+
+    # Then
+    data = counters(project)
+    assert data['task_counts']["To Do"] == 1
+    assert data['member_count'] == 1
@@ -0,0 +1,171 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from projects_app.models import Project, ProjectMember, ProjectDeletionJob
+from projects_app.services.project_deletion import ProjectDeletion
+from sprints_app.models import Sprint
+from tasks_app.models import Task, Comment, TaskObserver, ArchivedTask
+from tasks_app.services.task_management.task_relationship import TaskType
+
+
+pytestmark = pytest.mark.project(id="DEL", member="admin", role=ProjectMember.Role.ADMIN)
+
+
+def create_content(project):
+    """
+    Sprint, epic with 5 tasks (DEL-2 .. DEL-6) with comments and observers and archived task
+    """
+    sprint = Sprint.objects.create(name="Sprint", project=project)
+    epic = Task.create_for_project(project=project, summary="Epic", creator="admin", type=TaskType.EPIC)
+    for i in range(5):
+        task = Task.create_for_project(project=project, summary=f"Task {i}", creator="admin", parent=epic)
+        task.sprint.add(sprint)
+        Comment.objects.create(task=task, author="admin", content="Comment")
+        task.add_observer("admin")
+    ArchivedTask.objects.create(id=100, key="DEL-100", number=100, project=project, summary="Archived", creator="admin",
+                                creation_date=epic.creation_date, last_edit_time=epic.creation_date,
+                                archived_at=epic.creation_date)
+
+
+@pytest.mark.django_db
+def test_deleted_project_is_invisible_at_once(project, django_capture_on_commit_callbacks, api_client):
+    # Given
+    client = api_client("admin")
+    create_content(project)
+    sprint, comment = Sprint.objects.get(), Comment.objects.first()
+    assert client.get("/tasks/").json()["count"] == 6
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.delete("/projects/DEL/")
+
+    # Then
+    assert response.status_code == 202
+    assert response.json()["status"] == ProjectDeletionJob.Status.PENDING
+    assert client.get("/projects/").json()["count"] == 0
+    assert client.get("/projects/DEL/").status_code == 404
+    assert client.get("/projects/DEL/members/").status_code == 404
+    assert client.get("/tasks/").json()["count"] == 0
+    for url in ["/tasks/DEL-2/", "/tasks/DEL-100/", "/tasks/DEL-2/comments/", "/tasks/DEL-2/observers/",
+                "/tasks/DEL-2/dependencies/", "/tasks/DEL-1/critical-path/", f"/tasks/comments/{comment.id}/",
+                f"/sprints/{sprint.id}/", f"/sprints/{sprint.id}/critical-path/"]:
+        assert client.get(url).status_code == 404, url
+    assert client.patch("/tasks/DEL-2/", {"summary": "Changed"}).status_code == 404
+    assert client.post("/tasks/DEL-2/comments/", {"content": "Late"}).status_code == 404
+    assert client.post("/projects/", {"id": "DEL", "project_name": "Again"}).status_code == 400
+    assert Task.objects.filter(project_id="DEL").count() == 6
+
+
+@pytest.mark.django_db
+def test_deletion_job_removes_all_rows_in_chunks(project):
+    # Given
+    create_content(project)
+    other_project = Project.objects.create(project_name="Other", id="OTH")
+    Task.create_for_project(project=other_project, summary="Kept", creator="admin",
+                            parent=Task.objects.get(key="DEL-2"))
+    job = ProjectDeletion.request(project, "admin")
+    reports = []
+
+    # When
+    ProjectDeletion.run(job, chunk_size=2, progress=lambda job: reports.append(job.deleted_rows))
+
+    # Then
+    job.refresh_from_db()
+    assert (job.status, job.get_progress()) == (ProjectDeletionJob.Status.DONE, 1.0)
+    assert job.deleted_rows == job.total_rows == 5 + 5 + 5 + 6 + 1 + 1 + 1 + 1
+    assert reports == sorted(reports) and len(reports) > 8
+    assert not Project.all_objects.filter(pk="DEL").exists()
+    assert not Comment.objects.exists() and not TaskObserver.objects.exists()
+    assert not ArchivedTask.objects.exists() and not Sprint.objects.exists()
+    assert Task.objects.get(project=other_project).parent is None
+
+
+@pytest.mark.django_db
+def test_interrupted_job_is_resumed(project):
+    # Given
+    create_content(project)
+    job = ProjectDeletion.request(project, "admin")
+
+    def interrupt(job):
+        raise RuntimeError("worker stopped")
+
+    with pytest.raises(RuntimeError):
+        ProjectDeletion.run(job, chunk_size=2, progress=interrupt)
+    assert ProjectDeletionJob.objects.get().status == ProjectDeletionJob.Status.FAILED
+
+    # When
+    call_command("process_project_deletions", stdout=None)
+
+    # Then
+    job = ProjectDeletionJob.objects.get()
+    assert job.status == ProjectDeletionJob.Status.DONE
+    assert job.deleted_rows == job.total_rows
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+def test_running_job_is_claimed_by_one_worker(project):
+    # Given - job taken by other worker
+    create_content(project)
+    job = ProjectDeletion.request(project, "admin")
+    assert ProjectDeletion.claim(ProjectDeletionJob.objects.get(pk=job.pk))
+
+    # When
+    result = ProjectDeletion.run(job, chunk_size=2)
+
+    # Then
+    assert result is None
+    assert not ProjectDeletion.pending_jobs().exists()
+    assert ProjectDeletionJob.objects.get().status == ProjectDeletionJob.Status.RUNNING
+    assert Task.objects.filter(project_id="DEL").count() == 6
+
+
+@pytest.mark.django_db
+def test_running_job_with_stale_heartbeat_is_taken_over(project, settings):
+    # Given - worker died while running the job
+    create_content(project)
+    job = ProjectDeletion.request(project, "admin")
+    ProjectDeletion.claim(job)
+    ProjectDeletionJob.objects.update(heartbeat_at=timezone.now() - settings.PROJECT_DELETION_HEARTBEAT_TIMEOUT
+                                      - timedelta(seconds=1))
+
+    # When
+    call_command("process_project_deletions", stdout=None)
+
+    # Then
+    job = ProjectDeletionJob.objects.get()
+    assert job.status == ProjectDeletionJob.Status.DONE
+    assert not Task.objects.exists()
+
+
+@pytest.mark.django_db
+def test_deletion_progress_visible_only_for_requester(project, api_client):
+    # Given
+    job_id = api_client("admin").delete("/projects/DEL/").json()["id"]
+
+    # When
+    own = api_client("admin").get(f"/projects/deletions/{job_id}/")
+    other = api_client("someone").get(f"/projects/deletions/{job_id}/")
+
+    # Then
+    assert own.status_code == 200
+    assert own.json()["project_id"] == "DEL"
+    assert other.status_code == 404
+
+
+@pytest.mark.django_db
+def test_task_delete_removes_comments_and_observers(project, api_client):
+    # Given
+    create_content(project)
+
+    # When
+    response = api_client("admin").delete("/tasks/DEL-2/")
+
+    # Then
+    assert response.status_code == 204
+    assert not Comment.objects.filter(task__key="DEL-2").exists()
+    assert not TaskObserver.objects.filter(task__key="DEL-2").exists()
+    assert Comment.objects.count() == 4
@@ -0,0 +1,64 @@
+import pytest
+
+from projects_app.models import ProjectMember
+from projects_app.serializers import ProjectMemberSerializer, ProjectMemberRemoveSerializer
+
+
+pytestmark = pytest.mark.project(member="existing")
+
+
+@pytest.mark.django_db
+def test_bulk_member_upsert(project):
+    # Given
+    ProjectMember.objects.create(user_id="unchanged", project=project, role=ProjectMember.Role.ADMIN)
+    data = [
+        {"user_id": "existing", "role": ProjectMember.Role.DEVELOPER},
+        {"user_id": "unchanged", "role": ProjectMember.Role.ADMIN},
+        {"user_id": "new", "role": ProjectMember.Role.VIEWER},
+    ]
+    serializer = ProjectMemberSerializer(data=data, many=True, context={"project": project})
+
+    # When
+    assert serializer.is_valid()
+    serializer.save()
+
+    # Then
+    assert dict(project.get_members().values_list('user_id', 'role')) == {
+        "existing": ProjectMember.Role.DEVELOPER,
+        "unchanged": ProjectMember.Role.ADMIN,
+        "new": ProjectMember.Role.VIEWER,
+    }
+    assert [m["user_id"] for m in serializer.data] == ["existing", "unchanged", "new"]
+
+
+@pytest.mark.django_db
+def test_bulk_member_upsert_query_count_does_not_grow(project, django_assert_max_num_queries):
+    # Given
+    data = [{"user_id": f"user-{i}", "role": ProjectMember.Role.DEVELOPER} for i in range(400)]
+    data += [{"user_id": "existing", "role": ProjectMember.Role.ADMIN}]
+    serializer = ProjectMemberSerializer(data=data, many=True, context={"project": project})
+    assert serializer.is_valid()
+
+    # When - select existing, insert (split by backend parameters limit), update, member counter, savepoints
+    with django_assert_max_num_queries(7):
+        serializer.save()
+
+    # Then
+    assert project.get_members().count() == 401
+    project.refresh_from_db()
+    assert project.member_count == 401
+
+
+@pytest.mark.django_db
+def test_bulk_member_remove(project):
+    # Given
+    ProjectMember.objects.create(user_id="unchanged", project=project, role=ProjectMember.Role.ADMIN)
+    serializer = ProjectMemberRemoveSerializer(data={"users": ["existing", "missing"]}, context={"project": project})
+
+    # When
+    assert serializer.is_valid()
+    deleted = serializer.save()
+
+    # Then
+    assert deleted == 1
+    assert list(project.get_members().values_list('user_id', flat=True)) == ["unchanged"]
@@ -0,0 +1,104 @@
+import pytest
+from django.test import override_settings
+
+from projects_app.services.workload import ProjectWorkload
+from sprints_app.models import Sprint
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.models import Task
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+pytestmark = pytest.mark.project(id="WRK", member="lead")
+
+
+def create_tasks(project):
+    """
+    Open and closed tasks of alice, bob and unassigned ones, some in started sprint, planned sprint is empty
+    """
+    started = Sprint.objects.create(name="Started", project=project, status=SprintStatus.STARTED)
+    Sprint.objects.create(name="Planned", project=project)
+    tasks = [
+        ("alice", Status.TO_DO, 3, Task.Priority.HIGH, True),
+        ("alice", Status.IN_PROGRESS, 5, Task.Priority.LOW, True),
+        ("alice", Status.CLOSED, 8, Task.Priority.HIGH, True),
+        ("bob", Status.TO_DO, None, Task.Priority.HIGH, False),
+        ("", Status.IN_REVIEW, 2, Task.Priority.MEDIUM, True),
+        (None, Status.TO_DO, 1, Task.Priority.MEDIUM, False),
+    ]
+    for assignee, status, estimate, priority, in_sprint in tasks:
+        task = Task.create_for_project(project=project, summary="Task", creator="lead", assignee=assignee,
+                                       status=status, estimate=estimate, priority=priority)
+        if in_sprint:
+            task.sprint.add(started)
+
+
+@pytest.mark.django_db
+def test_workload_per_assignee_and_started_sprint(project, django_assert_num_queries):
+    # Given
+    create_tasks(project)
+
+    # When
+    with django_assert_num_queries(3):
+        workload = ProjectWorkload.compute("WRK")
+
+    # Then
+    assert workload["assignees"] == [
+        {"assignee": "alice", "open_tasks": 2, "estimate": 8,
+         "statuses": {Status.TO_DO: {"tasks": 1, "estimate": 3}, Status.IN_PROGRESS: {"tasks": 1, "estimate": 5}}},
+        {"assignee": "bob", "open_tasks": 1, "estimate": 0, "statuses": {Status.TO_DO: {"tasks": 1, "estimate": 0}}},
+        {"assignee": None, "open_tasks": 2, "estimate": 3,
+         "statuses": {Status.IN_REVIEW: {"tasks": 1, "estimate": 2}, Status.TO_DO: {"tasks": 1, "estimate": 1}}},
+    ]
+    [sprint] = workload["sprints"]
+    assert sprint["name"] == "Started"
+    assert [(row["assignee"], row["open_tasks"], row["estimate"]) for row in sprint["assignees"]] == [
+        ("alice", 2, 8), (None, 1, 2)]
+
+
+@pytest.mark.django_db
+def test_workload_endpoint_filters(project, api_client):
+    # Given
+    client = api_client("lead")
+    create_tasks(project)
+    planned = Sprint.objects.get(name="Planned")
+
+    # When
+    high = client.get("/projects/WRK/workload/?priority=High")
+    high_or_low = client.get("/projects/WRK/workload/?priority=High&priority=Low")
+    in_planned = client.get(f"/projects/WRK/workload/?sprint={planned.pk}")
+    invalid = client.get("/projects/WRK/workload/?priority=Whenever")
+
+    # Then
+    assert [(row["assignee"], row["open_tasks"]) for row in high.data["assignees"]] == [("alice", 1), ("bob", 1)]
+    assert [(row["assignee"], row["open_tasks"]) for row in high_or_low.data["assignees"]] == [("alice", 2),
+                                                                                               ("bob", 1)]
+    assert in_planned.data["assignees"] == []
+    assert [sprint["name"] for sprint in in_planned.data["sprints"]] == ["Planned"]
+    assert invalid.status_code == 400
+
+
+@pytest.mark.django_db
+def test_workload_is_not_visible_for_non_member(project, api_client):
+    client = api_client("stranger")
+
+    assert client.get("/projects/WRK/workload/").status_code == 403
+
+
+@pytest.mark.django_db
+@override_settings(WORKLOAD_SNAPSHOT_MIN_OPEN_TASKS=5)
+def test_large_project_is_served_from_snapshot(project, api_client):
+    # Given
+    client = api_client("lead")
+    create_tasks(project)
+    first = client.get("/projects/WRK/workload/")
+    Task.create_for_project(project=project, summary="New", creator="lead", assignee="carol")
+
+    # When
+    snapshot = client.get("/projects/WRK/workload/")
+    live = client.get("/projects/WRK/workload/?snapshot=false")
+
+    # Then
+    assert first.data["snapshot_at"] is not None
+    assert snapshot.data == first.data
+    assert live.data["snapshot_at"] is None
+    assert "carol" in [row["assignee"] for row in live.data["assignees"]]
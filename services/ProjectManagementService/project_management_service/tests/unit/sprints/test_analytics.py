@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from projects_app.models import ProjectMember
+from sprints_app.models import Sprint, SprintSummary
+from sprints_app.services.sprint_analytics import SprintAnalytics
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.models import Task
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+pytestmark = pytest.mark.project(id="VEL", role=ProjectMember.Role.DEVELOPER)
+
+
+def started_sprint(client, project, name, tasks):
+    """
+    tasks - (estimate, closed after hours or None for open task). Tasks are closed through the API
+    (creation date moved back by the hours before)
+    """
+    sprint = Sprint.objects.create(name=name, project=project, status=SprintStatus.STARTED,
+                                   start_date=timezone.now())
+    for estimate, hours in tasks:
+        task = Task.create_for_project(project=project, summary="Task", creator="member", estimate=estimate)
+        task.sprint.add(sprint)
+        if hours is not None:
+            Task.objects.filter(pk=task.pk).update(creation_date=timezone.now() - timedelta(hours=hours))
+            response = client.patch(f"/tasks/{task.key}/", {"status": Status.CLOSED}, format="json")
+            assert response.status_code == 200, response.data
+    return sprint
+
+
+@pytest.mark.django_db
+def test_sprint_is_summarized_when_closed(project, api_client):
+    # Given
+    client = api_client()
+    sprint = started_sprint(client, project, "First", [(3, 10), (5, 20), (2, None)])
+
+    # When
+    response = client.patch(f"/sprints/{sprint.pk}/", {"status": SprintStatus.CLOSED}, format="json")
+
+    # Then
+    assert response.status_code == 200
+    summary = SprintSummary.objects.get(sprint=sprint)
+    assert (summary.planned_tasks, summary.planned_estimate) == (3, 10)
+    assert (summary.completed_tasks, summary.completed_estimate) == (2, 8)
+    assert summary.cycle_times == [10 * 3600, 20 * 3600]
+    assert summary.close_date == Sprint.objects.get(pk=sprint.pk).close_date
+
+
+@pytest.mark.django_db
+def test_summary_is_not_affected_by_later_task_changes(project, api_client):
+    # Given
+    client = api_client()
+    sprint = started_sprint(client, project, "First", [(3, 10), (2, None)])
+    client.patch(f"/sprints/{sprint.pk}/", {"status": SprintStatus.CLOSED}, format="json")
+
+    # When
+    Task.objects.filter(sprint=sprint).update(estimate=100)
+    sprint.tasks.clear()
+
+    # Then
+    assert SprintSummary.objects.get(sprint=sprint).completed_estimate == 3
+
+
+@pytest.mark.django_db
+def test_analytics_endpoint(project, api_client, django_assert_max_num_queries):
+    # Given
+    client = api_client()
+    for name, tasks in (("One", [(1, 1)]), ("Two", [(2, 2), (4, None)]), ("Three", [(3, 3), (3, 4)])):
+        sprint = started_sprint(client, project, name, tasks)
+        client.patch(f"/sprints/{sprint.pk}/", {"status": SprintStatus.CLOSED}, format="json")
+
+    # When
+    response = client.get("/sprints/analytics/?project=VEL&sprints=2")
+
+    # Then
+    assert response.status_code == 200
+    assert [(row["name"], row["planned_estimate"], row["completed_estimate"]) for row in response.data["velocity"]] \
+        == [("Two", 6, 2), ("Three", 6, 6)]
+    assert response.data["average_velocity"] == 4
+    assert response.data["cycle_time_seconds"] == {"tasks": 3, "p50": 3 * 3600, "p75": 4 * 3600,
+                                                   "p90": 4 * 3600, "p95": 4 * 3600}
+    with django_assert_max_num_queries(1):
+        SprintAnalytics.for_project("VEL", 10)
+
+
+@pytest.mark.django_db
+def test_analytics_requires_membership(project, api_client):
+    client = api_client("stranger")
+
+    assert client.get("/sprints/analytics/?project=VEL").status_code == 403
+    assert client.get("/sprints/analytics/").status_code == 400
+
+
+@pytest.mark.django_db
+def test_summarize_sprints_command_backfills_closed_sprints(project, api_client):
+    # Given - closed before summaries existed
+    client = api_client()
+    sprint = started_sprint(client, project, "Old", [(5, 1)])
+    Sprint.objects.filter(pk=sprint.pk).update(status=SprintStatus.CLOSED, close_date=timezone.now())
+
+    # When
+    call_command("summarize_sprints")
+
+    # Then
+    assert SprintSummary.objects.get(sprint=sprint).completed_estimate == 5
@@ -0,0 +1,81 @@
+import pytest
+
+from projects_app.models import ProjectMember
+from sprints_app.models import Sprint, SprintSummary
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.models import Task
+from tasks_app.services.task_management.task_relationship import TaskType
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+pytestmark = pytest.mark.project(id="ROL", role=ProjectMember.Role.DEVELOPER)
+
+
+def create_sprints(project):
+    """
+    Started sprint with unfinished subtree, closed task and task already in following sprint
+    """
+    current = Sprint.objects.create(name="Current", project=project, status=SprintStatus.STARTED)
+    following = Sprint.objects.create(name="Next", project=project)
+    epic = Task.create_for_project(project=project, summary="Epic", creator="member", type=TaskType.EPIC)  # ROL-1
+    story = Task.create_for_project(project=project, summary="Story", creator="member", parent=epic)      # ROL-2
+    Task.create_for_project(project=project, summary="Subtask", creator="member", parent=story,           # ROL-3
+                            type=TaskType.SUBTASK)
+    done = Task.create_for_project(project=project, summary="Done", creator="member", status=Status.CLOSED)  # ROL-4
+    already_next = Task.create_for_project(project=project, summary="Already", creator="member")            # ROL-5
+    for task in (epic, done, already_next):
+        task.sprint.add(current)
+    already_next.sprint.add(following)
+    return current, following
+
+
+def sprint_task_ids(sprint):
+    return sorted(sprint.tasks.values_list('key', flat=True))
+
+
+@pytest.mark.django_db
+def test_close_with_rollover_moves_unfinished_subtrees(project, api_client):
+    # Given
+    client = api_client()
+    current, following = create_sprints(project)
+
+    # When
+    response = client.patch(f"/sprints/{current.pk}/", {"status": SprintStatus.CLOSED, "rollover_to": following.pk},
+                            format="json")
+
+    # Then
+    assert response.status_code == 200
+    assert Sprint.objects.get(pk=current.pk).status == SprintStatus.CLOSED
+    assert sprint_task_ids(following) == ["ROL-1", "ROL-2", "ROL-3", "ROL-5"]
+    assert sprint_task_ids(current) == ["ROL-1", "ROL-4", "ROL-5"]  # closed sprint keeps its history
+    assert SprintSummary.objects.get(sprint=current).planned_tasks == 3
+
+
+@pytest.mark.django_db
+def test_rollover_requires_close(project, api_client):
+    client = api_client()
+    current, following = create_sprints(project)
+
+    response = client.patch(f"/sprints/{current.pk}/", {"name": "Renamed", "rollover_to": following.pk},
+                            format="json")
+
+    assert response.status_code == 400
+    assert "rollover_to" in response.data["errors"]
+
+
+@pytest.mark.django_db
+def test_failed_rollover_keeps_sprint_open(project, api_client):
+    # Given
+    client = api_client()
+    current, _ = create_sprints(project)
+    closed = Sprint.objects.create(name="Closed", project=current.project, status=SprintStatus.CLOSED)
+
+    # When
+    response = client.patch(f"/sprints/{current.pk}/", {"status": SprintStatus.CLOSED, "rollover_to": closed.pk},
+                            format="json")
+
+    # Then
+    assert response.status_code == 400
+    assert response.data["errors"]["rollover_to"] == ["Cannot roll over tasks to already closed sprint"]
+    assert Sprint.objects.get(pk=current.pk).status == SprintStatus.STARTED
+    assert not SprintSummary.objects.filter(sprint=current).exists()
@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from projects_app.models import ProjectMember
+from sprints_app.models import Sprint
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.models import Task, Comment, ArchivedTask, ArchivedComment, ArchivedTaskObserver
+from tasks_app.services.task_archive import TaskArchive
+from tasks_app.services.task_management.task_relationship import TaskType
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+def days_ago(days):
+    return timezone.now() - timedelta(days=days)
+
+
+pytestmark = pytest.mark.project(id="ARC")
+
+
+def create_tasks(project):
+    """
+    Cold tasks (ARC-1 in old closed sprint, ARC-4 closed long ago) and hot ones (ARC-2 rolled over to open sprint,
+    ARC-3 in recently closed sprint, open ARC-5)
+    """
+    old_sprint = Sprint.objects.create(name="Old", project=project, status=SprintStatus.CLOSED,
+                                       close_date=days_ago(200))
+    recent_sprint = Sprint.objects.create(name="Recent", project=project, status=SprintStatus.CLOSED,
+                                          close_date=days_ago(5))
+    open_sprint = Sprint.objects.create(name="Open", project=project, status=SprintStatus.STARTED)
+
+    in_old_sprint = Task.create_for_project(project=project, summary="In old sprint", creator="member")   # ARC-1
+    in_old_sprint.sprint.set([old_sprint])
+    Comment.objects.create(task=in_old_sprint, author="member", content="Old comment")
+    in_old_sprint.add_observer("member")
+    rolled_over = Task.create_for_project(project=project, summary="Rolled over", creator="member")       # ARC-2
+    rolled_over.sprint.set([old_sprint, open_sprint])
+    in_recent = Task.create_for_project(project=project, summary="Recent sprint", creator="member")      # ARC-3
+    in_recent.sprint.set([recent_sprint])
+    Task.create_for_project(project=project, summary="Closed long ago", creator="member",                # ARC-4
+                            status=Status.CLOSED, close_date=days_ago(365))
+    Task.create_for_project(project=project, summary="Open", creator="member")                           # ARC-5
+
+
+@pytest.mark.django_db
+def test_cold_tasks_are_moved_with_comments_observers_and_sprints(project, django_capture_on_commit_callbacks):
+    # Given
+    create_tasks(project)
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        archived = TaskArchive.run(batch_size=1)
+
+    # Then
+    assert archived == 2
+    assert sorted(Task.objects.values_list("key", flat=True)) == ["ARC-2", "ARC-3", "ARC-5"]
+    task = ArchivedTask.objects.get(key="ARC-1")
+    assert [sprint.name for sprint in task.sprint.all()] == ["Old"]
+    assert ArchivedComment.objects.get(task=task).content == "Old comment"
+    assert ArchivedTaskObserver.objects.get(task=task).user_id == "member"
+    assert not Comment.objects.exists()
+    project.refresh_from_db()
+    assert (project.to_do_task_count, project.closed_task_count) == (3, 0)
+
+
+@pytest.mark.django_db
+def test_parent_is_archived_after_its_children(project):
+    # Given
+    create_tasks(project)
+    epic = Task.create_for_project(project=project, summary="Epic", creator="member", type=TaskType.EPIC,
+                                   status=Status.CLOSED, close_date=days_ago(365))
+    Task.objects.filter(key="ARC-4").update(parent=epic)
+    Task.objects.filter(key="ARC-5").update(parent=epic)
+
+    # When
+    TaskArchive.run()
+
+    # Then - ARC-5 is hot, so its parent stays hot too
+    assert Task.objects.filter(pk=epic.pk).exists()
+    assert ArchivedTask.objects.get(key="ARC-4").parent_id == epic.pk
+    assert ArchivedTask.objects.get(key="ARC-4").parent_key == epic.key
+
+    # When
+    Task.objects.filter(key="ARC-5").update(parent=None)
+    TaskArchive.run()
+
+    # Then
+    assert ArchivedTask.objects.filter(pk=epic.pk).exists()
+
+
+@pytest.mark.django_db
+def test_archive_command_is_resumable(project):
+    # Given
+    create_tasks(project)
+
+    # When
+    call_command("archive_tasks", "--batch-size=1", "--max-batches=1", stdout=None)
+    first = ArchivedTask.objects.count()
+    call_command("archive_tasks", "--sprint-retention-days=1", stdout=None)
+
+    # Then
+    assert first == 1
+    assert sorted(ArchivedTask.objects.values_list("key", flat=True)) == ["ARC-1", "ARC-3", "ARC-4"]
+
+
+@pytest.mark.django_db
+@pytest.mark.project(role=ProjectMember.Role.DEVELOPER)
+def test_task_closed_through_api_is_archived_after_retention(project, api_client, settings, monkeypatch):
+    # Given
+    task = Task.create_for_project(project=project, summary="Done", creator="member")
+    response = api_client().patch(f"/tasks/{task.key}/", {"status": Status.CLOSED}, format="json")
+    assert response.status_code == 200
+
+    # When
+    kept = TaskArchive.run()
+    later = timezone.now() + timedelta(days=settings.ARCHIVE_TASK_RETENTION_DAYS, minutes=1)
+    monkeypatch.setattr(timezone, "now", lambda: later)
+    archived = TaskArchive.run()
+
+    # Then
+    assert (kept, archived) == (0, 1)
+    assert ArchivedTask.objects.get(key=task.key).status == Status.CLOSED
+
+
+@pytest.mark.django_db
+def test_list_excludes_archived_unless_requested(project, api_client):
+    # Given
+    create_tasks(project)
+    client = api_client()
+    TaskArchive.run()
+
+    # When
+    hot = client.get("/tasks/").json()
+    archived = client.get("/tasks/?archived=true&status=Closed").json()
+
+    # Then
+    assert [task["id"] for task in hot["results"]] == ["ARC-2", "ARC-3", "ARC-5"]
+    assert [task["id"] for task in archived["results"]] == ["ARC-4"]
+    assert archived["results"][0]["archived_at"] is not None
+
+
+@pytest.mark.django_db
+def test_archived_task_details_and_comments_by_id(project, api_client):
+    # Given
+    create_tasks(project)
+    client = api_client()
+    comment = Comment.objects.get()
+    TaskArchive.run()
+
+    # When
+    task = client.get("/tasks/ARC-1/")
+    comment_details = client.get(f"/tasks/comments/{comment.pk}/")
+    comments = client.get("/tasks/ARC-1/comments/?archived=true")
+
+    # Then
+    assert task.status_code == 200
+    assert (task.json()["summary"], task.json()["sprint"]) == ("In old sprint", [Sprint.objects.get(name="Old").pk])
+    assert comment_details.json()["content"] == "Old comment"
+    assert [c["content"] for c in comments.json()["results"]] == ["Old comment"]
+    assert client.get("/tasks/ARC-1/comments/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_archived_task_details_require_membership(project, api_client):
+    # Given
+    create_tasks(project)
+    TaskArchive.run()
+    client = api_client("stranger")
+
+    # Then
+    assert client.get("/tasks/ARC-1/").status_code == 403
@@ -0,0 +1,104 @@
+import pytest
+
+from django.contrib.auth.models import User
+from django.test import Client
+
+from projects_app.models import Project
+from sprints_app.models import Sprint
+from tasks_app.models import Task, Comment
+
+
+def create_tasks(project):
+    """
+    TTT-1 .. TTT-3 in sprint, comment of TTT-1 and task OOO-1 of project member cannot see
+    """
+    sprint = Sprint.objects.create(name="Sprint", project=project)
+    for i in range(3):
+        task = Task.create_for_project(project=project, summary=f"Task {i}", creator="member")
+        task.sprint.add(sprint)
+    Comment.objects.create(task=Task.objects.get(key="TTT-1"), author="member", content="Comment")
+    other = Project.objects.create(project_name="Other", id="OOO")
+    Task.create_for_project(project=other, summary="Hidden", creator="someone")
+
+
+@pytest.fixture
+def client(db):
+    user = User.objects.create_user(username="user", password="password")
+    client = Client(headers={"user_id": "member"})
+    client.force_login(user)
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('path', ['tasks/', 'tasks/?status=To Do&limit=2&offset=1', 'tasks/TTT-1/',
+                                  'sprints/', 'sprints/1/'])
+def test_async_read_matches_sync_view(project, client, path):
+    # Given
+    create_tasks(project)
+
+    # When
+    async_response = client.get(f"/async/{path}")
+    sync_response = client.get(f"/{path}")
+
+    # Then
+    assert async_response.status_code == 200
+    assert async_response.content.replace(b"/async", b"") == sync_response.content
+
+
+@pytest.mark.django_db
+def test_async_task_list_hides_other_projects(project, client):
+    # Given
+    create_tasks(project)
+
+    # When
+    response = client.get("/async/tasks/")
+
+    # Then
+    assert response.json()["count"] == 3
+
+
+@pytest.mark.django_db
+def test_async_task_detail_not_member(project, client):
+    # Given
+    create_tasks(project)
+
+    # When
+    response = client.get("/async/tasks/OOO-1/")
+
+    # Then
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_async_task_detail_not_found(project, client):
+    # Given
+    create_tasks(project)
+
+    # When
+    response = client.get("/async/tasks/TTT-99/")
+
+    # Then
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_async_comments_and_members(project, client):
+    # Given
+    create_tasks(project)
+
+    # When
+    comments = client.get("/async/tasks/TTT-1/comments/")
+    members = client.get("/async/projects/TTT/members/?role=Viewer")
+
+    # Then
+    assert comments.json()["count"] == 1
+    assert members.json() == [{"user_id": "member", "role": "Viewer", "project": "TTT"}]
+
+
+@pytest.mark.django_db
+def test_async_read_requires_authentication(project):
+    # When
+    response = Client(headers={"user_id": "member"}).get("/async/tasks/")
+
+    # Then
+    assert response.status_code == 403
@@ -0,0 +1,150 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from projects_app.models import Project, ProjectMember
+from tasks_app.models import Task, SavedFilter
+from tasks_app.services.saved_filters import SavedFilters
+from tasks_app.services.task_bulk_edit import TaskBulkEdit
+
+
+pytestmark = pytest.mark.project(id="BLK", role=ProjectMember.Role.DEVELOPER)
+
+
+def create_tasks(project):
+    for i in range(3):
+        Task.create_for_project(project=project, summary=f"Task {i}", creator="member",       # BLK-1 .. BLK-3
+                                priority=Task.Priority.LOW)
+
+
+def results(response):
+    assert response.status_code == 200, response.json()
+    return {item["id"]: item["result"] for item in response.json()["results"]}
+
+
+@pytest.mark.django_db
+def test_same_patch_for_many_tasks(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    viewed = Project.objects.create(project_name="Viewed", id="VWD")
+    ProjectMember.objects.create(user_id="member", project=viewed, role=ProjectMember.Role.VIEWER)
+    Task.create_for_project(project=viewed, summary="Viewed", creator="member")               # VWD-1
+    hidden = Project.objects.create(project_name="Hidden", id="HID")
+    Task.create_for_project(project=hidden, summary="Hidden", creator="member")               # HID-1
+    before = Task.objects.get(key="BLK-1")
+
+    # When
+    response = client.patch("/tasks/bulk/", {
+        "ids": ["BLK-1", "BLK-2", "VWD-1", "HID-1", "BLK-99"],
+        "patch": {"assignee": "dev", "priority": "Urgent"},
+    }, format="json")
+
+    # Then
+    assert results(response) == {"BLK-1": "updated", "BLK-2": "updated", "VWD-1": "forbidden",
+                                 "HID-1": "not_found", "BLK-99": "not_found"}
+    task = Task.objects.get(key="BLK-1")
+    assert (task.assignee, task.priority, task.summary) == ("dev", Task.Priority.URGENT, "Task 0")
+    assert task.last_edit_time > before.last_edit_time
+    assert Task.objects.get(key="BLK-3").assignee is None
+    assert Task.objects.get(key="VWD-1").assignee is None
+
+
+@pytest.mark.django_db
+def test_patch_per_task(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    due_date = timezone.now() + timedelta(days=3)
+
+    # When
+    response = client.patch("/tasks/bulk/", {"items": [
+        {"id": "BLK-1", "estimate": 5},
+        {"id": "BLK-2", "due_date": due_date.isoformat(), "priority": "Low"},
+        {"id": "BLK-3", "priority": "Low"},
+        {"id": "BLK-4", "estimate": "many"},
+    ]}, format="json")
+
+    # Then
+    assert results(response) == {"BLK-1": "updated", "BLK-2": "updated", "BLK-3": "unchanged", "BLK-4": "invalid"}
+    assert "estimate" in response.json()["results"][3]["errors"]
+    assert Task.objects.get(key="BLK-1").estimate == 5
+    assert Task.objects.get(key="BLK-2").due_date == due_date
+
+
+@pytest.mark.django_db
+def test_writes_only_changed_columns_once_per_group(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    with CaptureQueriesContext(connection) as queries:
+        client.patch("/tasks/bulk/", {"ids": ["BLK-1", "BLK-2", "BLK-3"], "patch": {"estimate": 8}}, format="json")
+
+    # Then
+    updates = [query["sql"] for query in queries.captured_queries if query["sql"].startswith("UPDATE")]
+    assert len(updates) == 1
+    assert '"estimate"' in updates[0] and '"last_edit_time"' in updates[0]
+    assert '"summary"' not in updates[0] and '"priority"' not in updates[0]
+
+
+@pytest.mark.django_db
+def test_rows_are_locked_in_primary_key_order(project):
+    # Given - keys requested in reverse order
+    create_tasks(project)
+    pks = list(Task.objects.order_by("pk").values_list("pk", flat=True))
+    patches = {key: {"estimate": 1} for key in ("BLK-3", "BLK-2", "BLK-1")}
+
+    # When
+    with CaptureQueriesContext(connection) as queries:
+        results = TaskBulkEdit.apply("member", patches, batch_size=2)
+
+    # Then - rows read by primary key in ascending batches
+    locked = [[int(pk) for pk in match.split(", ")] for query in queries.captured_queries
+              if query["sql"].startswith("SELECT") for match in re.findall(r'"id" IN \(([\d, ]+)\)', query["sql"])]
+    assert locked == [pks[:2], pks[2:]]
+    assert set(results.values()) == {TaskBulkEdit.UPDATED}
+
+
+@pytest.mark.django_db
+def test_saved_filter_results_follow_bulk_edit(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    conditions, project_id = SavedFilters.compile({"priority": "Urgent"})
+    saved_filter = SavedFilter.objects.create(owner="member", name="Urgent", params={"priority": "Urgent"},
+                                              conditions=conditions, project_id=project_id)
+    SavedFilters.refresh(saved_filter)
+
+    # When
+    client.patch("/tasks/bulk/", {"ids": ["BLK-1", "BLK-3"], "patch": {"priority": "Urgent"}}, format="json")
+
+    # Then
+    assert set(saved_filter.results.values_list("task__key", flat=True)) == {"BLK-1", "BLK-3"}
+
+
+@pytest.mark.parametrize("body", [
+    {"ids": ["BLK-1"], "patch": {"summary": "Renamed"}},
+    {"ids": ["BLK-1"], "patch": {}},
+    {"ids": ["BLK-1"]},
+    {"ids": ["BLK-1"], "patch": {"estimate": 1}, "items": [{"id": "BLK-2", "estimate": 1}]},
+    {"items": [{"id": "BLK-1", "estimate": 1}, {"id": "BLK-1", "estimate": 2}]},
+    {"items": [{"estimate": 1}]},
+])
+@pytest.mark.django_db
+def test_invalid_requests(project, api_client, body):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    response = client.patch("/tasks/bulk/", body, format="json")
+
+    # Then
+    assert response.status_code == 400
+    assert Task.objects.get(key="BLK-1").summary == "Task 0"
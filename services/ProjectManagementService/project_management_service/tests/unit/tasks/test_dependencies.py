@@ -0,0 +1,163 @@
+import pytest
+
+from projects_app.models import Project, ProjectMember
+from sprints_app.models import Sprint
+from tasks_app.models import Task, TaskDependency
+from tasks_app.services.task_dependencies import TaskDependencies, TaskDependencyCycle, IncorrectTaskDependency
+from tasks_app.services.task_management.task_relationship import TaskType
+
+
+pytestmark = pytest.mark.project(id="DEP", role=ProjectMember.Role.DEVELOPER)
+
+
+def create_tasks(project):
+    epic = Task.create_for_project(project=project, summary="Epic", creator="member", type=TaskType.EPIC)  # DEP-1
+    sprint = Sprint.objects.create(name="Sprint", project=project)
+    for summary, estimate in (("Design", 3), ("Backend", 5), ("Frontend", 2), ("Release", 1)):  # DEP-2..5
+        task = Task.create_for_project(project=project, summary=summary, creator="member", estimate=estimate,
+                                       parent=epic)
+        task.sprint.add(sprint)
+
+
+def link(blocker, blocked):
+    return TaskDependencies.add(Task.objects.get(key=blocker), Task.objects.get(key=blocked))
+
+
+def test_find_path():
+    graph = {"A": frozenset({"B"}), "B": frozenset({"C", "D"}), "D": frozenset({"E"})}
+
+    assert TaskDependencies.find_path(graph, "A", "E") == ["A", "B", "D", "E"]
+    assert TaskDependencies.find_path(graph, "E", "A") is None
+
+
+@pytest.mark.django_db
+def test_link_closing_cycle_is_rejected(project):
+    # Given
+    create_tasks(project)
+    link("DEP-2", "DEP-3")
+    link("DEP-3", "DEP-5")
+
+    # When
+    with pytest.raises(TaskDependencyCycle) as error:
+        link("DEP-5", "DEP-2")
+
+    # Then
+    assert "DEP-5 -> DEP-2 -> DEP-3 -> DEP-5" in str(error.value)
+    assert TaskDependency.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_graph_is_cached_until_links_change(project, django_assert_num_queries):
+    # Given
+    create_tasks(project)
+    link("DEP-2", "DEP-3")
+    TaskDependencies.graph("DEP")
+    ids = dict(Task.objects.values_list('key', 'pk'))
+
+    # When / Then - only version lookup
+    with django_assert_num_queries(1):
+        assert TaskDependencies.graph("DEP") == {ids["DEP-2"]: frozenset({ids["DEP-3"]})}
+
+    TaskDependencies.remove(Task.objects.get(key="DEP-2"), Task.objects.get(key="DEP-3"))
+    assert TaskDependencies.graph("DEP") == {}
+
+
+@pytest.mark.django_db
+def test_link_between_projects_is_rejected(project):
+    # Given
+    create_tasks(project)
+    other = Project.objects.create(project_name="Other", id="OTH")
+    Task.create_for_project(project=other, summary="Other", creator="member")
+
+    # Then
+    with pytest.raises(IncorrectTaskDependency):
+        link("DEP-2", "OTH-1")
+
+
+@pytest.mark.django_db
+def test_critical_path():
+    # Given - DEP-2 (3) blocks DEP-3 (5) and DEP-4 (2), both block DEP-5 (1)
+    tasks = [("DEP-2", 3), ("DEP-3", 5), ("DEP-4", 2), ("DEP-5", 1), ("DEP-6", None)]
+    TaskDependencies._graphs["DEP"] = (None, {"DEP-2": frozenset({"DEP-3", "DEP-4"}), "DEP-3": frozenset({"DEP-5"}),
+                                              "DEP-4": frozenset({"DEP-5"})})
+
+    # When
+    result = TaskDependencies.critical_path("DEP", tasks)
+
+    # Then
+    assert result["earliest_finish"] == 9
+    assert result["critical_path"] == ["DEP-2", "DEP-3", "DEP-5"]
+    schedule = {task["id"]: (task["earliest_start"], task["earliest_finish"], task["slack"]) for task in result["tasks"]}
+    assert schedule == {"DEP-2": (0, 3, 0), "DEP-3": (3, 8, 0), "DEP-4": (3, 5, 3), "DEP-5": (8, 9, 0),
+                        "DEP-6": (0, 0, 9)}
+
+
+@pytest.mark.django_db
+def test_dependency_endpoints(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    created = client.post("/tasks/DEP-3/dependencies/", {"blocked_by": "DEP-2"}, format="json")
+    again = client.post("/tasks/DEP-3/dependencies/", {"blocked_by": "DEP-2"}, format="json")
+    cycle = client.post("/tasks/DEP-3/dependencies/", {"blocks": "DEP-2"}, format="json")
+    both = client.post("/tasks/DEP-3/dependencies/", {"blocks": "DEP-4", "blocked_by": "DEP-5"}, format="json")
+    listed = client.get("/tasks/DEP-2/dependencies/")
+    removed = client.delete("/tasks/DEP-3/dependencies/", {"blocked_by": "DEP-2"}, format="json")
+    missing = client.delete("/tasks/DEP-3/dependencies/", {"blocked_by": "DEP-2"}, format="json")
+
+    # Then
+    assert created.status_code == 201
+    assert created.data == {"blocks": [], "blocked_by": ["DEP-2"]}
+    assert again.status_code == 200
+    assert cycle.status_code == 400
+    assert "cycle" in cycle.data["errors"]["blocks"][0]
+    assert both.status_code == 400
+    assert listed.data == {"blocks": ["DEP-3"], "blocked_by": []}
+    assert removed.status_code == 204
+    assert missing.status_code == 404
+
+
+@pytest.mark.django_db
+def test_viewer_cannot_add_dependency(project, api_client):
+    # Given
+    create_tasks(project)
+    ProjectMember.objects.create(user_id="viewer", project=project, role=ProjectMember.Role.VIEWER)
+
+    # When
+    response = api_client("viewer").post("/tasks/DEP-3/dependencies/", {"blocked_by": "DEP-2"}, format="json")
+
+    # Then
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_critical_path_endpoints_are_cached_until_estimate_changes(project, api_client,
+                                                                   django_capture_on_commit_callbacks):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    with django_capture_on_commit_callbacks(execute=True):
+        link("DEP-2", "DEP-3")
+        link("DEP-3", "DEP-5")
+    sprint = Sprint.objects.get(project=project)
+
+    # When
+    epic = client.get("/tasks/DEP-1/critical-path/")
+    cached = client.get(f"/sprints/{sprint.pk}/critical-path/")
+    cached_again = client.get(f"/sprints/{sprint.pk}/critical-path/")
+    with django_capture_on_commit_callbacks(execute=True):
+        task = Task.objects.get(key="DEP-4")
+        task.estimate = 20
+        task.save()
+    changed = client.get(f"/sprints/{sprint.pk}/critical-path/")
+
+    # Then
+    assert epic.data["critical_path"] == ["DEP-2", "DEP-3", "DEP-5"]
+    assert epic.data["earliest_finish"] == 9
+    assert cached.data == epic.data
+    assert cached_again["X-Cache"] == "HIT"
+    assert changed["X-Cache"] == "MISS"
+    assert changed.data["critical_path"] == ["DEP-4"]
+    assert changed.data["earliest_finish"] == 20
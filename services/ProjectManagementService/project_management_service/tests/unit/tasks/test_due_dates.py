@@ -0,0 +1,170 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from projects_app.models import ProjectMember
+from tasks_app.models import Task, TaskDueNotification
+from tasks_app.services.due_date_scheduler import DueDateScheduler, due_date_scheduler, task_due
+from tasks_app.services.task_management.task_status_workflow import Status
+
+Kind = TaskDueNotification.Kind
+
+
+def in_hours(hours):
+    return timezone.now() + timedelta(hours=hours)
+
+
+pytestmark = pytest.mark.project(id="DUE", role=ProjectMember.Role.DEVELOPER)
+
+
+def create_tasks(project):
+    """
+    Open tasks of member overdue (observed by observer), due soon, due later and without due date, closed overdue
+    """
+    ProjectMember.objects.create(user_id="observer", project=project, role=ProjectMember.Role.DEVELOPER)
+    overdue = Task.create_for_project(project=project, summary="Overdue", creator="member",        # DUE-1
+                                      assignee="member", due_date=in_hours(-2))
+    overdue.add_observer("observer")
+    Task.create_for_project(project=project, summary="Due soon", creator="member",                 # DUE-2
+                            assignee="member", due_date=in_hours(3))
+    Task.create_for_project(project=project, summary="Due later", creator="member",                # DUE-3
+                            assignee="member", due_date=in_hours(24 * 10))
+    Task.create_for_project(project=project, summary="Closed overdue", creator="member",           # DUE-4
+                            assignee="member", due_date=in_hours(-5), status=Status.CLOSED)
+    Task.create_for_project(project=project, summary="No due date", creator="member")              # DUE-5
+
+
+def notifications():
+    return set(TaskDueNotification.objects.values_list('task__key', 'user_id', 'kind'))
+
+
+@pytest.mark.django_db
+def test_scheduler_fires_due_soon_and_overdue_events_once(project):
+    # Given
+    create_tasks(project)
+    scheduler = DueDateScheduler()
+    sent = []
+
+    def receiver(task, kind, user_ids, **kwargs):
+        sent.append((task.key, kind, user_ids))
+
+    task_due.connect(receiver)
+    try:
+        # When
+        first = scheduler.run_pending()
+        scheduler.rebuild()
+        second = scheduler.run_pending()
+    finally:
+        task_due.disconnect(receiver)
+
+    # Then
+    assert first == 3
+    assert second == 0
+    assert notifications() == {("DUE-1", "member", Kind.OVERDUE), ("DUE-1", "observer", Kind.OVERDUE),
+                               ("DUE-2", "member", Kind.DUE_SOON)}
+    assert sorted(sent) == [("DUE-1", Kind.OVERDUE, ["member", "observer"]), ("DUE-2", Kind.DUE_SOON, ["member"])]
+
+
+@pytest.mark.django_db
+def test_scheduler_only_keeps_events_within_horizon(project):
+    # Given
+    create_tasks(project)
+    scheduler = DueDateScheduler()
+
+    # When
+    scheduler.rebuild()
+
+    # Then - due later task is loaded with later rebuild
+    assert {entry[1] for entry in scheduler._heap} == set(Task.objects.filter(key__in=["DUE-1", "DUE-2"])
+                                                          .values_list('pk', flat=True))
+    assert scheduler.next_wakeup() <= timezone.now()
+
+
+@pytest.mark.django_db
+def test_scheduler_follows_task_saves(project, django_capture_on_commit_callbacks):
+    # Given
+    create_tasks(project)
+    due_date_scheduler.rebuild()
+    due_soon = Task.objects.get(key="DUE-2")
+    later = Task.objects.get(key="DUE-3")
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        due_soon.status = Status.CLOSED
+        due_soon.save()
+        later.due_date = in_hours(-1)
+        later.save()
+    due_date_scheduler.run_pending()
+
+    # Then
+    assert not TaskDueNotification.objects.filter(task__key="DUE-2").exists()
+    assert ("DUE-3", "member", Kind.OVERDUE) in notifications()
+
+
+@pytest.mark.django_db
+def test_scheduler_skips_tasks_changed_by_other_process(project):
+    # Given
+    create_tasks(project)
+    scheduler = DueDateScheduler()
+    scheduler.rebuild()
+
+    # When - update without signals
+    Task.objects.filter(key="DUE-1").update(due_date=in_hours(24 * 10))
+    scheduler.run_pending()
+
+    # Then
+    assert not TaskDueNotification.objects.filter(task__key="DUE-1").exists()
+
+
+@pytest.mark.django_db
+def test_moved_due_date_fires_again(project):
+    # Given
+    create_tasks(project)
+    scheduler = DueDateScheduler()
+    scheduler.run_pending()
+
+    # When
+    Task.objects.filter(key="DUE-1").update(due_date=in_hours(-1))
+    scheduler.rebuild()
+    scheduler.run_pending()
+
+    # Then
+    assert TaskDueNotification.objects.filter(task__key="DUE-1", user_id="member", kind=Kind.OVERDUE).count() == 2
+
+
+@pytest.mark.django_db
+def test_overdue_and_due_within_filters(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    overdue = client.get("/tasks/?project=DUE&overdue=true")
+    not_overdue = client.get("/tasks/?project=DUE&overdue=false")
+    due_within = client.get("/tasks/?project=DUE&due_within=P1D")
+    invalid = client.get("/tasks/?project=DUE&due_within=soon")
+
+    # Then
+    assert [task["id"] for task in overdue.data["results"]] == ["DUE-1"]
+    assert sorted(task["id"] for task in not_overdue.data["results"]) == ["DUE-2", "DUE-3", "DUE-4", "DUE-5"]
+    assert [task["id"] for task in due_within.data["results"]] == ["DUE-2"]
+    assert invalid.status_code == 400
+
+
+@pytest.mark.django_db
+def test_due_notifications_of_current_user(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    DueDateScheduler().run_pending()
+
+    # When
+    response = client.get("/tasks/due-notifications/")
+    overdue = client.get("/tasks/due-notifications/?kind=Overdue")
+
+    # Then
+    assert response.status_code == 200
+    assert sorted((n["task"], n["kind"]) for n in response.data["results"]) == [("DUE-1", Kind.OVERDUE),
+                                                                                 ("DUE-2", Kind.DUE_SOON)]
+    assert [n["task"] for n in overdue.data["results"]] == ["DUE-1"]
@@ -2,9 +2,13 @@ import uuid
 
 import pytest
 import django.core.exceptions
+import django.db
 import django.db.models
 
 from projects_app.models import Project, ProjectMember
+from tasks_app.models import Task
+from tasks_app.services.task_management.task_relationship import TASK_TYPE_CODES, TaskRelationship, TaskType
+from tasks_app.services.task_management.task_status_workflow import STATUS_CODES, Status, TaskStatusWorkFlow
 
 
 @pytest.mark.django_db
@@ -104,7 +108,6 @@ def test_add_member_to_project_successfully(role):
 
 @pytest.mark.django_db
 def test_add_member_already_exists():
-    # TO DO: LOGIC TO FIX - No safety mechanisms to prevent duplicated records (project methods not used in serializers)
     # Given
     name = "Project"
     id = "TTT"
@@ -115,12 +118,9 @@ def test_add_member_already_exists():
     member1 = ProjectMember.objects.create(user_id=user_id, project=project, role=role)
     member1.full_clean()
 
-    # When
-    member2 = ProjectMember.objects.create(user_id=user_id, project=project, role=role)
-    member2.full_clean()
-
-    print(member1.id)
-    print(member2.id)
+    # When - Then
+    with pytest.raises(django.db.IntegrityError):
+        ProjectMember.objects.create(user_id=user_id, project=project, role=role)
 
 
 @pytest.mark.django_db
@@ -270,3 +270,68 @@ def test_project_member_get_project_implementation():
     assert fetched_project is created_project
 
 
+
+
+@pytest.mark.django_db
+def test_task_choice_fields_stored_as_codes():
+    # Given
+    project = Project.objects.create(project_name="Codes", id="COD")
+    task = Task.create_for_project(project=project, summary="Task", creator="member", type=TaskType.BUG,
+                                   priority=Task.Priority.HIGH)
+    task.change_status(Status.IN_PROGRESS)
+    task.save()
+
+    # When
+    with django.db.connection.cursor() as cursor:
+        cursor.execute("SELECT type, priority, status FROM tasks_app_task WHERE id = %s", [task.pk])
+        stored = cursor.fetchone()
+    loaded = Task.objects.get(pk=task.pk)
+
+    # Then
+    assert stored == (TASK_TYPE_CODES.code(TaskType.BUG), Task.PRIORITY_CODES.code(Task.Priority.HIGH),
+                      STATUS_CODES.code(Status.IN_PROGRESS)) == (5, 2, 2)
+    assert (loaded.type, loaded.priority, loaded.status) == ("Bug", "High", "In Progress")
+    assert list(Task.objects.filter(status="In Progress").values_list("key", "status")) == [("COD-1", "In Progress")]
+    assert not Task.objects.filter(status__in=[Status.TO_DO, Status.CLOSED]).exists()
+    with pytest.raises(ValueError):
+        Task.objects.filter(status="Done").exists()
+
+
+def test_status_workflow_and_relationship_work_on_codes():
+    # When - Then
+    assert TaskStatusWorkFlow.can_transition(STATUS_CODES.code(Status.TO_DO), STATUS_CODES.code(Status.CLOSED))
+    assert not TaskStatusWorkFlow.can_transition(Status.TO_DO, Status.IN_REVIEW)
+    assert TaskRelationship.can_be_related(TASK_TYPE_CODES.code(TaskType.EPIC), TaskType.BUG)
+    assert TaskRelationship.can_be_related(TaskType.TASK, TaskType.SUBTASK)
+    # Single child types were strings, not tuples, and matched by substring ("Task" in "Subtask")
+    assert not TaskRelationship.can_be_related(TaskType.SUBTASK, TaskType.TASK)
+    assert not TaskRelationship.can_be_related(TaskType.TASK, TaskType.TASK)
+    assert not TaskRelationship.can_be_related(TaskType.INITIATIVE, TaskType.TASK)
+
+
+@pytest.mark.django_db
+def test_project_get_members_with_unknown_role():
+    # Given
+    project = Project.objects.create(project_name="Roles", id="ROL")
+    project.add_member("viewer", ProjectMember.Role.VIEWER)
+
+    # When - Then
+    assert list(project.get_members("Owner")) == []
+    assert [member.user_id for member in project.get_members("Viewer")] == ["viewer"]
+
+
+@pytest.mark.django_db
+def test_close_date_follows_status(project):
+    # Given
+    task = Task.create_for_project(project=project, summary="Task", creator="member")
+
+    # When
+    task.change_status(Status.CLOSED)
+    task.save()
+    closed = Task.objects.get(pk=task.pk).close_date
+    task.change_status(Status.TO_DO)
+    task.save(update_fields=['status'])
+
+    # Then
+    assert closed is not None
+    assert Task.objects.get(pk=task.pk).close_date is None
@@ -0,0 +1,186 @@
+import random
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from projects_app.models import ProjectMember
+from tasks_app.filters import TaskFilter
+from tasks_app.models import Task, SavedFilter, SavedFilterResult
+from tasks_app.services.saved_filters import SavedFilters
+from tasks_app.services.task_archive import TaskArchive
+from tasks_app.services.task_management.task_relationship import TaskType
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+pytestmark = pytest.mark.project(id="SAV", role=ProjectMember.Role.DEVELOPER)
+
+
+def create_tasks(project):
+    Task.create_for_project(project=project, summary="Urgent", creator="member", assignee="member",   # SAV-1
+                            priority=Task.Priority.URGENT)
+    Task.create_for_project(project=project, summary="Low", creator="member", assignee="member",      # SAV-2
+                            priority=Task.Priority.LOW)
+    Task.create_for_project(project=project, summary="Other", creator="member", assignee="other",     # SAV-3
+                            priority=Task.Priority.URGENT)
+
+
+def listed(client, saved_filter_id):
+    response = client.get(f"/tasks/saved-filters/{saved_filter_id}/tasks/")
+    assert response.status_code == 200
+    return [task["id"] for task in response.json()["results"]]
+
+
+@pytest.mark.django_db
+def test_saved_filter_is_materialized_and_kept_up_to_date(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    created = client.post("/tasks/saved-filters/", {
+        "name": "My open urgent",
+        "params": {"assignee": "member", "priority": "Urgent", "status": "To Do", "project": "SAV"},
+    }, format="json")
+    saved_filter_id = created.json()["id"]
+
+    # Then
+    assert created.status_code == 201
+    assert created.json()["project"] == "SAV"
+    assert listed(client, saved_filter_id) == ["SAV-1"]
+
+    # When - task starts to match, another stops, new task matches
+    low = Task.objects.get(key="SAV-2")
+    low.priority = Task.Priority.URGENT
+    low.save()
+    urgent = Task.objects.get(key="SAV-1")
+    urgent.change_status(Status.CLOSED)
+    urgent.save()
+    Task.create_for_project(project=project, summary="New", creator="member", assignee="member",
+                            priority=Task.Priority.URGENT)
+
+    # Then
+    assert listed(client, saved_filter_id) == ["SAV-2", "SAV-4"]
+
+    # When
+    Task.objects.get(key="SAV-4").delete()
+
+    # Then
+    assert listed(client, saved_filter_id) == ["SAV-2"]
+
+
+@pytest.mark.django_db
+def test_saved_filter_change_of_params_materializes_again(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    saved_filter_id = client.post("/tasks/saved-filters/", {"name": "Urgent", "params": {"priority": "Urgent"}},
+                                  format="json").json()["id"]
+
+    # When
+    updated = client.patch(f"/tasks/saved-filters/{saved_filter_id}/", {"params": {"assignee": "other"}},
+                           format="json")
+
+    # Then
+    assert updated.status_code == 200
+    assert updated.json()["project"] is None
+    assert listed(client, saved_filter_id) == ["SAV-3"]
+
+
+@pytest.mark.parametrize("params, error", [
+    ({"sprint": "1"}, "cannot be saved"),
+    ({"overdue": "true"}, "cannot be saved"),
+    ({"colour": "red"}, "Unknown filters"),
+    ({"status": "Done"}, "status"),
+    ({"parent": "SAV-99"}, "does not exist"),
+])
+@pytest.mark.django_db
+def test_saved_filter_rejects_params_not_decided_by_task_row(project, api_client, params, error):
+    # Given
+    client = api_client()
+
+    # When
+    response = client.post("/tasks/saved-filters/", {"name": "Filter", "params": params}, format="json")
+
+    # Then
+    assert response.status_code == 400
+    assert error in response.json()["errors"]["params"][0]
+
+
+@pytest.mark.django_db
+def test_saved_filters_are_private_and_names_unique(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    saved_filter_id = client.post("/tasks/saved-filters/", {"name": "Mine", "params": {}}, format="json").json()["id"]
+    other = api_client("other")
+
+    # When - Then
+    assert client.post("/tasks/saved-filters/", {"name": "Mine", "params": {}}, format="json").status_code == 400
+    assert other.get(f"/tasks/saved-filters/{saved_filter_id}/tasks/").status_code == 404
+    assert other.get("/tasks/saved-filters/").json()["results"] == []
+    # Results hold all matching tasks, listing shows only tasks of visible projects
+    assert other.post("/tasks/saved-filters/", {"name": "Mine", "params": {}}, format="json").status_code == 201
+    assert listed(other, SavedFilter.objects.get(owner="other").pk) == []
+
+
+@pytest.mark.django_db
+def test_archived_tasks_leave_saved_filter_results(project):
+    # Given
+    create_tasks(project)
+    saved_filter = SavedFilter.objects.create(owner="member", name="All", params={})
+    SavedFilters.refresh(saved_filter)
+    task = Task.objects.get(key="SAV-1")
+    task.change_status(Status.CLOSED)
+    task.close_date = timezone.now() - timedelta(days=365)
+    task.save()
+
+    # When
+    TaskArchive.archive_batch(100, *TaskArchive.cutoffs())
+
+    # Then
+    assert set(saved_filter.results.values_list("task__key", flat=True)) == {"SAV-2", "SAV-3"}
+
+
+@pytest.mark.django_db
+def test_incremental_results_match_filter_query(project):
+    # Given - filters over every supported kind of condition
+    create_tasks(project)
+    now = timezone.now()
+    epic = Task.create_for_project(project=project, summary="Epic", creator="member", type=TaskType.EPIC)
+    params = [
+        {"assignee": "member"},
+        {"priority": "Urgent", "status": "In Progress"},
+        {"type": "Bug", "project": "SAV"},
+        {"due_date_after": (now + timedelta(days=2)).isoformat(),
+         "due_date_before": (now + timedelta(days=6)).isoformat()},
+        {"creator": "other", "status": "To Do"},
+        {"parent": epic.key},
+    ]
+    saved_filters = []
+    for i, filter_params in enumerate(params):
+        conditions, project_id = SavedFilters.compile(filter_params)
+        saved_filter = SavedFilter.objects.create(owner="member", name=f"Filter {i}", params=filter_params,
+                                                  conditions=conditions, project_id=project_id)
+        SavedFilters.refresh(saved_filter)
+        saved_filters.append(saved_filter)
+
+    # When - random writes through Task.save
+    rng = random.Random(3)
+    for step in range(60):
+        if step % 4 == 0:
+            Task.create_for_project(project=project, summary=f"Task {step}", creator=rng.choice(["member", "other"]))
+            continue
+        task = rng.choice(list(Task.objects.exclude(pk=epic.pk)))
+        task.assignee = rng.choice(["member", "other", None])
+        task.priority = rng.choice(Task.Priority.values)
+        task.status = rng.choice(Status.values)
+        task.type = rng.choice([TaskType.BUG, TaskType.TASK])
+        task.due_date = rng.choice([None, now + timedelta(days=rng.randrange(10))])
+        task.parent = rng.choice([None, epic])
+        task.save()
+
+    # Then
+    for saved_filter in saved_filters:
+        query = TaskFilter(data=saved_filter.params, queryset=Task.objects.all()).qs
+        expected = set(query.values_list("pk", flat=True))
+        assert set(saved_filter.results.values_list("task_id", flat=True)) == expected, saved_filter.params
+    assert SavedFilterResult.objects.count() > 0
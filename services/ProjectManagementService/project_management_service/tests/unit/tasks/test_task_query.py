@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from projects_app.models import Project, ProjectMember
+from sprints_app.models import Sprint
+from tasks_app.models import Task
+from tasks_app.services.task_query import TaskQuery, InvalidTaskQuery
+from tasks_app.services.task_management.task_relationship import TaskType
+from tasks_app.services.task_management.task_status_workflow import Status
+
+
+pytestmark = pytest.mark.project(id="QRY", role=ProjectMember.Role.DEVELOPER)
+
+
+@pytest.fixture
+def tasks(project):
+    now = timezone.now()
+    other = Project.objects.create(project_name="Other", id="OTH")
+    ProjectMember.objects.create(user_id="member", project=other, role=ProjectMember.Role.DEVELOPER)
+    Task.create_for_project(project=project, summary="Fix login", creator="member", assignee="member",   # QRY-1
+                            priority=Task.Priority.URGENT, due_date=now + timedelta(days=2))
+    Task.create_for_project(project=project, summary="Write docs", creator="member",                     # QRY-2
+                            priority=Task.Priority.LOW, due_date=now + timedelta(days=20))
+    Task.create_for_project(project=project, summary="Login page", creator="other", assignee="member",   # QRY-3
+                            priority=Task.Priority.HIGH, type=TaskType.BUG)
+    Task.create_for_project(project=other, summary="Fix build", creator="member",                        # OTH-1
+                            priority=Task.Priority.URGENT, due_date=now + timedelta(days=1))
+    in_progress = Task.objects.get(key="QRY-2")
+    in_progress.change_status(Status.IN_PROGRESS)
+    in_progress.save()
+    sprint = Sprint.objects.create(name="Sprint", project=project)
+    Task.objects.get(key="QRY-3").sprint.add(sprint)
+    return sprint
+
+
+def keys(text):
+    return list(TaskQuery.filter(Task.objects.all(), text).values_list("key", flat=True))
+
+
+@pytest.mark.django_db
+def test_query_from_request(tasks, api_client):
+    # Given
+    client = api_client()
+
+    # When
+    response = client.get("/tasks/", {"q": 'project = QRY AND (status IN ("To Do", "In Progress") OR priority = '
+                                           'Urgent) AND due_date < now()+7d ORDER BY priority'})
+
+    # Then
+    assert response.status_code == 200
+    assert [task["id"] for task in response.json()["results"]] == ["QRY-1"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("project = QRY ORDER BY priority", ["QRY-1", "QRY-3", "QRY-2"]),
+    ("priority = urgent ORDER BY key DESC", ["QRY-1", "OTH-1"]),
+    ("status != 'To Do'", ["QRY-2"]),
+    ("assignee IS EMPTY ORDER BY id", ["OTH-1", "QRY-2"]),
+    ("NOT project IN (QRY) OR type = Bug ORDER BY key", ["OTH-1", "QRY-3"]),
+    ("summary ~ Fix* ORDER BY key", ["OTH-1", "QRY-1"]),
+    ("project = QRY AND summary ~ '*login*' ORDER BY key", ["QRY-1", "QRY-3"]),
+    ("due_date >= now() + 1d AND due_date < now() + 2w ORDER BY due_date", ["QRY-1"]),
+    ("due_date IS NOT EMPTY ORDER BY due_date DESC", ["QRY-2", "QRY-1", "OTH-1"]),
+])
+@pytest.mark.django_db
+def test_query_results(tasks, text, expected):
+    assert keys(text) == expected
+
+
+@pytest.mark.django_db
+def test_query_by_sprint_and_day(tasks):
+    # Given
+    today = timezone.localdate().isoformat()
+
+    # Then
+    assert keys(f"sprint = {tasks.pk}") == ["QRY-3"]
+    assert keys(f"sprint NOT IN ({tasks.pk}) ORDER BY key") == ["OTH-1", "QRY-1", "QRY-2"]
+    assert keys(f"creation_date = {today} AND project = OTH") == ["OTH-1"]
+    assert keys(f"creation_date < {today}") == []
+
+
+@pytest.mark.parametrize("text, error", [
+    ("summary ~ '*login'", "leading wildcard"),
+    ("project = QRY OR summary ~ '*login'", "leading wildcard"),
+    ("summary ~ 'lo*gin'", "only at start and end"),
+    ("priority > High", "only for dates and numbers"),
+    ("colour = red", "Unknown field"),
+    ("status = Done", "unknown value"),
+    ("due_date = tomorrow", "expected date"),
+    ("project = QRY AND", "Expected word"),
+    ("(project = QRY", "Expected rparen"),
+    ("estimate IN (now())", "only for dates"),
+    ("", "empty"),
+    ("due_date < 9999-12-31", "expected date"),
+    ("due_date > now()+99999999d", "out of range"),
+    ("due_date > now()-9999999999999999999w", "out of range"),
+    ("sprint = 99999999999999999999", "out of range"),
+    ("estimate > 3000000000", "out of range"),
+])
+@pytest.mark.django_db
+def test_invalid_queries(tasks, api_client, text, error):
+    # Given
+    client = api_client()
+
+    # When
+    response = client.get("/tasks/", {"q": text or " "})
+
+    # Then
+    assert response.status_code == 400
+    assert error in response.json()["errors"]["q"][0]
+
+
+@pytest.mark.django_db
+def test_plans_are_cached_and_bounded(tasks, settings):
+    # Given
+    settings.TASK_QUERY_CACHE_SIZE = 2
+
+    # When
+    first = TaskQuery.plan("project = QRY")
+    TaskQuery.plan("project = OTH")
+    again = TaskQuery.plan("project = QRY")
+    TaskQuery.plan("priority = Low")
+
+    # Then - least recently used plan evicted, query with now() compiled at execution
+    assert again is first
+    assert list(TaskQuery._plans) == ["project = QRY", "priority = Low"]
+    assert TaskQuery.plan("due_date < now()").q is None
+    with pytest.raises(InvalidTaskQuery):
+        TaskQuery.plan("x" * 3000)
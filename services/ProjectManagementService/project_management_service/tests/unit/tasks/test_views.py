@@ -0,0 +1,176 @@
+import pytest
+from django.core.management import CommandError, call_command
+
+from projects_app.models import Project, ProjectMember
+from tasks_app.models import Task, Comment
+from tasks_app.services.task_management.task_relationship import TaskType
+
+
+def create_tasks(project):
+    """
+    Epic TTT-1, its task TTT-2 with subtasks TTT-3 .. TTT-5, comments and observer
+    """
+    epic = Task.create_for_project(project=project, summary="Epic", creator="member", type=TaskType.EPIC)
+    task = Task.create_for_project(project=project, summary="Task", creator="member", parent=epic)
+    for i in range(3):
+        Task.create_for_project(project=project, summary=f"Subtask {i}", creator="member", parent=task,
+                                type=TaskType.SUBTASK)
+        Comment.objects.create(task=task, author="member", content=f"Comment {i}")
+    task.add_observer("member")
+
+
+@pytest.mark.django_db
+def test_task_details_with_includes(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    response = client.get("/tasks/TTT-2/?include=comments,observers,children,parent&include_limit=2")
+
+    # Then
+    assert response.status_code == 200
+    included = response.json()["included"]
+    assert included["comments"]["count"] == 3
+    assert [c["content"] for c in included["comments"]["results"]] == ["Comment 0", "Comment 1"]
+    assert included["observers"] == {"count": 1, "results": [{"task": "TTT-2", "user_id": "member"}]}
+    assert included["children"]["count"] == 3
+    assert [t["id"] for t in included["children"]["results"]] == ["TTT-3", "TTT-4"]
+    assert included["parent"]["id"] == "TTT-1"
+
+
+@pytest.mark.django_db
+def test_task_details_includes_use_constant_queries(project, api_client, django_assert_max_num_queries):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When - visible projects, task, sprints, comments, observers, children (+ their sprints), parent sprints,
+    # permission check
+    with django_assert_max_num_queries(9):
+        response = client.get("/tasks/TTT-2/?include=comments,observers,children,parent")
+
+    # Then
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_task_details_without_include_unchanged(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    response = client.get("/tasks/TTT-2/")
+
+    # Then
+    assert "included" not in response.json()
+
+
+@pytest.mark.django_db
+def test_task_details_unknown_include(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    response = client.get("/tasks/TTT-2/?include=comments,history")
+
+    # Then
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_task_batch_returns_found_and_missing(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+    other = Project.objects.create(project_name="Other", id="OOO")
+    Task.create_for_project(project=other, summary="Hidden", creator="someone")
+
+    # When
+    response = client.post("/tasks/batch/", {"ids": ["TTT-3", "OOO-1", "TTT-1", "TTT-99", "TTT-3"]}, format="json")
+
+    # Then
+    assert response.status_code == 200
+    assert [t["id"] for t in response.json()["results"]] == ["TTT-3", "TTT-1"]
+    assert response.json()["missing"] == ["OOO-1", "TTT-99"]
+
+
+@pytest.mark.django_db
+def test_task_batch_query_count_independent_of_size(project, api_client, django_assert_max_num_queries):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When - visible projects, tasks, sprints
+    with django_assert_max_num_queries(3):
+        response = client.post("/tasks/batch/", {"ids": [f"TTT-{i}" for i in range(1, 6)]}, format="json")
+
+    # Then
+    assert len(response.json()["results"]) == 5
+
+
+@pytest.mark.django_db
+def test_task_batch_validation(project, api_client):
+    # Given
+    client = api_client()
+
+    # When - Then
+    assert client.post("/tasks/batch/", {"ids": []}, format="json").status_code == 400
+    assert client.post("/tasks/batch/", {"ids": ["X"] * 5001}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.project(role=ProjectMember.Role.DEVELOPER)
+def test_tasks_are_identified_by_key(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    children = client.get("/tasks/?parent=TTT-2")
+    comments = client.get("/tasks/TTT-2/comments/?task=TTT-2")
+    created = client.post("/tasks/", {"summary": "New", "project": "TTT", "type": TaskType.TASK, "parent": "TTT-1"},
+                          format="json")
+
+    # Then - integer primary key stays internal
+    assert isinstance(Task.objects.get(key="TTT-2").pk, int)
+    assert [(t["id"], t["parent"]) for t in children.json()["results"]] == [("TTT-3", "TTT-2"), ("TTT-4", "TTT-2"),
+                                                                           ("TTT-5", "TTT-2")]
+    assert {c["task"] for c in comments.json()["results"]} == {"TTT-2"}
+    assert created.status_code == 201
+    assert (created.json()["id"], created.json()["parent"]) == ("TTT-6", "TTT-1")
+
+
+@pytest.mark.django_db
+def test_task_key_migration_requires_postgresql():
+    # When - Then
+    with pytest.raises(CommandError):
+        call_command("migrate_task_keys", "status")
+
+
+@pytest.mark.django_db
+@pytest.mark.project(role=ProjectMember.Role.DEVELOPER)
+def test_choice_fields_keep_string_values_on_wire(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When
+    updated = client.patch("/tasks/TTT-3/", {"status": "In Progress", "priority": "Urgent"}, format="json")
+    listed = client.get("/tasks/?status=In Progress")
+
+    # Then
+    assert updated.status_code == 200
+    assert (updated.json()["status"], updated.json()["priority"], updated.json()["type"]) == \
+        ("In Progress", "Urgent", "Subtask")
+    assert [(t["id"], t["status"]) for t in listed.json()["results"]] == [("TTT-3", "In Progress")]
+    assert client.patch("/tasks/TTT-3/", {"priority": "Whenever"}, format="json").status_code == 400
+
+
+@pytest.mark.django_db
+def test_choice_code_migration_requires_postgresql():
+    # When - Then
+    with pytest.raises(CommandError):
+        call_command("migrate_choice_codes", "status")
@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from middleware.admission import admission_controller, TokenBucket
+
+
+pytestmark = pytest.mark.project(id="ADM")
+
+
+def test_token_bucket_refills_over_time():
+    # Given
+    bucket = TokenBucket(capacity=10, rate=2, now=0)
+
+    # Then
+    assert bucket.take(8, now=0) == 0
+    assert bucket.take(4, now=0) == 1.0  # 2 tokens missing
+    assert bucket.take(4, now=1) == 0
+
+
+@pytest.mark.django_db
+@override_settings(ADMISSION_BURST=10, ADMISSION_RATE=1)
+def test_list_requests_cost_more_than_details(project, api_client):
+    # Given
+    client = api_client()
+
+    # When - 10 tokens: two lists (5 each)
+    statuses = [client.get("/tasks/").status_code for _ in range(3)]
+
+    # Then
+    assert statuses == [200, 200, 429]
+    rejected = client.get("/projects/ADM/")
+    assert rejected.status_code == 429
+    assert int(rejected["Retry-After"]) >= 1
+    assert api_client("other").get("/projects/ADM/").status_code == 403  # other user has own bucket
+
+
+@pytest.mark.django_db
+@override_settings(ADMISSION_BURST=100, ADMISSION_OFFSET_COST_STEP=1000)
+def test_deep_offsets_and_wide_pages_cost_more(project, api_client):
+    # Given
+    client = api_client()
+
+    # When - 5 * (1000 / 100) = 50 tokens, then 5 + 45000 / 1000 = 50 tokens
+    wide = client.get("/tasks/?limit=1000")
+    deep = client.get("/tasks/?offset=45000")
+
+    # Then
+    assert (wide.status_code, deep.status_code) == (200, 200)
+    assert client.get("/projects/ADM/").status_code == 429
+
+
+@pytest.mark.django_db
+@override_settings(ADMISSION_MAX_CONCURRENCY=1)
+def test_requests_over_concurrency_limit_are_shed(project, api_client):
+    # Given
+    with admission_controller._lock:
+        admission_controller.in_flight = 1  # request in progress
+    try:
+        # When
+        response = api_client().get("/projects/ADM/")
+    finally:
+        admission_controller.release()
+
+    # Then
+    assert response.status_code == 503
+    assert response["Retry-After"] == "1"
+    assert admission_controller.in_flight == 0
+
+
+@pytest.mark.django_db
+@override_settings(ADMISSION_BURST=5)
+def test_admission_stats(project, api_client):
+    # Given
+    client = api_client()
+    client.get("/tasks/")
+    client.get("/tasks/")
+    admin = APIClient()
+    admin.force_authenticate(User(username="admin", is_staff=True))
+
+    # When
+    stats = admin.get("/admission/stats/").json()
+
+    # Then
+    assert stats["endpoints"]["list"] == {"accepted": 1, "rate_limited": 1, "overloaded": 0, "shed_ratio": 0.5}
+    assert stats["max_in_flight"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import pytest
+
+from project_management_service.database import default_database
+
+
+def test_sqlite_profile_applies_wal_pragmas(monkeypatch):
+    # Given
+    monkeypatch.delenv('PMS_SQLITE_WAL', raising=False)
+
+    # When
+    database = default_database(Path('/tmp'), profile='sqlite')
+
+    # Then
+    assert 'PRAGMA journal_mode=WAL' in database['OPTIONS']['init_command']
+    assert 'PRAGMA synchronous=NORMAL' in database['OPTIONS']['init_command']
+    assert database['OPTIONS']['transaction_mode'] == 'IMMEDIATE'
+
+
+def test_sqlite_profile_without_wal(monkeypatch):
+    # Given
+    monkeypatch.setenv('PMS_SQLITE_WAL', '0')
+
+    # When
+    database = default_database(Path('/tmp'), profile='sqlite')
+
+    # Then
+    assert 'OPTIONS' not in database
+
+
+@pytest.mark.parametrize('pool', ['1', '0'])
+def test_postgres_profile_pool_or_persistent(monkeypatch, pool):
+    # Given
+    monkeypatch.setenv('PMS_DB_POOL', pool)
+
+    # When
+    database = default_database(Path('/tmp'), profile='postgres')
+
+    # Then
+    assert database['CONN_HEALTH_CHECKS']
+    if pool == '1':
+        assert database['CONN_MAX_AGE'] == 0
+        assert database['OPTIONS']['pool']['max_size'] == 20
+    else:
+        assert database['CONN_MAX_AGE'] == 600
+        assert 'pool' not in database['OPTIONS']
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        default_database(Path('/tmp'), profile='oracle')
@@ -0,0 +1,115 @@
+import os
+
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from middleware.replica_routing import ReplicaRoutingMiddleware
+from project_management_service.db_router import (PrimaryReplicaRouter, ReplicaLagMonitor, use_primary,
+                                                  is_pinned_to_primary, sqlite_file_lag)
+from tasks_app.models import Task
+from tasks_app.services.task_archive import TaskArchive
+
+
+@pytest.fixture
+def router():
+    router = PrimaryReplicaRouter()
+    router.lag_monitor = ReplicaLagMonitor(measure=lambda alias: {'replica_1': 0.1, 'replica_2': 60}[alias])
+    return router
+
+
+def test_reads_go_to_primary_without_replicas(router):
+    assert router.db_for_read(Task) == 'default'
+    assert router.db_for_write(Task) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'], REPLICA_MAX_LAG_SECONDS=2)
+def test_reads_skip_lagging_replica(router):
+    # When
+    aliases = {router.db_for_read(Task) for _ in range(4)}
+
+    # Then
+    assert aliases == {'replica_1'}
+
+
+@override_settings(DATABASE_REPLICAS=['replica_2'], REPLICA_MAX_LAG_SECONDS=2)
+def test_reads_fall_back_to_primary_when_all_replicas_lag(router):
+    assert router.db_for_read(Task) == 'default'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+def test_pinned_reads_go_to_primary(router):
+    with use_primary():
+        assert router.db_for_read(Task) == 'default'
+    assert router.db_for_read(Task) == 'replica_1'
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+@pytest.mark.django_db(transaction=True)
+def test_reads_inside_write_transaction_go_to_primary(router):
+    # When - Then
+    with transaction.atomic():
+        assert router.db_for_read(Task) == 'default'
+    assert router.db_for_read(Task) == 'replica_1'
+
+
+@pytest.mark.django_db
+def test_background_commands_read_from_primary(monkeypatch):
+    # Given
+    seen = {}
+
+    def run(**kwargs):
+        seen['pinned'] = is_pinned_to_primary()
+        return 0
+
+    monkeypatch.setattr(TaskArchive, 'run', run)
+
+    # When
+    call_command('archive_tasks')
+
+    # Then
+    assert seen['pinned'] is True
+    assert not is_pinned_to_primary()
+
+
+@override_settings(REPLICA_STICKY_SECONDS=5)
+@pytest.mark.parametrize('method, cookies, headers, pinned', [
+    ('get', {}, {}, False),
+    ('post', {}, {}, True),
+    ('get', {'pms_read_primary': '1'}, {}, True),
+    ('get', {}, {'X-Read-Primary': '1'}, True),
+])
+def test_middleware_pins_after_write(method, cookies, headers, pinned):
+    # Given
+    seen = {}
+
+    def view(request):
+        seen['pinned'] = is_pinned_to_primary()
+        return HttpResponse()
+
+    request = getattr(RequestFactory(), method)('/tasks/', headers=headers)
+    request.COOKIES.update(cookies)
+
+    # When
+    response = ReplicaRoutingMiddleware(view)(request)
+
+    # Then
+    assert seen['pinned'] is pinned
+    assert ('pms_read_primary' in response.cookies) is (method == 'post')
+    assert not is_pinned_to_primary()
+
+
+def test_sqlite_file_lag(tmp_path):
+    # Given
+    primary, replica = tmp_path / 'primary.sqlite3', tmp_path / 'replica.sqlite3'
+    primary.touch()
+    replica.touch()
+    os.utime(replica, (1000, 1000))
+    os.utime(primary, (1010, 1010))
+
+    # When - Then
+    assert sqlite_file_lag(primary, replica) == 10
+    os.utime(replica, (1020, 1020))
+    assert sqlite_file_lag(primary, replica) == 0
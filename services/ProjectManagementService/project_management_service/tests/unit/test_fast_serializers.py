@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from caching.response_cache import ResponseCache
+from sprints_app.models import Sprint
+from sprints_app.serializers import SprintsSerializer, sprint_fast_serializer
+from tasks_app.models import Task, Comment
+from tasks_app.serializers import TaskSerializer, CommentSerializer, task_fast_serializer, comment_fast_serializer
+
+
+pytestmark = pytest.mark.project(id="FST")
+
+
+def create_tasks(project):
+    """
+    Parent task with due date, estimate and priority in first sprint and its child in both sprints, comment
+    """
+    first = Sprint.objects.create(name="First", project=project,
+                                  start_date=datetime.datetime(2024, 1, 1, 9, 30, tzinfo=datetime.timezone.utc))
+    second = Sprint.objects.create(name="Second", project=project)
+    parent = Task.create_for_project(project=project, summary="Parent", creator="member",
+                                     due_date=datetime.datetime(2024, 2, 1, tzinfo=datetime.timezone.utc),
+                                     estimate=5, priority=Task.Priority.HIGH)
+    child = Task.create_for_project(project=project, summary="Child", creator="member", parent=parent)
+    child.sprint.set([second, first])
+    parent.sprint.set([first])
+    Comment.objects.create(task=parent, author="member", content="Comment")
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("serializer_class, fast_serializer, queryset", [
+    (TaskSerializer, task_fast_serializer, lambda: Task.objects.order_by('pk')),
+    (SprintsSerializer, sprint_fast_serializer, lambda: Sprint.objects.order_by('pk')),
+    (CommentSerializer, comment_fast_serializer, lambda: Comment.objects.order_by('pk')),
+])
+def test_fast_serializer_output_is_identical(project, serializer_class, fast_serializer, queryset):
+    # Given
+    create_tasks(project)
+
+    # When
+    expected = render(serializer_class(queryset(), many=True).data)
+    actual = render(fast_serializer.serialize(queryset()))
+
+    # Then
+    assert actual == expected
+
+
+@pytest.mark.django_db
+def test_fast_serializer_loads_many_to_many_once_per_page(project, django_assert_num_queries):
+    # Given
+    create_tasks(project)
+
+    # Then
+    with django_assert_num_queries(2):
+        fast_serializer_data = task_fast_serializer.serialize(Task.objects.all())
+    assert len(fast_serializer_data) == 2
+
+
+@pytest.mark.django_db
+def test_list_view_response_same_with_and_without_fast_path(project, api_client):
+    # Given
+    client = api_client()
+    create_tasks(project)
+
+    # When - same request, response cache cleared so the regular path serializes again
+    fast = client.get("/tasks/?limit=1&offset=1")
+    ResponseCache.cache().clear()
+    with override_settings(FAST_READ_SERIALIZERS=False):
+        regular = client.get("/tasks/?limit=1&offset=1")
+
+    # Then
+    assert (fast["X-Cache"], regular["X-Cache"]) == ("MISS", "MISS")
+    assert fast.json()["results"] == regular.json()["results"]
+    assert fast.json()["count"] == regular.json()["count"] == 2
@@ -0,0 +1,305 @@
+"""
+Online PostgreSQL column migrations (utils/online_migration.py) run phase by phase on the old schema layout -
+tables of current models are turned back into it (string task ids, varchar choice columns), seeded with raw SQL
+as old code wrote them, migrated while old code keeps writing, and compared with the schema of current models.
+Skipped on SQLite, run against PostgreSQL:
+
+    PMS_DB_PROFILE=postgres PMS_DB_HOST=... python -m pytest tests/unit/test_online_migrations.py
+"""
+import re
+from datetime import timedelta
+
+import pytest
+from django.apps import apps
+from django.db import connection
+from django.utils import timezone
+
+from projects_app.models import Project, ProjectMember
+from sprints_app.models import Sprint
+from sprints_app.services.sprint_status_management import SprintStatus
+from tasks_app.models import Task, ArchivedTask, Comment, TaskDependency, SavedFilter
+from tasks_app.services.task_key_migration import TaskKeyMigration, TaskKeyMigrationError
+from tasks_app.services.task_management.task_relationship import TaskType
+from tasks_app.services.task_management.task_status_workflow import Status
+from utils.choice_code_migration import ChoiceCodeMigration
+
+pytestmark = [
+    pytest.mark.skipif(connection.vendor != 'postgresql', reason="Online migrations run only on PostgreSQL"),
+    pytest.mark.django_db(transaction=True),
+]
+
+LOCAL_APPS = ('projects_app', 'sprints_app', 'tasks_app', 'caching')
+
+
+def quote(name):
+    return connection.ops.quote_name(name)
+
+
+def execute(sql, params=None):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall() if cursor.description else None
+
+
+def insert(table, **values):
+    """
+    Row written by old code (raw SQL - old column types), returns its id
+    """
+    columns = ', '.join(quote(column) for column in values)
+    placeholders = ', '.join(['%s'] * len(values))
+    return execute(f'INSERT INTO {quote(table)} ({columns}) VALUES ({placeholders}) RETURNING id',
+                   list(values.values()))[0][0]
+
+
+def schema(tables) -> dict:
+    """
+    Columns, constraints and indexes of tables. Names are compared only for indexes and constraints declared
+    in models - migrations name other objects their own way
+    """
+    declared = {item.name for model in apps.get_models() for item in (*model._meta.indexes, *model._meta.constraints)}
+    state = {}
+    for table in tables:
+        state[table] = {
+            'columns': sorted(execute(
+                'SELECT column_name, data_type, character_maximum_length, is_nullable FROM information_schema.columns '
+                'WHERE table_schema = current_schema() AND table_name = %s', [table])),
+            'constraints': sorted(
+                (name if name in declared else '', kind, definition) for name, kind, definition in execute(
+                    'SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint '
+                    'WHERE conrelid = %s::regclass', [table])),
+            'indexes': sorted(
+                definition if name in declared else re.sub(r'INDEX \S+ ON', 'INDEX ON', definition)
+                for name, definition in execute(
+                    'SELECT class.relname, pg_get_indexdef(index.indexrelid) FROM pg_index AS index '
+                    'JOIN pg_class AS class ON class.oid = index.indexrelid WHERE index.indrelid = %s::regclass',
+                    [table])),
+        }
+    return state
+
+
+def constraints(table) -> dict:
+    with connection.cursor() as cursor:
+        return connection.introspection.get_constraints(cursor, table)
+
+
+@pytest.fixture
+def recreate_tables():
+    """
+    Test leaves tables in any phase - they are created again from current models for following tests
+    """
+    yield
+    models = [model for config in apps.get_app_configs() if config.label in LOCAL_APPS
+              for model in config.get_models() if model._meta.managed]
+    tables = {model._meta.db_table for model in apps.get_models(include_auto_created=True)
+              if model._meta.app_label in LOCAL_APPS}
+    for table in tables:
+        execute(f'DROP TABLE IF EXISTS {quote(table)} CASCADE')
+    execute(f'DROP SEQUENCE IF EXISTS {quote(Task._meta.db_table + "_id_seq")}')
+    for (function,) in execute("SELECT proname FROM pg_proc WHERE proname LIKE '%%_migration_fn'"):
+        execute(f'DROP FUNCTION IF EXISTS {quote(function)}()')
+    with connection.schema_editor() as schema_editor:
+        for model in models:
+            schema_editor.create_model(model)
+
+
+# Old layouts
+
+def to_string_task_ids(migration):
+    """
+    Task and ArchivedTask with varchar primary key "<PROJECT>-<number>" referenced by varchar columns
+    """
+    references = migration.references()
+    for reference in references:
+        table = reference.model._meta.db_table
+        for name, constraint in constraints(table).items():
+            if constraint['foreign_key'] and constraint['columns'] == [reference.field.column]:
+                execute(f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}')
+
+    changes = {}
+    for owner in migration.owners:
+        table = owner._meta.db_table
+        execute(f'ALTER TABLE {quote(table)} DROP COLUMN key')
+        execute(f'ALTER TABLE {quote(table)} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+        changes.setdefault(table, []).append('ALTER COLUMN id TYPE varchar(64) USING id::text')
+    for reference in references:
+        changes.setdefault(reference.model._meta.db_table, []).append(
+            f'ALTER COLUMN {quote(reference.field.column)} TYPE varchar(64) USING NULL')
+        key_field = migration.key_field(reference)
+        if key_field is not None:
+            changes[reference.model._meta.db_table].append(f'DROP COLUMN {quote(key_field.column)}')
+    # All columns of table at once - checks over two reference columns are rebuilt after both changed
+    for table, clauses in changes.items():
+        execute(f'ALTER TABLE {quote(table)} {", ".join(clauses)}')
+
+    for owner in migration.owners:
+        table = owner._meta.db_table
+        execute(f'CREATE INDEX {quote(table + "_id_like")} ON {quote(table)} (id varchar_pattern_ops)')
+    for reference in references:
+        if reference.field.db_constraint:
+            table, column = reference.model._meta.db_table, reference.field.column
+            execute(f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(f"{table}_{column}_old_fk")} FOREIGN KEY '
+                    f'({quote(column)}) REFERENCES {quote(reference.field.related_model._meta.db_table)} (id) '
+                    f'DEFERRABLE INITIALLY DEFERRED')
+
+
+def to_varchar_choices(migration):
+    """
+    Choice columns with varchar values, indexes over them compare values
+    """
+    for model, group in migration.by_model(migration.coded_columns()).items():
+        table = model._meta.db_table
+        columns = [column.field.column for column in group]
+        for name, constraint in constraints(table).items():
+            if constraint['check'] and set(constraint['columns']) & set(columns):
+                execute(f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}')
+        conditional = [index for index in migration.indexes(model, columns) if index.condition is not None]
+        for index in conditional:
+            execute(f'DROP INDEX {quote(index.name)}')
+
+        execute(f'ALTER TABLE {quote(table)} ' + ', '.join(
+            f'ALTER COLUMN {quote(column)} TYPE varchar(20) USING NULL' for column in columns))
+
+        with connection.schema_editor(collect_sql=True, atomic=False) as schema_editor:
+            for index in conditional:
+                sql = str(index.create_sql(model, schema_editor))
+                for column in group:
+                    sql = re.sub(rf'{re.escape(quote(column.field.column))} = (\d+)',
+                                 lambda match, codes=column.field.choice_codes:
+                                 f"{quote(column.field.column)} = '{codes.member(int(match[1])).value}'", sql)
+                execute(sql)
+
+
+def test_task_key_migration_phases(recreate_tables):
+    # Given - old layout written by old code
+    migration = TaskKeyMigration()
+    tables = migration.tables()
+    expected = schema(tables)
+    to_string_task_ids(migration)
+
+    now = timezone.now()
+    project = Project.objects.create(project_name="Keys", id="KEY", last_task_index=5)
+    sprint = Sprint.objects.create(name="Sprint", project=project)
+    saved_filter = SavedFilter.objects.create(owner="member", name="All", params={})
+
+    type_codes = Task._meta.get_field('type').choice_codes
+
+    def task(number, parent=None, **values):
+        values = {'summary': f"Task {number}", 'description': "", 'creator': "member", 'creation_date': now,
+                  'last_edit_time': now, 'type': type_codes.code(TaskType.TASK), 'priority': 3, 'status': 1, **values}
+        return insert('tasks_app_task', id=f"KEY-{number}", number=number, project_id="KEY", parent_id=parent,
+                      **values)
+
+    task(1, type=type_codes.code(TaskType.EPIC))
+    task(2, parent="KEY-1")
+    task(3)
+    insert('tasks_app_task_sprint', task_id="KEY-2", sprint_id=sprint.pk)
+    insert('tasks_app_comment', task_id="KEY-2", author="member", content="First", creation_date=now,
+           last_edit_time=now)
+    insert('tasks_app_taskobserver', task_id="KEY-3", user_id="observer")
+    insert('tasks_app_taskdependency', blocker_id="KEY-3", blocked_id="KEY-2", project_id="KEY", creation_date=now)
+    insert('tasks_app_taskduenotification', task_id="KEY-2", user_id="member", kind="overdue", due_date=now,
+           created_at=now)
+    insert('tasks_app_savedfilterresult', saved_filter_id=saved_filter.pk, task_id="KEY-3")
+    insert('tasks_app_archivedtask', id="KEY-4", number=4, project_id="KEY", parent_id="KEY-1", summary="Old",
+           description="", creator="member", creation_date=now, last_edit_time=now, archived_at=now,
+           type=type_codes.code(TaskType.TASK), priority=3, status=4)
+    insert('tasks_app_archivedcomment', task_id="KEY-4", author="member", content="Archived", creation_date=now,
+           last_edit_time=now)
+    insert('tasks_app_archivedtask_sprint', archivedtask_id="KEY-4", sprint_id=sprint.pk)
+
+    # When - old code keeps writing during the migration
+    migration.prepare()
+    task(5, parent="KEY-1")
+    assert migration.status()['tasks_app_task'] == 3  # row written after prepare has id from default
+    with pytest.raises(TaskKeyMigrationError):
+        migration.swap()  # rows without new id
+    migration.backfill(batch_size=2)
+    insert('tasks_app_comment', task_id="KEY-5", author="member", content="During", creation_date=now,
+           last_edit_time=now)
+    assert set(migration.status().values()) == {0}
+    migration.swap()
+    validated = migration.validate()
+
+    # Then - schema of current models
+    assert validated
+    assert schema(tables) == expected
+
+    # Then - rows and references kept
+    tasks = {task.key: task for task in Task.objects.all()}
+    assert set(tasks) == {"KEY-1", "KEY-2", "KEY-3", "KEY-5"}
+    assert len({task.pk for task in tasks.values()}) == 4
+    assert tasks["KEY-2"].parent.key == tasks["KEY-5"].parent.key == "KEY-1"
+    assert list(tasks["KEY-2"].sprint.all()) == [sprint]
+    assert dict(Comment.objects.values_list("content", "task__key")) == {"First": "KEY-2", "During": "KEY-5"}
+    assert list(tasks["KEY-3"].observers.values_list("user_id", flat=True)) == ["observer"]
+    assert TaskDependency.objects.get().blocker == tasks["KEY-3"]
+    assert tasks["KEY-2"].due_notifications.get().kind == "overdue"
+    assert list(saved_filter.results.values_list("task__key", flat=True)) == ["KEY-3"]
+    archived = ArchivedTask.objects.get(key="KEY-4")
+    assert (archived.parent_id, archived.parent_key) == (tasks["KEY-1"].pk, "KEY-1")
+    assert archived.pk not in {task.pk for task in tasks.values()}
+    assert list(archived.comments.values_list("content", flat=True)) == ["Archived"]
+    assert list(archived.sprint.all()) == [sprint]
+
+    # Then - new code writes with new ids
+    created = Task.create_for_project(project=project, summary="New", creator="member", parent=tasks["KEY-1"])
+    assert created.pk > max(task.pk for task in tasks.values()) and created.pk != archived.pk
+    with pytest.raises(TaskKeyMigrationError):
+        migration.prepare()
+
+
+def test_choice_code_migration_phases(recreate_tables):
+    # Given - old layout written by old code
+    migration = ChoiceCodeMigration()
+    tables = list(dict.fromkeys(column.model._meta.db_table for column in migration.coded_columns()))
+    expected = schema(tables)
+    to_varchar_choices(migration)
+
+    now = timezone.now()
+    project = Project.objects.create(project_name="Codes", id="COD")
+    insert('projects_app_projectmember', project_id="COD", user_id="admin", role="Admin")
+    insert('projects_app_projectmember', project_id="COD", user_id="viewer", role="Viewer")
+    sprint_id = insert('sprints_app_sprint', project_id="COD", name="Sprint", status="Started")
+
+    def task(number, **values):
+        values = {'summary': f"Task {number}", 'description': "", 'creator': "member", 'creation_date': now,
+                  'last_edit_time': now, 'type': "Task", 'priority': "Medium", 'status': "To Do", **values}
+        return insert('tasks_app_task', key=f"COD-{number}", number=number, project_id="COD", **values)
+
+    task(1, type="Epic", priority="Urgent", status="In Progress", due_date=now + timedelta(days=1))
+    task(2, type="Bug", priority="Low", status="Closed", due_date=now - timedelta(days=1))
+    task(3)
+    insert('tasks_app_archivedtask', id=1000, key="COD-4", number=4, project_id="COD", summary="Old",
+           description="", creator="member", creation_date=now, last_edit_time=now, archived_at=now,
+           type="Support", priority="High", status="Closed")
+
+    # When - old code keeps writing during the migration
+    migration.prepare()
+    task(5, status="In Review")
+    assert migration.status()['tasks_app_task.status'] == 3
+    migration.backfill(batch_size=2)
+    execute("UPDATE tasks_app_task SET status = 'Closed' WHERE key = 'COD-3'")
+    assert set(migration.status().values()) == {0}
+    migration.swap()
+    validated = migration.validate()
+
+    # Then - schema of current models
+    assert validated
+    assert schema(tables) == expected
+    assert migration.status() == {}
+
+    # Then - values kept, stored as codes
+    statuses = dict(Task.objects.values_list("key", "status"))
+    assert statuses == {"COD-1": Status.IN_PROGRESS, "COD-2": Status.CLOSED, "COD-3": Status.CLOSED,
+                        "COD-5": Status.IN_REVIEW}
+    first = Task.objects.get(key="COD-1")
+    assert (first.type, first.priority) == (TaskType.EPIC, Task.Priority.URGENT)
+    assert list(Task.objects.exclude(status=Status.CLOSED).filter(due_date__isnull=False)
+                .values_list("key", flat=True)) == ["COD-1"]
+    assert execute("SELECT status FROM tasks_app_task WHERE key = 'COD-2'") == [(4,)]
+    archived = ArchivedTask.objects.get(key="COD-4")
+    assert (archived.type, archived.priority, archived.status) == (TaskType.SUPPORT, Task.Priority.HIGH,
+                                                                   Status.CLOSED)
+    assert Sprint.objects.get(pk=sprint_id).status == SprintStatus.STARTED
+    assert dict(ProjectMember.objects.values_list("user_id", "role")) == {
+        "admin": ProjectMember.Role.ADMIN, "viewer": ProjectMember.Role.VIEWER}
@@ -0,0 +1,117 @@
+import json
+
+import msgpack
+import pytest
+
+from projects_app.models import ProjectMember
+from tasks_app.models import Task
+from utils.parsers import from_columns
+from utils.renderers import to_columns
+
+
+pytestmark = pytest.mark.project(id="FMT", member="admin", role=ProjectMember.Role.ADMIN)
+
+
+def create_tasks(project):
+    Task.create_for_project(project=project, summary="First", creator="admin")
+    Task.create_for_project(project=project, summary="Second", creator="admin", estimate=3)
+
+
+def test_columns_round_trip():
+    # Given
+    rows = [{"id": "A-1", "sprint": [1, 2], "estimate": None}, {"id": "A-2", "sprint": [], "estimate": 3}]
+
+    # Then
+    assert to_columns(rows) == {"id": ["A-1", "A-2"], "sprint": [[1, 2], []], "estimate": [None, 3]}
+    assert from_columns(to_columns(rows)) == rows
+    assert from_columns(to_columns([])) == []
+
+
+@pytest.mark.django_db
+def test_msgpack_list_response_matches_json(project, api_client):
+    # Given
+    client = api_client("admin")
+    create_tasks(project)
+
+    # When
+    response = client.get("/tasks/", HTTP_ACCEPT="application/msgpack")
+
+    # Then
+    assert response["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == client.get("/tasks/").json()
+
+
+@pytest.mark.django_db
+def test_columnar_list_response(project, api_client):
+    # Given
+    client = api_client("admin")
+    create_tasks(project)
+
+    # When
+    response = client.get("/tasks/?format=columnar")
+
+    # Then
+    body = json.loads(response.content)
+    expected = client.get("/tasks/").json()
+    assert response["Content-Type"].startswith("application/vnd.pms.columnar+json")
+    assert body["count"] == 2
+    assert body["results"]["summary"] == ["First", "Second"]
+    assert from_columns(body["results"]) == expected["results"]
+
+
+@pytest.mark.django_db
+def test_columnar_detail_response_is_unchanged(project, api_client):
+    # Given
+    client = api_client("admin")
+    create_tasks(project)
+
+    # When
+    response = client.get("/tasks/FMT-1/", HTTP_ACCEPT="application/vnd.pms.columnar+json")
+
+    # Then
+    assert json.loads(response.content)["summary"] == "First"
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("content_type, encode", [
+    ("application/msgpack", msgpack.packb),
+    ("application/vnd.pms.columnar+json", lambda rows: json.dumps(to_columns(rows))),
+])
+def test_members_posted_in_compact_format(project, api_client, content_type, encode):
+    # Given
+    client = api_client("admin")
+    members = [{"user_id": "dev", "role": "Developer"}, {"user_id": "viewer", "role": "Viewer"}]
+
+    # When
+    response = client.post("/projects/FMT/members/", encode(members), content_type=content_type)
+
+    # Then
+    assert response.status_code == 201
+    assert set(project.members.values_list("user_id", flat=True)) == {"admin", "dev", "viewer"}
+
+
+@pytest.mark.django_db
+def test_invalid_columnar_body_is_rejected(project, api_client):
+    # Given
+    client = api_client("admin")
+
+    # When
+    response = client.post("/projects/FMT/members/", json.dumps({"user_id": ["dev"], "role": []}),
+                           content_type="application/vnd.pms.columnar+json")
+
+    # Then
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_columnar_body_only_accepted_by_list_endpoints(project, api_client):
+    # Given
+    client = api_client("admin")
+    create_tasks(project)
+
+    # When
+    response = client.post("/tasks/batch/", json.dumps({"ids": ["FMT-1"]}),
+                           content_type="application/vnd.pms.columnar+json")
+
+    # Then
+    assert response.status_code == 415
@@ -0,0 +1,65 @@
+import pytest
+
+from caching.response_cache import ResponseCache
+from tasks_app.models import Task
+
+
+@pytest.mark.django_db
+def test_second_identical_request_is_served_from_cache(project, django_assert_num_queries, api_client):
+    # Given
+    Task.create_for_project(project=project, summary="Task", creator="member")  # TTT-1
+    client = api_client()
+    first = client.get("/tasks/?project=TTT")
+
+    # When
+    with django_assert_num_queries(0):
+        second = client.get("/tasks/?project=TTT")
+
+    # Then
+    assert (first["X-Cache"], second["X-Cache"]) == ("MISS", "HIT")
+    assert first.json() == second.json()
+
+
+@pytest.mark.django_db
+def test_write_in_project_bumps_generation(project, django_capture_on_commit_callbacks, api_client):
+    # Given
+    Task.create_for_project(project=project, summary="Task", creator="member")  # TTT-1
+    client = api_client()
+    assert client.get("/tasks/").json()["count"] == 1
+
+    # When
+    with django_capture_on_commit_callbacks(execute=True):
+        Task.create_for_project(project=project, summary="New", creator="member")
+    response = client.get("/tasks/")
+
+    # Then
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["count"] == 2
+
+
+@pytest.mark.django_db
+def test_cache_not_shared_between_visibility_scopes(project, api_client):
+    # Given
+    Task.create_for_project(project=project, summary="Task", creator="member")  # TTT-1
+    api_client().get("/tasks/")
+
+    # When
+    response = api_client("stranger").get("/tasks/")
+
+    # Then
+    assert response["X-Cache"] == "MISS"
+    assert response.json()["count"] == 0
+
+
+@pytest.mark.django_db
+def test_not_visible_object_bypasses_cache(project, api_client):
+    # Given
+    Task.create_for_project(project=project, summary="Task", creator="member")  # TTT-1
+    ResponseCache.stats.reset()
+
+    # When
+    response = api_client("stranger").get("/tasks/TTT-1/")
+
+    # Then
+    assert response.status_code == 403
+    assert ResponseCache.stats.snapshot()["TaskByIdView"]["bypasses"] == 1
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from caching.response_cache import CachedResponseMixin, ResponseCache
+from caching.single_flight import SingleFlight, AsyncSingleFlight
+from projects_app.models import ProjectMember
+from tasks_app.models import Task
+from tasks_app.views import TasksView
+
+
+def wait_for_follower(flight_registry, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if any(flight.followers for flight in list(flight_registry._flights.values())):
+            return
+        time.sleep(0.001)
+    raise AssertionError("follower did not join")
+
+
+def test_identical_calls_share_leader_result():
+    # Given
+    flights = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        wait_for_follower(flights)
+        return "leader response", "shared bytes"
+
+    # When
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(flights.run, "key", compute, 5)
+        while not flights._flights:
+            time.sleep(0.001)
+        follower = pool.submit(flights.run, "key", compute, 5)
+        results = {leader.result(), follower.result()}
+
+    # Then
+    assert results == {("leader response", None), (None, "shared bytes")}
+    assert len(calls) == 1
+    assert not flights._flights
+
+
+def test_follower_computes_itself_after_timeout():
+    # Given
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def slow():
+        release.wait(5)
+        return "leader", "shared"
+
+    # When
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flights.run, "key", slow, 5)
+        while not flights._flights:
+            time.sleep(0.001)
+        follower = flights.run("key", lambda: ("own", "own shared"), timeout=0.01)
+        release.set()
+
+    # Then
+    assert follower == ("own", None)
+    assert leader.result() == ("leader", None)
+
+
+def test_async_single_flight():
+    # Given
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "leader", "shared"
+
+    async def run_both():
+        return await asyncio.gather(flights.run("key", compute, 5), flights.run("key", compute, 5))
+
+    # Then
+    assert asyncio.run(run_both()) == [("leader", None), (None, "shared")]
+    assert len(calls) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.project(id="SFL", member="first")
+def test_concurrent_identical_list_requests_are_coalesced(project, api_client, monkeypatch):
+    # Given
+    ProjectMember.objects.create(user_id="second", project=project, role=ProjectMember.Role.VIEWER)
+    Task.create_for_project(project=project, summary="Task", creator="first")
+
+    original_list = TasksView.list
+
+    def slow_list(view, request, *args, **kwargs):
+        wait_for_follower(CachedResponseMixin.single_flight)
+        return original_list(view, request, *args, **kwargs)
+
+    monkeypatch.setattr(TasksView, "list", slow_list)
+
+    def get(user_id):
+        return api_client(user_id).get("/tasks/?project=SFL")
+
+    # When - users with the same visible projects
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(get, "first")
+        while not CachedResponseMixin.single_flight._flights:
+            time.sleep(0.001)
+        follower = pool.submit(get, "second")
+        responses = [leader.result(), follower.result()]
+
+    # Then
+    assert [r["X-Cache"] for r in responses] == ["MISS", "COALESCED"]
+    assert responses[0].content == responses[1].content
+    assert ResponseCache.stats.snapshot()["TasksView"]["coalesced"] == 1
@@ -0,0 +1,135 @@
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, Http404
+from django.views import View
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import exceptions
+from rest_framework import status
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from caching.single_flight import AsyncSingleFlight
+from permissions.visibility import ProjectVisibility
+from project_management_service.db_router import is_pinned_to_primary
+from utils.request_user import UserIdMixin
+
+
+class AsyncReadView(UserIdMixin, View):
+    """
+    Base class for native async read endpoints (served by ASGI without blocking worker thread on DB wait).
+    Mirrors behaviour of DRF generic views: session authentication, per project permissions,
+    django-filter filtering and LimitOffsetPagination with the same response format.
+    Identical concurrent GETs of users with the same visible projects are computed once (single flight),
+    followers wait up to COALESCE_WAIT_TIMEOUT seconds for leader's rendered bytes.
+    Subclasses must depend only on visible projects (viewer permissions), otherwise set coalesce = False.
+    """
+
+    http_method_names = ['get']
+    permission_classes = []
+    filterset_class = None
+    serializer_class = None
+    pagination_class = LimitOffsetPagination
+    renderer = JSONRenderer()
+    coalesce = True
+    single_flight = AsyncSingleFlight()
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            await self.check_authenticated()
+            key = await self.get_coalescing_key()
+            if key is None:
+                return await super().dispatch(request, *args, **kwargs)
+
+            async def compute():
+                response = await super(AsyncReadView, self).dispatch(request, *args, **kwargs)
+                shared = (response.content, response['Content-Type']) if response.status_code == 200 else None
+                return response, shared
+
+            response, shared = await self.single_flight.run(key, compute, settings.COALESCE_WAIT_TIMEOUT)
+            if shared is not None:
+                content, content_type = shared
+                return HttpResponse(content, content_type=content_type, headers={'X-Coalesced': '1'})
+            return response
+        except Http404 as e:
+            return self.error_response(exceptions.NotFound(*e.args))
+        except exceptions.APIException as e:
+            return self.error_response(e)
+
+    async def get_coalescing_key(self):
+        """
+        Requests pinned to primary (read-your-writes after own write) are not coalesced
+        """
+        if not (self.coalesce and settings.COALESCE_REQUESTS and self.request.method == 'GET'):
+            return None
+        if is_pinned_to_primary():
+            return None
+        raw = json.dumps([
+            self.request.get_host(),
+            self.request.path,
+            sorted((key, sorted(values)) for key, values in self.request.GET.lists()),
+            await ProjectVisibility.aproject_ids(self.get_user_id()),
+        ])
+        return f'{self.__class__.__name__}:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+    async def check_authenticated(self):
+        user = await self.request.auser()
+        if not user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+
+    async def check_project_permissions(self, project_id):
+        user_id = self.get_user_id()
+        for permission in self.permission_classes:
+            if not await permission().ahas_project_permission(user_id, project_id):
+                raise exceptions.PermissionDenied()
+
+    async def get_object_or_404(self, queryset, **kwargs):
+        try:
+            return await queryset.aget(**kwargs)
+        except queryset.model.DoesNotExist:
+            raise Http404(f"No {queryset.model._meta.object_name} matches the given query.")
+
+    async def filter_queryset(self, queryset):
+        """
+        Filter validation may hit the database (ModelChoiceFilter), so it is run in a thread
+        """
+        if self.filterset_class is None:
+            return queryset
+        backend = DjangoFilterBackend()
+        return await sync_to_async(backend.filter_queryset)(Request(self.request), queryset, self)
+
+    async def serialize(self, instance, many=False):
+        return self.serializer_class(instance, many=many).data
+
+    async def paginate(self, queryset):
+        paginator = self.pagination_class()
+        request = Request(self.request)
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        if paginator.limit is None:
+            return await self.serialize([obj async for obj in queryset], many=True)
+
+        paginator.offset = paginator.get_offset(request)
+        paginator.count = await queryset.acount()
+        page = []
+        if paginator.count > paginator.offset:
+            page = [obj async for obj in queryset[paginator.offset:paginator.offset + paginator.limit]]
+        return paginator.get_paginated_response(await self.serialize(page, many=True)).data
+
+    def render(self, data, status_code=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status_code, content_type='application/json')
+
+    def error_response(self, exc: exceptions.APIException):
+        response = self.render({"detail": exc.detail}, status_code=exc.status_code)
+        if isinstance(exc, exceptions.NotAuthenticated):
+            # Same as DRF - first authentication class decides about 401 + WWW-Authenticate header
+            authenticate_header = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(self.request)
+            if authenticate_header:
+                response['WWW-Authenticate'] = authenticate_header
+            else:
+                response.status_code = status.HTTP_403_FORBIDDEN
+        return response
@@ -0,0 +1,247 @@
+from collections import namedtuple
+
+from django.apps import apps
+from django.db import transaction
+
+from utils.models_helpers import ChoiceCodeField
+from utils.online_migration import OnlineColumnMigration, OnlineMigrationError
+
+
+class ChoiceCodeMigrationError(OnlineMigrationError):
+    pass
+
+
+# ChoiceCodeField `field` of `model` still stored as varchar value
+Column = namedtuple('Column', ['model', 'field'])
+
+
+class ChoiceCodeMigration(OnlineColumnMigration):
+    """
+    Moves existing PostgreSQL database from varchar choice values to small integer codes of ChoiceCodeField columns
+    (task status / priority / type and their archived copies, sprint status, member role). Runs online in phases:
+    - prepare: nullable smallint column next to each varchar one (metadata only change), trigger setting code of
+      rows written meanwhile
+    - backfill: codes of existing rows in batches (each in its own transaction - can be stopped and run again),
+      validated NOT NULL checks, model indexes over the columns built concurrently on the new ones
+    - swap: one transaction - varchar columns dropped with their indexes, code columns renamed in their place,
+      prebuilt indexes renamed. Deploy new code right after
+    - validate: range checks added in swap are validated without blocking writes
+    Value outside of choices (no code) stops backfill with error.
+    """
+
+    title = 'Online choice code migration'
+    error = ChoiceCodeMigrationError
+    batch_size_setting = 'CHOICE_CODE_MIGRATION_BATCH_SIZE'
+    lock_timeout_setting = 'CHOICE_CODE_MIGRATION_LOCK_TIMEOUT'
+    code_type = 'smallint'
+
+    # Schema description (from current models)
+
+    def coded_columns(self) -> list:
+        return [Column(model, field) for model in apps.get_models() for field in model._meta.concrete_fields
+                if isinstance(field, ChoiceCodeField)]
+
+    def new_column(self, field) -> str:
+        return f'new_{field.column}'
+
+    def trigger_names(self, column):
+        table = column.model._meta.db_table
+        return (self.name(table, column.field.column, 'code_migration'),
+                self.name(table, column.field.column, 'code_migration_fn'))
+
+    def code_sql(self, field, value) -> str:
+        """
+        SQL expression - code of varchar choice `value` (NULL for value outside of choices)
+        """
+        codes = field.choice_codes
+        whens = ' '.join(f"WHEN '{member.value.replace(chr(39), chr(39) * 2)}' THEN {code}"
+                         for member, code in codes.codes.items())
+        return f'CASE {value} {whens} END'
+
+    def indexes(self, model, columns) -> list:
+        """
+        Model indexes over any of columns (in fields or condition)
+        """
+        indexes = []
+        for index in model._meta.indexes:
+            sql = self.index_sql(model, index, index.name)
+            if any(self.quote(column) in sql for column in columns):
+                indexes.append(index)
+        return indexes
+
+    def index_sql(self, model, index, name, columns=()) -> str:
+        """
+        CREATE INDEX CONCURRENTLY of model index under `name`, with `columns` replaced by their new code columns
+        (condition values are compiled to codes by ChoiceCodeField)
+        """
+        index = index.clone()
+        index.name = name
+        with self.connection.schema_editor(collect_sql=True, atomic=False) as schema_editor:
+            sql = str(index.create_sql(model, schema_editor, concurrently=True))
+        for column in columns:
+            sql = sql.replace(self.quote(column), self.quote(f'new_{column}'))
+        return sql
+
+    def check_constraints(self, columns):
+        """
+        Constraints over coded columns would be dropped with varchar column - not supported
+        """
+        for model, group in self.by_model(columns).items():
+            names = {column.field.name for column in group}
+            for constraint in model._meta.constraints:
+                if set(getattr(constraint, 'fields', ())) & names:
+                    raise ChoiceCodeMigrationError(f'Constraint {constraint.name} over coded column is not supported')
+
+    def by_model(self, columns) -> dict:
+        grouped = {}
+        for column in columns:
+            grouped.setdefault(column.model, []).append(column)
+        return grouped
+
+    # Database state
+
+    def pending(self, cursor) -> list:
+        """
+        Coded columns still stored as varchar
+        """
+        pending = []
+        for column in self.coded_columns():
+            self.execute(cursor, 'SELECT data_type FROM information_schema.columns '
+                                 'WHERE table_schema = current_schema() AND table_name = %s AND column_name = %s',
+                         [column.model._meta.db_table, column.field.column])
+            row = cursor.fetchone()
+            if row is not None and row[0] != self.code_type:
+                pending.append(column)
+        return pending
+
+    def prepared(self, cursor, columns) -> bool:
+        return all(self.new_column(column.field) in self.columns(cursor, column.model._meta.db_table)
+                   for column in columns)
+
+    # Phases
+
+    def prepare(self):
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            columns = self.pending(cursor)
+            if not columns:
+                raise ChoiceCodeMigrationError('Choice codes are already migrated')
+            self.check_constraints(columns)
+            self.set_lock_timeout(cursor)
+            for model, field in columns:
+                table, column = model._meta.db_table, field.column
+                new_column = self.new_column(field)
+                self.execute(cursor, f'ALTER TABLE {self.quote(table)} ADD COLUMN IF NOT EXISTS {new_column} '
+                                     f'{self.code_type}')
+                self.create_trigger(cursor, table, column, *self.trigger_names(Column(model, field)),
+                                    [f'NEW.{new_column} := {self.code_sql(field, f"NEW.{self.quote(column)}")};'])
+
+    def backfill(self, batch_size=None, progress=None) -> int:
+        """
+        Returns number of updated rows
+        """
+        batch_size = self.batch_size(batch_size)
+        updated = 0
+        with self.connection.cursor() as cursor:
+            columns = self.pending(cursor)
+            if not columns or not self.prepared(cursor, columns):
+                raise ChoiceCodeMigrationError('Backfill runs between prepare and swap')
+            for column in columns:
+                updated = self.backfill_column(cursor, column, batch_size, updated, progress)
+            self.check_values(cursor, columns)
+
+            for model, group in self.by_model(columns).items():
+                table = model._meta.db_table
+                for column in group:
+                    if not column.field.null:
+                        self.add_not_null_check(cursor, table, self.new_column(column.field))
+                names = [column.field.column for column in group]
+                for index in self.indexes(model, names):
+                    name = self.name(index.name, 'new')
+                    self.ensure_index(cursor, name, self.index_sql(model, index, name, names))
+        return updated
+
+    def backfill_column(self, cursor, column, batch_size, updated, progress) -> int:
+        table, pk = self.quote(column.model._meta.db_table), self.quote(column.model._meta.pk.column)
+        value, new_column = self.quote(column.field.column), self.new_column(column.field)
+        last_pk = None
+        while True:
+            # Keyset pagination - row with value outside of choices stays NULL and is not selected again
+            after = f' AND {pk} > %s' if last_pk is not None else ''
+            params = [last_pk] if last_pk is not None else []
+            self.execute(cursor, f'SELECT {pk} FROM {table} WHERE {new_column} IS NULL AND {value} IS NOT NULL'
+                                 f'{after} ORDER BY {pk} LIMIT %s', [*params, batch_size])
+            pks = [row[0] for row in cursor.fetchall()]
+            if not pks:
+                return updated
+            updated += self.execute(cursor, f'UPDATE {table} SET {new_column} = {self.code_sql(column.field, value)} '
+                                            f'WHERE {pk} = ANY(%s)', [pks]).rowcount
+            last_pk = pks[-1]
+            if progress:
+                progress(f'{column.model._meta.db_table}.{column.field.column}', updated)
+
+    def check_values(self, cursor, columns):
+        for model, field in columns:
+            self.execute(cursor, f'SELECT DISTINCT {self.quote(field.column)} FROM {self.quote(model._meta.db_table)} '
+                                 f'WHERE {self.new_column(field)} IS NULL AND {self.quote(field.column)} IS NOT NULL '
+                                 f'LIMIT 10')
+            unknown = [row[0] for row in cursor.fetchall()]
+            if unknown:
+                raise ChoiceCodeMigrationError(f'{model._meta.db_table}.{field.column} has values without code: '
+                                               f'{unknown} - fix the rows or add codes, then run backfill again')
+
+    def swap(self):
+        with transaction.atomic(using=self.using), self.connection.cursor() as cursor:
+            columns = self.pending(cursor)
+            if not columns:
+                raise ChoiceCodeMigrationError('Choice codes are already migrated')
+            if not self.prepared(cursor, columns):
+                raise ChoiceCodeMigrationError('Run prepare and backfill first')
+            self.set_lock_timeout(cursor)
+            tables = ', '.join(self.quote(model._meta.db_table) for model in self.by_model(columns))
+            self.execute(cursor, f'LOCK TABLE {tables} IN ACCESS EXCLUSIVE MODE')
+            self.check_values(cursor, columns)
+
+            for model, group in self.by_model(columns).items():
+                table = model._meta.db_table
+                quoted = self.quote(table)
+                names = [column.field.column for column in group]
+                indexes = self.indexes(model, names)
+                for column in group:
+                    field = column.field
+                    self.drop_trigger(cursor, table, *self.trigger_names(column))
+                    # Drops indexes of varchar column as well
+                    self.execute(cursor, f'ALTER TABLE {quoted} DROP COLUMN {self.quote(field.column)} CASCADE')
+                    self.execute(cursor, f'ALTER TABLE {quoted} RENAME COLUMN {self.new_column(field)} '
+                                         f'TO {self.quote(field.column)}')
+                    if not field.null:
+                        self.set_not_null(cursor, table, field.column,
+                                          self.not_null_check(table, self.new_column(field)))
+                    # Range check of PositiveSmallIntegerField, as created by Django
+                    self.execute(cursor, f'ALTER TABLE {quoted} ADD CONSTRAINT '
+                                         f'{self.quote(self.name(table, field.column, "check"))} '
+                                         f'CHECK ({self.quote(field.column)} >= 0) NOT VALID')
+                for index in indexes:
+                    self.execute(cursor, f'ALTER INDEX {self.quote(self.name(index.name, "new"))} '
+                                         f'RENAME TO {self.quote(index.name)}')
+
+    def validate(self) -> list:
+        with self.connection.cursor() as cursor:
+            if self.pending(cursor):
+                raise ChoiceCodeMigrationError('Run swap first')
+            return self.validate_tables(cursor, list(dict.fromkeys(
+                column.model._meta.db_table for column in self.coded_columns())))
+
+    def status(self) -> dict:
+        """
+        Rows still waiting for backfill per column (empty once swapped)
+        """
+        with self.connection.cursor() as cursor:
+            columns = self.pending(cursor)
+            if columns and not self.prepared(cursor, columns):
+                raise ChoiceCodeMigrationError('Run prepare first')
+            pending = {}
+            for model, field in columns:
+                self.execute(cursor, f'SELECT count(*) FROM {self.quote(model._meta.db_table)} '
+                                     f'WHERE {self.new_column(field)} IS NULL AND {self.quote(field.column)} IS NOT NULL')
+                pending[f'{model._meta.db_table}.{field.column}'] = cursor.fetchone()[0]
+            return pending
@@ -0,0 +1,135 @@
+from collections import defaultdict
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, SlugRelatedField
+from rest_framework.response import Response
+
+
+class FastReadSerializer:
+    """
+    Compiled read path of ModelSerializer for list endpoints.
+    Fields of serializer_class are inspected once: rows are then built from values_list() tuples with precomputed
+    per-field converters (no field instances, model instances or related managers per row).
+    Many-to-many primary keys are loaded for the whole page with one query on through table.
+    Slug related fields (e.g. task key of parent) are read as joined column of the same query.
+    Output is the same as serializer_class(many=True).data (see tests/unit/test_fast_serializers.py).
+    """
+
+    identity_fields = (serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+                       PrimaryKeyRelatedField)
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.field_names = []
+        self.columns = []
+        self.converters = []
+        self.many_related = {}
+        self.compile()
+
+    def compile(self):
+        opts = self.model._meta
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            self.field_names.append(name)
+            model_field = opts.get_field(field.source)
+            if isinstance(field, ManyRelatedField):
+                if field.child_relation.pk_field is not None or not isinstance(field.child_relation,
+                                                                               PrimaryKeyRelatedField):
+                    raise NotImplementedError(f"{name}: only primary key many-to-many relations are supported")
+                through = model_field.remote_field.through
+                self.many_related[name] = (
+                    through,
+                    through._meta.get_field(model_field.m2m_field_name()).attname,
+                    through._meta.get_field(model_field.m2m_reverse_field_name()).attname,
+                )
+                self.columns.append(None)
+                self.converters.append(None)
+                continue
+
+            if isinstance(field, SlugRelatedField):
+                self.columns.append(f'{model_field.name}__{field.slug_field}')
+                self.converters.append(None)
+                continue
+            if isinstance(field, PrimaryKeyRelatedField) and field.pk_field is not None:
+                raise NotImplementedError(f"{name}: pk_field is not supported")
+            self.columns.append(model_field.attname)
+            self.converters.append(self.converter_for(field))
+
+    def converter_for(self, field):
+        if isinstance(field, serializers.ChoiceField):
+            choices = field.choice_strings_to_values
+            return lambda value: choices.get(str(value), value) if value != '' else value
+        if isinstance(field, self.identity_fields):
+            # DRF converts with str() / int() - values from database already have that type
+            return None
+        return field.to_representation
+
+    def rows_queryset(self, queryset):
+        """
+        Queryset of tuples (model columns + pk) to paginate instead of model instances
+        """
+        return queryset.values_list('pk', *(column for column in self.columns if column is not None))
+
+    def load_many_related(self, pks):
+        related = {}
+        for name, (through, source, target) in self.many_related.items():
+            values = defaultdict(list)
+            for i in range(0, len(pks), settings.FAST_SERIALIZER_BATCH_SIZE):
+                links = (through.objects.filter(**{f'{source}__in': pks[i:i + settings.FAST_SERIALIZER_BATCH_SIZE]})
+                         .order_by(target).values_list(source, target))
+                for pk, target_pk in links:
+                    values[pk].append(target_pk)
+            related[name] = values
+        return related
+
+    def build(self, rows):
+        rows = list(rows)
+        related = self.load_many_related([row[0] for row in rows]) if self.many_related else {}
+        layout = []
+        position = 1
+        for name, column, converter in zip(self.field_names, self.columns, self.converters):
+            if column is None:
+                layout.append((name, None, related[name]))
+            else:
+                layout.append((name, position, converter))
+                position += 1
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, position, converter in layout:
+                if position is None:
+                    item[name] = converter.get(row[0], [])
+                    continue
+                value = row[position]
+                item[name] = converter(value) if converter is not None and value is not None else value
+            data.append(item)
+        return data
+
+    def serialize(self, queryset):
+        return self.build(self.rows_queryset(queryset))
+
+
+class FastListMixin:
+    """
+    Mixin for ListAPIView using FastReadSerializer for GET list responses (same output as serializer_class)
+    """
+
+    fast_serializer = None
+
+    def get_fast_serializer(self):
+        return self.fast_serializer
+
+    def list(self, request, *args, **kwargs):
+        fast_serializer = self.get_fast_serializer()
+        if fast_serializer is None or not settings.FAST_READ_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+
+        rows = fast_serializer.rows_queryset(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast_serializer.build(page))
+        return Response(fast_serializer.build(rows))
@@ -1,7 +1,157 @@
+from django.core import exceptions
+from django.db import models, transaction
+from django.utils.deconstruct import deconstructible
+
+
 class ProjectRelated:
     """
     Mixin for forcing get_project() implementation
     """
 
     def get_project(self):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+class TrackedFields:
+    """
+    Mixin remembering values of tracked_fields (attnames) as they were loaded from database.
+    Used to find out what changed on save, e.g. for denormalized counters
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            field: instance.__dict__[field] for field in cls.tracked_fields if field in instance.__dict__
+        }
+        return instance
+
+    def get_loaded_values(self):
+        """
+        Tracked values stored in database (None for not saved instance). Deferred fields are fetched
+        """
+        if self._state.adding:
+            return None
+        loaded = getattr(self, '_loaded_values', {})
+        missing = [field for field in self.tracked_fields if field not in loaded]
+        if missing:
+            loaded.update(type(self)._base_manager.filter(pk=self.pk).values(*missing).first() or {})
+        return tuple(loaded.get(field) for field in self.tracked_fields)
+
+    def get_current_values(self):
+        return tuple(getattr(self, field) for field in self.tracked_fields)
+
+    def reset_loaded_values(self):
+        self._loaded_values = dict(zip(self.tracked_fields, self.get_current_values()))
+
+
+def raw_delete(queryset) -> int:
+    """
+    Single DELETE ... WHERE query for queryset: no objects loaded, no signals, no cascades.
+    Caller is responsible for related rows, counters and cache invalidation
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_in_chunks(queryset, chunk_size):
+    """
+    Raw delete of queryset rows in chunks of at most chunk_size primary keys, each chunk in its own transaction.
+    Yields number of deleted rows after each chunk
+    """
+    while True:
+        pks = list(queryset.order_by().values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return
+        with transaction.atomic(using=queryset.db):
+            deleted = raw_delete(queryset.model._base_manager.filter(pk__in=pks))
+        yield deleted
+
+
+@deconstructible
+class ChoiceCodes:
+    """
+    Stable small integer storage codes of TextChoices values. Codes are stored in database instead of values,
+    so they must never be renumbered - new choice gets a new code
+    """
+
+    def __init__(self, choices, codes: dict):
+        missing = [member for member in choices if member not in codes]
+        if missing or len(set(codes.values())) != len(codes):
+            raise ValueError(f'Every {choices.__name__} member needs its own code, missing: {missing}')
+        self.choices = choices
+        self.codes = {choices(value): code for value, code in codes.items()}
+        self.members = {code: member for member, code in self.codes.items()}
+
+    def code(self, value) -> int:
+        """
+        Code of choice value (member or its string). Codes are accepted as well
+        """
+        if isinstance(value, int) and not isinstance(value, bool) and value in self.members:
+            return value
+        try:
+            return self.codes[value]
+        except (KeyError, TypeError):
+            raise ValueError(f'"{value}" is not a valid {self.choices.__name__}') from None
+
+    def member(self, code):
+        return self.members[code]
+
+    def mask(self, values) -> int:
+        """
+        Bit set of codes of values - membership test is `mask >> code & 1`
+        """
+        mask = 0
+        for value in values:
+            mask |= 1 << self.code(value)
+        return mask
+
+
+class ChoiceCodeField(models.PositiveSmallIntegerField):
+    """
+    TextChoices field stored as small integer code (see ChoiceCodes) instead of varchar value.
+    In Python (model attributes, values(), lookups, serializers, filters) it works with choice values as
+    CharField with choices would - only the column and its indexes hold codes
+    """
+
+    def __init__(self, *args, codes: ChoiceCodes = None, **kwargs):
+        self.choice_codes = codes
+        if codes is not None:
+            kwargs['choices'] = codes.choices.choices
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['codes'] = self.choice_codes
+        kwargs.pop('choices', None)
+        return name, path, args, kwargs
+
+    @property
+    def validators(self):
+        # Values are choice strings - range validators of integer column do not apply
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else self.choice_codes.member(value)
+
+    def to_python(self, value):
+        if value is None:
+            return value
+        try:
+            return self.choice_codes.member(self.choice_codes.code(value))
+        except ValueError as e:
+            raise exceptions.ValidationError(str(e), code='invalid_choice')
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return value
+        try:
+            return self.choice_codes.code(value)
+        except ValueError as e:
+            raise e.__class__(f"Field '{self.name}' expected one of {self.choice_codes.choices.values} "
+                              f"but got {value!r}.") from e
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return None if value is None else str(value)
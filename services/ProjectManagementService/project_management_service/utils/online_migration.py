@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.utils import truncate_name
+
+
+class OnlineMigrationError(Exception):
+    pass
+
+
+class OnlineColumnMigration:
+    """
+    Base of online PostgreSQL column migrations run in phases by management command while old code keeps serving
+    requests: new columns are filled by triggers and batched backfill, indexes are built concurrently and NOT NULL
+    is proven by validated checks beforehand, so only swap takes table locks - for catalog changes only.
+    Subclasses implement the phases (prepare, backfill, swap, validate) and status.
+    """
+
+    phases = ('prepare', 'backfill', 'swap', 'validate')
+    title = 'Online migration'
+    error = OnlineMigrationError
+    # Settings with default rows updated in one backfill transaction and max wait for table locks in DDL
+    batch_size_setting = None
+    lock_timeout_setting = None
+
+    def __init__(self, using='default'):
+        self.connection = connections[using]
+        if self.connection.vendor != 'postgresql':
+            raise self.error(f'{self.title} requires PostgreSQL, database "{using}" is '
+                             f'{self.connection.vendor} - recreate its tables instead')
+        self.using = using
+        self.quote = self.connection.ops.quote_name
+
+    def batch_size(self, batch_size=None) -> int:
+        return batch_size or getattr(settings, self.batch_size_setting)
+
+    def name(self, *parts) -> str:
+        return truncate_name('_'.join(parts), self.connection.ops.max_name_length())
+
+    def execute(self, cursor, sql, params=None):
+        cursor.execute(sql, params)
+        return cursor
+
+    def columns(self, cursor, table) -> set:
+        return {column.name for column in self.connection.introspection.get_table_description(cursor, table)}
+
+    def constraint_exists(self, cursor, table, name) -> bool:
+        self.execute(cursor, 'SELECT 1 FROM pg_constraint WHERE conrelid = %s::regclass AND conname = %s',
+                     [table, name])
+        return cursor.fetchone() is not None
+
+    def set_lock_timeout(self, cursor):
+        self.execute(cursor, 'SET LOCAL lock_timeout = %s', [getattr(settings, self.lock_timeout_setting)])
+
+    def create_trigger(self, cursor, table, column, trigger, function, assignments):
+        """
+        BEFORE INSERT / UPDATE OF column trigger running plpgsql assignments (e.g. 'NEW.x := ...;')
+        """
+        quoted = self.quote(table)
+        self.execute(cursor, f'CREATE OR REPLACE FUNCTION {self.quote(function)}() RETURNS trigger '
+                             f'LANGUAGE plpgsql AS $$ BEGIN {" ".join(assignments)} RETURN NEW; END $$')
+        self.execute(cursor, f'DROP TRIGGER IF EXISTS {self.quote(trigger)} ON {quoted}')
+        self.execute(cursor, f'CREATE TRIGGER {self.quote(trigger)} BEFORE INSERT OR UPDATE OF '
+                             f'{self.quote(column)} ON {quoted} FOR EACH ROW '
+                             f'EXECUTE FUNCTION {self.quote(function)}()')
+
+    def drop_trigger(self, cursor, table, trigger, function):
+        self.execute(cursor, f'DROP TRIGGER IF EXISTS {self.quote(trigger)} ON {self.quote(table)}')
+        self.execute(cursor, f'DROP FUNCTION IF EXISTS {self.quote(function)}()')
+
+    def create_index(self, cursor, name, table, columns, unique=False):
+        self.ensure_index(cursor, name, f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY {self.quote(name)} '
+                                        f'ON {self.quote(table)} ({", ".join(columns)})')
+
+    def ensure_index(self, cursor, name, sql):
+        """
+        Runs CREATE INDEX CONCURRENTLY sql (outside of transaction), index left invalid by interrupted build is
+        built again
+        """
+        self.execute(cursor, 'SELECT index.indisvalid FROM pg_index AS index '
+                             'JOIN pg_class AS class ON class.oid = index.indexrelid WHERE class.relname = %s', [name])
+        row = cursor.fetchone()
+        if row is not None and row[0]:
+            return
+        if row is not None:
+            self.execute(cursor, f'DROP INDEX CONCURRENTLY {self.quote(name)}')
+        self.execute(cursor, sql)
+
+    def add_not_null_check(self, cursor, table, column):
+        """
+        Validated CHECK (column IS NOT NULL) lets swap set NOT NULL without scanning table
+        """
+        name = self.not_null_check(table, column)
+        with transaction.atomic(using=self.using):
+            self.set_lock_timeout(cursor)
+            if not self.constraint_exists(cursor, table, name):
+                self.execute(cursor, f'ALTER TABLE {self.quote(table)} ADD CONSTRAINT {self.quote(name)} '
+                                     f'CHECK ({column} IS NOT NULL) NOT VALID')
+        self.execute(cursor, f'ALTER TABLE {self.quote(table)} VALIDATE CONSTRAINT {self.quote(name)}')
+
+    def not_null_check(self, table, column) -> str:
+        return self.name(table, column, 'notnull')
+
+    def set_not_null(self, cursor, table, column, check):
+        quoted = self.quote(table)
+        self.execute(cursor, f'ALTER TABLE {quoted} ALTER COLUMN {self.quote(column)} SET NOT NULL')
+        self.execute(cursor, f'ALTER TABLE {quoted} DROP CONSTRAINT {self.quote(check)}')
+
+    def validate_tables(self, cursor, tables) -> list:
+        """
+        Validates constraints added as NOT VALID (SHARE UPDATE EXCLUSIVE lock - reads and writes go on)
+        """
+        validated = []
+        for table in tables:
+            self.execute(cursor, 'SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass '
+                                 'AND NOT convalidated', [table])
+            for (name,) in cursor.fetchall():
+                self.execute(cursor, f'ALTER TABLE {self.quote(table)} VALIDATE CONSTRAINT {self.quote(name)}')
+                validated.append(f'{table}.{name}')
+            self.execute(cursor, f'ANALYZE {self.quote(table)}')
+        return validated
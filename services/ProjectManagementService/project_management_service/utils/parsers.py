@@ -0,0 +1,43 @@
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import ColumnarJSONRenderer, MessagePackRenderer
+
+
+def from_columns(columns: dict) -> list:
+    """
+    {"id": [1, 2], "name": ["a", "b"]} -> [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}]
+    """
+    if not isinstance(columns, dict) or not all(isinstance(values, list) for values in columns.values()):
+        raise ParseError('Columnar JSON must be an object with array of values for each field')
+    if len({len(values) for values in columns.values()}) > 1:
+        raise ParseError('Columnar JSON arrays must have the same length')
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+class ColumnarJSONParser(parsers.JSONParser):
+    """
+    Parses request body sent in columnar form (see ColumnarJSONRenderer) into list of objects.
+    Not a default parser - added by views taking list bodies, others answer 415
+    """
+    media_type = ColumnarJSONRenderer.media_type
+    renderer_class = ColumnarJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return from_columns(super().parse(stream, media_type, parser_context))
+
+
+class MessagePackParser(parsers.BaseParser):
+    """
+    Parses MessagePack request body
+    """
+    media_type = MessagePackRenderer.media_type
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        import msgpack
+
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -0,0 +1,52 @@
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+
+def to_columns(rows: list) -> dict:
+    """
+    [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}] -> {"id": [1, 2], "name": ["a", "b"]}
+    """
+    if not rows:
+        return {}
+    return {name: [row.get(name) for row in rows] for name in rows[0]}
+
+
+def is_rows(data) -> bool:
+    return isinstance(data, list) and all(isinstance(row, dict) for row in data)
+
+
+class ColumnarJSONRenderer(renderers.JSONRenderer):
+    """
+    JSON with lists of objects sent column by column - each field name once with array of values.
+    Applies to list responses (plain list or "results" of paginated response), other data is rendered unchanged.
+    Selected with Accept: application/vnd.pms.columnar+json or ?format=columnar
+    """
+    media_type = 'application/vnd.pms.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if is_rows(data):
+            data = to_columns(data)
+        elif isinstance(data, dict) and is_rows(data.get('results')):
+            data = {**data, 'results': to_columns(data['results'])}
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Binary MessagePack encoding of response data.
+    Selected with Accept: application/msgpack or ?format=msgpack
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b''
+        # Types without MessagePack representation (datetime, Decimal, UUID, lazy strings) are encoded as in JSON
+        return msgpack.packb(data, default=self.encoder.default, use_bin_type=True)
@@ -0,0 +1,15 @@
+def request_user_id(request):
+    """
+    Id of user making the request - the only place reading it, so views, permissions, admission and response cache
+    change together when authentication provides it
+    """
+    return request.headers.get('user_id') # TO DO: Change when user id correctly handled
+
+
+class UserIdMixin:
+    """
+    Mixin of views adding get_user_id() - id of user making the request
+    """
+
+    def get_user_id(self):
+        return request_user_id(self.request)